@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+検出結果デコーダーのマイクロベンチマーク
+汎用の経路（flatbuffers.Table）・ベクトル演算・vtableキャッシュの各デコーダーを比較する
+
+使い方: python benchmarks/decoder_benchmark.py [検出数 ...]
+"""
+
+import os
+import sys
+import random
+import timeit
+
+# プロジェクトのルートディレクトリをパスに追加
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+import flatbuffers
+import BoundingBox2d
+import GeneralObject
+import ObjectDetectionData
+import ObjectDetectionTop
+from kumaMac.core.detection_decoder import (VtableCachedDecoder, decode_detections,
+                                            decode_detections_generic)
+
+
+def build_frame(count, seed=0):
+    """
+    ランダムな検出結果を含むObjectDetectionTopのバッファを作成
+    
+    Args:
+        count (int): 検出数
+        seed (int): 乱数のシード
+    
+    Returns:
+        bytes: FlatBuffersでシリアライズされたデータ
+    """
+    rng = random.Random(seed)
+    builder = flatbuffers.Builder(1024)
+    objects = []
+    for _ in range(count):
+        BoundingBox2d.Start(builder)
+        BoundingBox2d.AddLeft(builder, rng.randrange(0, 300))
+        BoundingBox2d.AddTop(builder, rng.randrange(0, 300))
+        BoundingBox2d.AddRight(builder, rng.randrange(1, 320))
+        BoundingBox2d.AddBottom(builder, rng.randrange(1, 320))
+        bbox = BoundingBox2d.End(builder)
+        
+        GeneralObject.Start(builder)
+        GeneralObject.AddClassId(builder, rng.randrange(1, 90))
+        GeneralObject.AddBoundingBoxType(builder, 1)
+        GeneralObject.AddBoundingBox(builder, bbox)
+        GeneralObject.AddScore(builder, rng.random())
+        objects.append(GeneralObject.End(builder))
+    
+    ObjectDetectionData.StartObjectDetectionListVector(builder, len(objects))
+    for obj in reversed(objects):
+        builder.PrependUOffsetTRelative(obj)
+    object_list = builder.EndVector()
+    
+    ObjectDetectionData.Start(builder)
+    ObjectDetectionData.AddObjectDetectionList(builder, object_list)
+    perception = ObjectDetectionData.End(builder)
+    
+    ObjectDetectionTop.Start(builder)
+    ObjectDetectionTop.AddPerception(builder, perception)
+    builder.Finish(ObjectDetectionTop.End(builder))
+    return bytes(builder.Output())
+
+
+def main(counts):
+    """ベンチマークを実行して結果を表示"""
+    cached_decoder = VtableCachedDecoder(vectorize_threshold=None)
+    decoders = [
+        ("generic", decode_detections_generic),
+        ("vectorized", decode_detections),
+        ("vtable_cached", cached_decoder.decode),
+    ]
+    
+    print(f"{'objects':>8} " + " ".join(f"{name:>14}" for name, _ in decoders))
+    for count in counts:
+        buf = build_frame(count)
+        number = max(10, 5000 // max(count, 1))
+        timings = []
+        for _, decode in decoders:
+            best = min(timeit.repeat(lambda: decode(buf), number=number, repeat=5))
+            timings.append(best / number * 1e6)
+        print(f"{count:>8} " + " ".join(f"{t:>12.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 50, 100, 300, 1000])
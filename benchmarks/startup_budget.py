@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+起動時のインポート時間の計測と予算チェック
+各エントリーポイントを別プロセスで -X importtime 付きでインポートし、
+所要時間が予算内か、読み込んではいけない重いモジュールを読み込んでいないかを確認する
+
+使い方: python benchmarks/startup_budget.py [--repeat 回数] [--slack 倍率] [--top 件数]
+予算を超えた場合や禁止モジュールを読み込んだ場合は終了コード1を返す
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+# プロジェクトのルートディレクトリ（ここをカレントディレクトリにしてインポートする）
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 初回の利用時まで読み込みを遅らせる重いモジュール
+HEAVY_MODULES = ('cv2', 'numpy', 'requests', 'flatbuffers', 'PIL', 'tkinter')
+
+# (インポートするモジュール, 予算（ミリ秒）, 読み込んではいけないモジュール)
+# 予算は計測値に余裕を持たせた値（遅い環境では--slackで倍率をかける）
+BUDGETS = [
+    ('kumaMac.utils.logging_setup', 50, HEAVY_MODULES),
+    ('kumaMac.core', 20, HEAVY_MODULES),
+    ('kumaMac.api', 20, HEAVY_MODULES),
+    ('kumaMac.core.pipeline', 30, HEAVY_MODULES),
+    ('kumaMac.core.device_state_service', 40, HEAVY_MODULES),
+    ('kumaMac.daemon', 50, HEAVY_MODULES),
+    ('kumaMac.ui.settings_tab', 60, ('cv2', 'numpy', 'requests', 'flatbuffers', 'PIL')),
+    ('kumaMac.ui.main_window', 80, ('cv2', 'numpy', 'requests', 'flatbuffers', 'PIL')),
+]
+
+
+def parse_importtime(output):
+    """
+    -X importtime の出力を解析
+    
+    Args:
+        output (str): 標準エラー出力の内容
+    
+    Returns:
+        list: (モジュール名, 自身の時間（マイクロ秒）, 累積時間（マイクロ秒）, 深さ)のリスト
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # 見出しの行
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return entries
+
+
+def measure(module_name):
+    """
+    新しいプロセスでモジュールをインポートして時間を計測
+    
+    Args:
+        module_name (str): インポートするモジュール
+    
+    Returns:
+        tuple: (インポート時間（ミリ秒）, 対象のインポートで読み込んだモジュールの計測結果のリスト)
+    """
+    # settingsは各モジュールが参照するため先に読み込み、計測対象から外す
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import settings; import {module_name}"],
+        cwd=ROOT_PATH, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise Exception(f"{module_name} のインポートに失敗しました:\n{result.stderr[-2000:]}")
+    entries = parse_importtime(result.stderr)
+    
+    # 出力は読み込みが終わった順に並ぶため、対象の行から直前の深さ0の行までが対象のインポート分になる
+    for index in range(len(entries) - 1, -1, -1):
+        name, _, cumulative, depth = entries[index]
+        if depth == 0 and name == module_name:
+            break
+    else:
+        raise Exception(f"{module_name} の計測結果がありません")
+    start = index
+    while start > 0 and entries[start - 1][3] > 0:
+        start -= 1
+    return cumulative / 1000.0, entries[start:index + 1]
+
+
+def heaviest_packages(entries, top):
+    """
+    トップレベルのパッケージごとに自身の時間を合計して重い順に並べる
+    
+    Args:
+        entries (list): 計測結果のリスト
+        top (int): 返す件数
+    
+    Returns:
+        list: (パッケージ名, 時間（ミリ秒）)のリスト
+    """
+    totals = {}
+    for name, self_time, _, _ in entries:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_time
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(package, self_time / 1000.0) for package, self_time in ranked[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時のインポート時間の予算チェック")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の回数（最小値を採用）")
+    parser.add_argument("--slack", type=float, default=1.0, help="予算にかける倍率")
+    parser.add_argument("--top", type=int, default=5, help="表示する重いパッケージの数")
+    args = parser.parse_args()
+    
+    failures = []
+    print(f"{'module':<36} {'import ms':>10} {'budget ms':>10}  heaviest packages")
+    for module_name, budget_ms, forbidden in BUDGETS:
+        runs = [measure(module_name) for _ in range(max(1, args.repeat))]
+        elapsed_ms, entries = min(runs, key=lambda run: run[0])
+        budget_ms *= args.slack
+        
+        loaded = {name.split(".")[0] for name, _, _, _ in entries}
+        violations = sorted(loaded.intersection(forbidden))
+        heaviest = ", ".join(f"{package} {ms:.1f}" for package, ms in heaviest_packages(entries, args.top))
+        print(f"{module_name:<36} {elapsed_ms:>10.1f} {budget_ms:>10.0f}  {heaviest}")
+        
+        if elapsed_ms > budget_ms:
+            failures.append(f"{module_name}: {elapsed_ms:.1f} ms > {budget_ms:.0f} ms")
+        if violations:
+            failures.append(f"{module_name}: 読み込んではいけないモジュール {', '.join(violations)}")
+    
+    if failures:
+        print("\n予算を超えました:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nすべて予算内です")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,16 @@
 API通信モジュール
 
 AITRIOSとのAPI通信を行うためのモジュール
+（requestsなどは公開名が最初に参照されたときに読み込む）
 """
 
-from .aitrios_client import AITRIOSClient
+from kumaMac.utils.lazy_import import lazy_exports
 
-__all__ = ['AITRIOSClient']
\ No newline at end of file
+_EXPORTS = {
+    'AITRIOSClient': '.aitrios_client',
+    'AsyncAITRIOSClient': '.async_aitrios_client'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = ['AITRIOSClient', 'AsyncAITRIOSClient']
@@ -6,24 +6,103 @@ AITRIOS APIクライアント
 AITRIOSプラットフォームとの通信を担当するモジュール
 """
 
+import logging
 import time
+import json
+import threading
 import requests
-import base64
+from requests.adapters import HTTPAdapter
 import settings
+from kumaMac.api.token_manager import get_token_manager, release_token_manager, PORTAL_URL
+from kumaMac.api.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from kumaMac.api.json_stream import iter_array_items, DEFAULT_CHUNK_SIZE
 
-# グローバル変数としてアクセストークンとその有効期限を保存
-ACCESS_TOKEN = None
-TOKEN_EXPIRY = 0
+logger = logging.getLogger(__name__)
 
 # AITRIOS APIの基本URL
 BASE_URL = "https://console.aitrios.sony-semicon.com/api/v1"
-PORTAL_URL = "https://auth.aitrios.sony-semicon.com/oauth2/default/v1/token"
+
+# 接続プールの既定値
+DEFAULT_POOL_CONNECTIONS = 2   # ホストごとのプール数（コンソールと認証サーバー）
+DEFAULT_POOL_MAXSIZE = 8       # 1ホストあたりに保持するkeep-alive接続数
+# タイムアウト（接続, 読み込み）の既定値（秒）
+DEFAULT_TIMEOUT = (5, 30)
+
+# エンドポイントごとのタイムアウト（接続, 読み込み）（秒）
+ENDPOINT_TIMEOUTS = {
+    "device_info": (3.05, 5),
+    "image_directories": (3.05, 10),
+    "images": (3.05, 30),
+    "inference_results": (3.05, 20),
+    "inference_control": (3.05, 10),
+}
+
+# 冪等なGETリクエストの最大リトライ回数
+DEFAULT_MAX_RETRIES = 2
+# リトライ対象とするHTTPステータス
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 推論結果をタイムスタンプ（T）で絞り込むためのフィルタ書式
+INFERENCE_FILTER_AFTER = "T > '{timestamp}'"
+INFERENCE_FILTER_BEFORE = "T < '{timestamp}'"
+
+# プール設定ごとに共有するHTTPセッション {(pool_connections, pool_maxsize): [session, 参照数]}
+_shared_sessions = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def acquire_session(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE):
+    """
+    共有HTTPセッションを取得（参照数を加算）
+    
+    同じプール設定のクライアント間でセッションを共有するため、
+    設定変更でクライアントを作り直してもkeep-alive接続が維持される
+    
+    Args:
+        pool_connections (int): ホストごとのプール数
+        pool_maxsize (int): 1プールあたりの最大接続数
+    
+    Returns:
+        requests.Session: 共有セッション
+    """
+    key = (pool_connections, pool_maxsize)
+    with _shared_sessions_lock:
+        entry = _shared_sessions.get(key)
+        if entry is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            entry = [session, 0]
+            _shared_sessions[key] = entry
+        entry[1] += 1
+        return entry[0]
+
+
+def release_session(session):
+    """
+    共有HTTPセッションを解放（参照数が0になったら接続を閉じる）
+    
+    Args:
+        session (requests.Session): acquire_sessionで取得したセッション
+    """
+    with _shared_sessions_lock:
+        for key, entry in list(_shared_sessions.items()):
+            if entry[0] is session:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del _shared_sessions[key]
+                    session.close()
+                return
+
 
 class AITRIOSClient:
     """AITRIOSプラットフォームとの通信を行うクライアントクラス"""
     
     def __init__(self, device_id=settings.DEVICE_ID, client_id=settings.CLIENT_ID, 
-                 client_secret=settings.CLIENT_SECRET):
+                 client_secret=settings.CLIENT_SECRET, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT, endpoint_timeouts=None,
+                 max_retries=DEFAULT_MAX_RETRIES, circuit_breaker=None):
         """
         AITRIOSクライアントの初期化
         
@@ -31,42 +110,207 @@ class AITRIOSClient:
             device_id (str): デバイスID
             client_id (str): クライアントID
             client_secret (str): クライアントシークレット
+            pool_connections (int): ホストごとの接続プール数
+            pool_maxsize (int): 1プールあたりの最大keep-alive接続数
+            timeout (tuple): (接続, 読み込み)タイムアウト秒（認証とその他の既定値）
+            endpoint_timeouts (dict, optional): エンドポイントごとのタイムアウトの上書き
+            max_retries (int): 冪等なGETリクエストの最大リトライ回数
+            circuit_breaker (CircuitBreaker, optional): 使用するサーキットブレーカー
         """
         self.device_id = device_id
         self.client_id = client_id
         self.client_secret = client_secret
+        self.timeout = timeout
+        self.endpoint_timeouts = dict(ENDPOINT_TIMEOUTS, **(endpoint_timeouts or {}))
+        self.max_retries = max_retries
+        
+        # バックエンド障害時にリクエストを遮断するサーキットブレーカー
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        
+        # keep-alive接続を保持する共有セッション
+        self.session = acquire_session(pool_connections, pool_maxsize)
+        
+        # 認証情報ごとに共有されるトークンマネージャー
+        self.token_manager = get_token_manager(client_id, client_secret)
+        
+        # 実行中のリクエスト数（close後も実行中のリクエストが終わるまで参照を解放しない）
+        self._active_requests = 0
+        self._closing = False
+        self._released = False
+        self._close_lock = threading.Lock()
+        
+        # API用ヘッダーはトークンが変わった時のみ組み立て直す
+        self._api_headers = None
+        self._api_headers_token = None
+        
+        # 増分取得用のカーソル（最後に取得した推論結果のタイムスタンプ）
+        self.last_inference_timestamp = None
+        self._inference_cursor_lock = threading.Lock()
+        # サーバー側でのフィルタが使えない場合はクライアント側で絞り込む
+        self._server_filter_supported = True
+    
+    def close(self):
+        """
+        共有セッションとトークンマネージャーの参照を解放する
+        
+        設定変更でクライアントを差し替えた直後は、旧クライアントを捕まえた処理が
+        まだリクエスト中の場合があるため、実行中のリクエストが終わってから解放する
+        """
+        with self._close_lock:
+            self._closing = True
+            if self._active_requests > 0:
+                return
+        self._release()
+    
+    def _release(self):
+        """参照を1回だけ解放する（最後の参照の場合は接続と旧認証情報のバックグラウンド更新も止まる）"""
+        with self._close_lock:
+            if self._released:
+                return
+            self._released = True
+        release_session(self.session)
+        release_token_manager(self.token_manager)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def get_api_headers(self):
+        """
+        API呼び出し用のヘッダーを取得（トークンが変わった時のみ再構築）
+        
+        Returns:
+            dict: リクエストヘッダー
+        """
+        token = self.get_access_token()
+        if token != self._api_headers_token:
+            self._api_headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+            self._api_headers_token = token
+        return self._api_headers
+    
+    def is_available(self):
+        """
+        APIへのリクエストが遮断されていないかどうか
+        
+        Returns:
+            bool: リクエストを送信できる状態ならTrue
+        """
+        return not self.circuit_breaker.is_open()
+    
+    def _request(self, method, endpoint, url, headers=None, params=None, stream=False,
+                 extra_headers=None):
+        """
+        タイムアウト・リトライ・サーキットブレーカーを適用してリクエストを送信
+        
+        GETは冪等なため、接続エラー・タイムアウト・一時的なエラー応答の場合に
+        ジッター付き指数バックオフでリトライする
+        
+        Args:
+            method (str): HTTPメソッド
+            endpoint (str): タイムアウト設定のキー
+            url (str): リクエストURL
+            headers (dict, optional): リクエストヘッダー（省略時はAPI用ヘッダー）
+            params (dict, optional): クエリパラメータ
+            stream (bool): Trueの場合は本文を読み込まずにレスポンスを返す
+            extra_headers (dict, optional): API用ヘッダーに追加するヘッダー
+        
+        Returns:
+            requests.Response: レスポンス
+        """
+        with self._close_lock:
+            self._active_requests += 1
+        try:
+            return self._send_request(method, endpoint, url, headers, params, stream, extra_headers)
+        finally:
+            with self._close_lock:
+                self._active_requests -= 1
+                release = self._closing and self._active_requests == 0
+            if release:
+                # close済みの場合は最後のリクエストの完了時に参照を解放する
+                self._release()
+    
+    def _send_request(self, method, endpoint, url, headers, params, stream, extra_headers):
+        """
+        _requestの本体（引数は_requestと同じ）
+        
+        Returns:
+            requests.Response: レスポンス
+        """
+        # 遮断中は認証サーバーへの問い合わせも行わない
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(self.circuit_breaker.retry_after())
+        
+        # API用ヘッダーの場合は401でトークンを取り直して1回だけ再送する
+        reauthenticate = headers is None
+        if headers is None:
+            headers = self._build_api_headers(extra_headers)
+        
+        timeout = self.endpoint_timeouts.get(endpoint, self.timeout)
+        retries = self.max_retries if method == "GET" else 0
+        
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, headers=headers, params=params,
+                                                timeout=timeout, stream=stream)
+                if response.status_code == 401 and reauthenticate:
+                    reauthenticate = False
+                    response.close()
+                    logger.info("トークンが拒否されたため取り直します")
+                    self.token_manager.invalidate(headers["Authorization"][len("Bearer "):])
+                    headers = self._build_api_headers(extra_headers)
+                    continue
+                if response.status_code not in RETRY_STATUS_CODES:
+                    self.circuit_breaker.record_success()
+                    return response
+                if attempt >= retries:
+                    self.circuit_breaker.record_failure()
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    self.circuit_breaker.record_failure()
+                    raise
+            except requests.RequestException:
+                self.circuit_breaker.record_failure()
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+    
+    def _build_api_headers(self, extra_headers=None):
+        """
+        リクエスト用のAPIヘッダーを作成（トークン取得の失敗はサーキットブレーカーに記録する）
+        
+        Args:
+            extra_headers (dict, optional): 追加するヘッダー
+        
+        Returns:
+            dict: ヘッダー
+        """
+        try:
+            headers = self.get_api_headers()
+        except Exception:
+            # 試行の枠を確保したままにしないよう、トークン取得の失敗も失敗として記録する
+            self.circuit_breaker.record_failure()
+            raise
+        if extra_headers:
+            headers = dict(headers, **extra_headers)
+        return headers
     
     def get_access_token(self):
         """
         APIアクセストークンを取得する
         
+        トークンは認証情報ごとにキャッシュされ、有効期限前にバックグラウンドで更新される
+        
         Returns:
             str: アクセストークン
         """
-        global ACCESS_TOKEN, TOKEN_EXPIRY
-        current_time = time.time()
-        
-        # トークンが存在せず、または有効期限が切れている場合、新しいトークンを取得
-        if ACCESS_TOKEN is None or current_time >= TOKEN_EXPIRY:
-            auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
-            headers = {
-                "Authorization": f"Basic {auth}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            data = {
-                "grant_type": "client_credentials",
-                "scope": "system"
-            }
-            response = requests.post(PORTAL_URL, headers=headers, data=data)
-            if response.status_code == 200:
-                token_data = response.json()
-                ACCESS_TOKEN = token_data["access_token"]
-                # トークンの有効期限を設定（念のため10秒早めに期限切れとする）
-                TOKEN_EXPIRY = current_time + token_data.get("expires_in", 3600) - 10
-            else:
-                raise Exception(f"Failed to obtain access token: {response.text}")
-        
-        return ACCESS_TOKEN
+        return self.token_manager.get_token(self.session, self.timeout)
     
     def get_device_info(self):
         """
@@ -75,18 +319,57 @@ class AITRIOSClient:
         Returns:
             dict: デバイス情報
         """
-        headers = {
-            "Authorization": f"Bearer {self.get_access_token()}",
-            "Content-Type": "application/json"
-        }
         url = f"{BASE_URL}/devices/{self.device_id}"
-        response = requests.get(url, headers=headers)
+        response = self._request("GET", "device_info", url)
         
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Failed to get device info: {response.status_code} - {response.text}")
     
+    def get_device_info_conditional(self, etag=None):
+        """
+        デバイスの情報を条件付きで取得（ETag / If-None-Match）
+        
+        Args:
+            etag (str, optional): 前回取得時のETag
+        
+        Returns:
+            tuple: (デバイス情報, ETag)
+            変更がない場合（304 Not Modified）はデバイス情報がNoneとなる
+        """
+        extra_headers = {"If-None-Match": etag} if etag else None
+        url = f"{BASE_URL}/devices/{self.device_id}"
+        response = self._request("GET", "device_info", url, extra_headers=extra_headers)
+        
+        if response.status_code == 304:
+            return None, etag
+        elif response.status_code == 200:
+            return response.json(), response.headers.get("ETag")
+        else:
+            raise Exception(f"Failed to get device info: {response.status_code} - {response.text}")
+    
+    @staticmethod
+    def parse_connection_state(device_info):
+        """
+        デバイス情報から接続状態と動作状態を取り出す
+        
+        Args:
+            device_info (dict): デバイス情報
+        
+        Returns:
+            tuple: (接続状態, 動作状態)
+        """
+        # 接続状態の取得
+        connection_state = device_info.get("connectionState", "Unknown")
+        
+        # 動作状態の取得（階層構造からの抽出）
+        state = device_info.get("state", {})
+        status = state.get("Status", {})
+        operation_state = status.get("ApplicationProcessor", "Unknown")
+        
+        return connection_state, operation_state
+    
     def get_connection_state(self):
         """
         デバイスの接続状態を取得
@@ -98,18 +381,12 @@ class AITRIOSClient:
         """
         try:
             device_info = self.get_device_info()
-            
-            # 接続状態の取得
-            connection_state = device_info.get("connectionState", "Unknown")
-            
-            # 動作状態の取得（階層構造からの抽出）
-            state = device_info.get("state", {})
-            status = state.get("Status", {})
-            operation_state = status.get("ApplicationProcessor", "Unknown")
-            
-            return connection_state, operation_state
+            return self.parse_connection_state(device_info)
+        except CircuitOpenError:
+            # 遮断中はエラー出力を繰り返さずに即座に返す
+            return "Unknown", "Unknown"
         except Exception as e:
-            print(f"Error getting connection state: {str(e)}")
+            logger.warning("デバイス状態の取得に失敗しました: %s", e)
             return "Unknown", "Unknown"
     
     def get_image_directories(self):
@@ -119,14 +396,10 @@ class AITRIOSClient:
         Returns:
             dict: 画像ディレクトリ情報
         """
-        headers = {
-            "Authorization": f"Bearer {self.get_access_token()}",
-            "Content-Type": "application/json"
-        }
         url = f"{BASE_URL}/devices/images/directories"
         params = {"device_id": self.device_id}
-        response = requests.get(url, headers=headers, params=params)
-        print("response=", response.status_code)
+        response = self._request("GET", "image_directories", url, params=params)
+        logger.debug("画像ディレクトリ取得: status=%s", response.status_code)
         return response.json()
     
     def get_images(self, sub_directory_name, file_name=None):
@@ -140,31 +413,23 @@ class AITRIOSClient:
         Returns:
             dict: 画像データを含むレスポンス
         """
-        headers = {
-            "Authorization": f"Bearer {self.get_access_token()}",
-            "Content-Type": "application/json"
-        }
         url = f"{BASE_URL}/devices/{self.device_id}/images/directories/{sub_directory_name}"
         params = {"order_by": "DESC", "number_of_images": 1}  # 最新の画像を1つだけ取得
-        response = requests.get(url, headers=headers, params=params)
+        response = self._request("GET", "images", url, params=params)
         return response.json()
     
-    def get_inference_results(self, number_of_inference_results=5, filter=None):
+    @staticmethod
+    def _inference_results_params(number_of_inference_results, filter=None):
         """
-        デバイスの推論結果を取得
+        推論結果取得のクエリパラメータを作成
         
         Args:
             number_of_inference_results (int): 取得する推論結果の数
             filter (str, optional): フィルタ条件
         
         Returns:
-            dict: 推論結果
+            dict: クエリパラメータ
         """
-        headers = {
-            "Authorization": f"Bearer {self.get_access_token()}",
-            "Content-Type": "application/json"
-        }
-        url = f"{BASE_URL}/devices/{self.device_id}/inferenceresults"
         params = {
             "NumberOfInferenceresults": number_of_inference_results,
             "raw": 1,
@@ -172,10 +437,223 @@ class AITRIOSClient:
         }
         if filter:
             params["filter"] = filter
+        return params
+    
+    def get_inference_results(self, number_of_inference_results=5, filter=None):
+        """
+        デバイスの推論結果を取得
+        
+        Args:
+            number_of_inference_results (int): 取得する推論結果の数
+            filter (str, optional): フィルタ条件
+        
+        Returns:
+            dict: 推論結果
+        """
+        url = f"{BASE_URL}/devices/{self.device_id}/inferenceresults"
+        params = self._inference_results_params(number_of_inference_results, filter)
         
-        response = requests.get(url, headers=headers, params=params)
+        response = self._request("GET", "inference_results", url, params=params)
         return response.json()
+    
+    @staticmethod
+    def _is_filter_rejected(response):
+        """
+        filterパラメータが受け付けられなかったことを示す応答かどうか
+        
+        一時的なエラー（429や5xxなど）ではなく、400でfilterに言及している場合のみTrue
+        
+        Args:
+            response (requests.Response): レスポンス
+        
+        Returns:
+            bool: filterが拒否された場合True
+        """
+        if response.status_code != 400:
+            return False
+        return "filter" in response.text.lower()
+    
+    def iter_inference_results_stream(self, number_of_inference_results=10, filter=None):
+        """
+        推論結果を本文の受信と並行して1件ずつ返すジェネレータ
+        
+        各レコードはJSONテキストのまま返すため、不要なレコードは
+        Pythonオブジェクトに変換せずに読み飛ばせる。途中で閉じると残りの本文は読み込まない
+        
+        Args:
+            number_of_inference_results (int): 取得する推論結果の数
+            filter (str, optional): フィルタ条件
+        
+        Yields:
+            str: 推論結果レコードのJSONテキスト
+        """
+        url = f"{BASE_URL}/devices/{self.device_id}/inferenceresults"
+        params = self._inference_results_params(number_of_inference_results, filter)
+        
+        response = self._request("GET", "inference_results", url, params=params, stream=True)
+        try:
+            if response.status_code != 200:
+                return
+            yield from iter_array_items(response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE))
+        finally:
+            response.close()
+    
+    def find_inference_by_timestamp(self, timestamp, number_of_inference_results=10):
+        """
+        指定したタイムスタンプ（T）の推論結果をストリーム解析で探す
+        
+        見つかった時点で受信を打ち切り、Tを含まないレコードはデコードしない
         
+        Args:
+            timestamp (str): 探すタイムスタンプ
+            number_of_inference_results (int): 遡って探す推論結果の数
+        
+        Returns:
+            dict: 一致した推論結果（Inferencesの要素）、見つからない場合はNone
+        """
+        needle = f'"{timestamp}"'
+        records = self.iter_inference_results_stream(number_of_inference_results)
+        try:
+            for text in records:
+                # Tの値が含まれないレコードはデコードせずに読み飛ばす
+                if needle not in text:
+                    continue
+                result = json.loads(text)
+                for inference in result.get("inference_result", {}).get("Inferences", []):
+                    if inference.get("T") == timestamp:
+                        return inference
+        except ValueError:
+            # 配列以外（エラー応答など）の場合
+            return None
+        finally:
+            records.close()
+        return None
+    
+    @staticmethod
+    def get_result_timestamp(result):
+        """
+        推論結果レコードのタイムスタンプ（Inferences内の最大のT）を取得
+        
+        Args:
+            result (dict): 推論結果レコード
+        
+        Returns:
+            str: タイムスタンプ（存在しない場合はNone）
+        """
+        inferences = result.get("inference_result", {}).get("Inferences", [])
+        timestamps = [inference["T"] for inference in inferences if "T" in inference]
+        return max(timestamps) if timestamps else None
+    
+    def _get_filtered_inference_results(self, number_of_inference_results, filter):
+        """
+        フィルタ付きで推論結果を取得（サーバーが受け付けない場合はフィルタなしで再取得）
+        
+        Returns:
+            list: 推論結果のリスト
+        """
+        if filter and self._server_filter_supported:
+            url = f"{BASE_URL}/devices/{self.device_id}/inferenceresults"
+            params = self._inference_results_params(number_of_inference_results, filter)
+            response = self._request("GET", "inference_results", url, params=params)
+            if response.status_code == 200:
+                try:
+                    results = response.json()
+                except ValueError:
+                    results = None
+                if isinstance(results, list):
+                    return results
+            if not self._is_filter_rejected(response):
+                # 一時的なエラーの場合は次回の呼び出しでフィルタ付きの取得をやり直す
+                logger.warning("フィルタ付きの推論結果の取得に失敗しました: %s", response.status_code)
+                return []
+            # フィルタが拒否された場合は以後クライアント側で絞り込む
+            logger.info("サーバーがfilterパラメータを受け付けないため、クライアント側で絞り込みます")
+            self._server_filter_supported = False
+        results = self.get_inference_results(number_of_inference_results)
+        return results if isinstance(results, list) else []
+    
+    def get_new_inference_results(self, max_results=10):
+        """
+        前回の取得以降に追加された推論結果のみを取得
+        
+        最後に取得したタイムスタンプを記憶し、filterパラメータで新しい結果だけを要求する
+        
+        Args:
+            max_results (int): 1回に取得する推論結果の最大数
+        
+        Returns:
+            list: 新しい推論結果のリスト（新しい順）
+        """
+        with self._inference_cursor_lock:
+            last_timestamp = self.last_inference_timestamp
+            filter = None
+            if last_timestamp:
+                filter = INFERENCE_FILTER_AFTER.format(timestamp=last_timestamp)
+            
+            results = self._get_filtered_inference_results(max_results, filter)
+            
+            # サーバー側で絞り込まれていない場合に備えて既知の結果を除外
+            new_results = []
+            for result in results:
+                timestamp = self.get_result_timestamp(result)
+                if timestamp is None:
+                    continue
+                if last_timestamp is None or timestamp > last_timestamp:
+                    new_results.append(result)
+            
+            if new_results:
+                self.last_inference_timestamp = max(
+                    self.get_result_timestamp(result) for result in new_results
+                )
+            return new_results
+    
+    def reset_inference_cursor(self, timestamp=None):
+        """
+        増分取得のカーソルをリセット
+        
+        Args:
+            timestamp (str, optional): この時刻より後の結果から取得する（省略時は最新から）
+        """
+        with self._inference_cursor_lock:
+            self.last_inference_timestamp = timestamp
+    
+    def iter_inference_results(self, page_size=10, before=None, max_results=None):
+        """
+        推論結果を新しい順にページ単位で遅延取得するジェネレータ
+        
+        Args:
+            page_size (int): 1回のリクエストで取得する件数
+            before (str, optional): この時刻より古い結果から取得を開始
+            max_results (int, optional): 取得する最大件数
+        
+        Yields:
+            dict: 推論結果レコード
+        """
+        count = 0
+        while max_results is None or count < max_results:
+            filter = INFERENCE_FILTER_BEFORE.format(timestamp=before) if before else None
+            if filter and not self._server_filter_supported:
+                # サーバー側で絞り込めない場合はそれ以上遡れない
+                return
+            
+            page = self._get_filtered_inference_results(page_size, filter)
+            page_oldest = None
+            for result in page:
+                timestamp = self.get_result_timestamp(result)
+                if timestamp is None or (before is not None and timestamp >= before):
+                    continue
+                yield result
+                count += 1
+                if page_oldest is None or timestamp < page_oldest:
+                    page_oldest = timestamp
+                if max_results is not None and count >= max_results:
+                    return
+            
+            # 新しい結果がない、または最後のページの場合は終了
+            if page_oldest is None or len(page) < page_size:
+                return
+            before = page_oldest
+    
     def start_inference(self):
         """
         デバイスの推論処理を開始する
@@ -183,12 +661,8 @@ class AITRIOSClient:
         Returns:
             dict: APIレスポンス
         """
-        headers = {
-            "Authorization": f"Bearer {self.get_access_token()}",
-            "Content-Type": "application/json"
-        }
         url = f"{BASE_URL}/devices/{self.device_id}/inferenceresults/collectstart"
-        response = requests.post(url, headers=headers)
+        response = self._request("POST", "inference_control", url)
         
         if response.status_code == 200:
             return response.json()
@@ -202,12 +676,8 @@ class AITRIOSClient:
         Returns:
             dict: APIレスポンス
         """
-        headers = {
-            "Authorization": f"Bearer {self.get_access_token()}",
-            "Content-Type": "application/json"
-        }
         url = f"{BASE_URL}/devices/{self.device_id}/inferenceresults/collectstop"
-        response = requests.post(url, headers=headers)
+        response = self._request("POST", "inference_control", url)
         
         if response.status_code == 200:
             return response.json()
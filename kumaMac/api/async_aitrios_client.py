@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+非同期AITRIOS APIクライアント
+asyncioからAITRIOSの各エンドポイントを並行して呼び出すためのモジュール
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from kumaMac.api.aitrios_client import AITRIOSClient
+
+# 同時に実行するリクエストの既定の上限
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class AsyncAITRIOSClient:
+    """AITRIOSClientと同じ操作をコルーチンとして提供するクライアントクラス"""
+    
+    def __init__(self, client=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, **client_kwargs):
+        """
+        非同期クライアントの初期化
+        
+        既存のAITRIOSClientを渡した場合は、そのセッション・トークン・推論結果カーソルを共有する
+        
+        Args:
+            client (AITRIOSClient, optional): 共有する同期クライアント
+            max_concurrency (int): 同時に実行するリクエストの上限
+            **client_kwargs: clientを省略した場合にAITRIOSClientへ渡す引数
+        """
+        self._owns_client = client is None
+        self.client = client if client is not None else AITRIOSClient(**client_kwargs)
+        self.max_concurrency = max_concurrency
+        
+        # 通信はkeep-aliveセッション上のブロッキングI/Oなので専用スレッドで実行する
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="aitrios-async")
+        self._semaphore = None
+        self._semaphore_loop = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self, cancel_pending=True):
+        """
+        スレッドを終了する（実行中のリクエストの完了は待たない）
+        
+        Args:
+            cancel_pending (bool): 未実行のリクエストを取り消すかどうか
+                （Falseの場合は受け付け済みのリクエストを実行してから終了する）
+        """
+        self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+        if self._owns_client:
+            self.client.close()
+    
+    def _get_semaphore(self):
+        """
+        現在のイベントループ用の同時実行数制限を取得
+        
+        Returns:
+            asyncio.Semaphore: 同時実行数を制限するセマフォ
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _run(self, func, *args, **kwargs):
+        """
+        同期クライアントのメソッドをスレッドで実行して結果を待つ
+        
+        呼び出し元のタスクがキャンセルされた場合、未開始のリクエストは実行されない
+        
+        Args:
+            func (function): 実行するメソッド
+        """
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def get_access_token(self):
+        """
+        APIアクセストークンを取得する
+        
+        Returns:
+            str: アクセストークン
+        """
+        return await self._run(self.client.get_access_token)
+    
+    async def get_device_info(self):
+        """
+        デバイスの情報を取得
+        
+        Returns:
+            dict: デバイス情報
+        """
+        return await self._run(self.client.get_device_info)
+    
+    async def get_connection_state(self):
+        """
+        デバイスの接続状態を取得
+        
+        Returns:
+            tuple: (接続状態, 動作状態)
+        """
+        return await self._run(self.client.get_connection_state)
+    
+    async def get_image_directories(self):
+        """
+        デバイスの画像ディレクトリ一覧を取得
+        
+        Returns:
+            dict: 画像ディレクトリ情報
+        """
+        return await self._run(self.client.get_image_directories)
+    
+    async def get_images(self, sub_directory_name, file_name=None):
+        """
+        指定したサブディレクトリから画像を取得
+        
+        Args:
+            sub_directory_name (str): サブディレクトリ名
+            file_name (str, optional): ファイル名
+        
+        Returns:
+            dict: 画像データを含むレスポンス
+        """
+        return await self._run(self.client.get_images, sub_directory_name, file_name)
+    
+    async def get_inference_results(self, number_of_inference_results=5, filter=None):
+        """
+        デバイスの推論結果を取得
+        
+        Args:
+            number_of_inference_results (int): 取得する推論結果の数
+            filter (str, optional): フィルタ条件
+        
+        Returns:
+            dict: 推論結果
+        """
+        return await self._run(self.client.get_inference_results, number_of_inference_results, filter)
+    
+    async def get_new_inference_results(self, max_results=10):
+        """
+        前回の取得以降に追加された推論結果のみを取得
+        
+        Args:
+            max_results (int): 1回に取得する推論結果の最大数
+        
+        Returns:
+            list: 新しい推論結果のリスト（新しい順）
+        """
+        return await self._run(self.client.get_new_inference_results, max_results)
+    
+    async def find_inference_by_timestamp(self, timestamp, number_of_inference_results=10):
+        """
+        指定したタイムスタンプ（T）の推論結果をストリーム解析で探す
+        
+        Args:
+            timestamp (str): 探すタイムスタンプ
+            number_of_inference_results (int): 遡って探す推論結果の数
+        
+        Returns:
+            dict: 一致した推論結果（Inferencesの要素）、見つからない場合はNone
+        """
+        return await self._run(self.client.find_inference_by_timestamp, timestamp, number_of_inference_results)
+    
+    async def start_inference(self):
+        """
+        デバイスの推論処理を開始する
+        
+        Returns:
+            dict: APIレスポンス
+        """
+        return await self._run(self.client.start_inference)
+    
+    async def stop_inference(self):
+        """
+        デバイスの推論処理を停止する
+        
+        Returns:
+            dict: APIレスポンス
+        """
+        return await self._run(self.client.stop_inference)
+    
+    async def get_image_and_new_inference_results(self, sub_directory_name, max_results=10):
+        """
+        最新画像と新しい推論結果を並行して取得
+        
+        Args:
+            sub_directory_name (str): サブディレクトリ名
+            max_results (int): 1回に取得する推論結果の最大数
+        
+        Returns:
+            tuple: (画像データを含むレスポンス, 新しい推論結果のリスト)
+        """
+        return await asyncio.gather(
+            self.get_images(sub_directory_name),
+            self.get_new_inference_results(max_results)
+        )
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JSONストリーム解析モジュール
+レスポンス本文を読みながらトップレベル配列の要素を1つずつ切り出す
+"""
+
+import re
+import codecs
+
+# 文字列リテラルと括弧だけを拾う（文字列の中身はC実装の正規表現で読み飛ばす）
+# 閉じ引用符がない場合はグループ1がNoneとなり、文字列が途中で切れていることを示す
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*(")?|[\[\]{}]', re.DOTALL)
+
+# 1回に読み込むバイト数
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_array_items(chunks):
+    """
+    JSON配列の各要素（オブジェクトまたは配列）のテキストを順に返すジェネレータ
+    
+    要素のテキストを切り出すだけでPythonオブジェクトには変換しないため、
+    呼び出し側は必要な要素だけをjson.loadsできる。途中でジェネレータを閉じれば
+    残りの本文は読み込まれない
+    
+    Args:
+        chunks (iterable): バイト列のチャンク（response.iter_contentなど）
+    
+    Yields:
+        str: 配列要素のJSONテキスト
+    
+    Raises:
+        ValueError: 本文がJSON配列でない場合
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    depth = 0
+    start = None
+    started = False
+    
+    for chunk in _with_final_flush(chunks, decoder):
+        buf += chunk
+        
+        if not started:
+            stripped = buf.lstrip()
+            if not stripped:
+                continue
+            if stripped[0] != "[":
+                raise ValueError("response body is not a JSON array")
+            pos = buf.index("[") + 1
+            depth = 1
+            started = True
+        
+        while True:
+            match = _TOKEN_RE.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            
+            token = match.group()
+            if token[0] == '"':
+                if match.group(1) is None:
+                    # 文字列が途中で切れているので続きを待つ
+                    pos = match.start()
+                    break
+            elif token in "[{":
+                if depth == 1:
+                    start = match.start()
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 1:
+                    yield buf[start:match.end()]
+                    start = None
+                elif depth == 0:
+                    # 配列の終端
+                    return
+            pos = match.end()
+        
+        # 処理済みの部分をバッファから取り除く
+        keep_from = pos if start is None else start
+        buf = buf[keep_from:]
+        pos -= keep_from
+        if start is not None:
+            start = 0
+    
+    if started:
+        raise ValueError("unexpected end of JSON array")
+
+
+def _with_final_flush(chunks, decoder):
+    """
+    バイト列のチャンクを文字列にデコードして返す（マルチバイト文字の分割に対応）
+    
+    Args:
+        chunks (iterable): バイト列のチャンク
+        decoder: インクリメンタルデコーダー
+    
+    Yields:
+        str: デコードされた文字列
+    """
+    for chunk in chunks:
+        if chunk:
+            yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+通信の耐障害性モジュール
+リトライ（指数バックオフ＋ジッター）とサーキットブレーカーを提供する
+"""
+
+import logging
+import time
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+# サーキットブレーカーの状態
+STATE_CLOSED = "closed"        # 正常（リクエストを通す）
+STATE_OPEN = "open"            # 遮断中（リクエストを即座に失敗させる）
+STATE_HALF_OPEN = "half_open"  # 試行中（1件だけ通して回復を確認する）
+
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが遮断中のため、リクエストを送信しなかったことを示す例外"""
+    
+    def __init__(self, retry_after):
+        """
+        Args:
+            retry_after (float): 次に試行できるまでの秒数
+        """
+        super().__init__(f"AITRIOS API is unavailable (retry after {retry_after:.1f}s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """連続した失敗を検知してバックエンドへのリクエストを一時的に遮断するクラス"""
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        サーキットブレーカーの初期化
+        
+        Args:
+            failure_threshold (int): 遮断するまでの連続失敗回数
+            reset_timeout (float): 遮断してから試行を再開するまでの秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._listeners = []
+    
+    @property
+    def state(self):
+        """現在の状態（遮断時間が経過していれば試行中として扱う）"""
+        with self._lock:
+            if self._state == STATE_OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                return STATE_HALF_OPEN
+            return self._state
+    
+    def is_open(self):
+        """
+        リクエストが遮断されている状態かどうか（状態は変更しない）
+        
+        Returns:
+            bool: 遮断中の場合True
+        """
+        return self.state == STATE_OPEN
+    
+    def retry_after(self):
+        """
+        次にリクエストを試行できるまでの秒数
+        
+        Returns:
+            float: 秒数（遮断中でなければ0）
+        """
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.time() - self._opened_at))
+    
+    def add_listener(self, callback):
+        """
+        状態変化の通知先を登録
+        
+        Args:
+            callback (function): callback(新しい状態)
+        """
+        self._listeners.append(callback)
+    
+    def allow_request(self):
+        """
+        リクエストの送信可否を判定
+        
+        遮断時間が経過していれば1件だけ試行を許可する
+        
+        Returns:
+            bool: 送信してよい場合True
+        """
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN:
+                if time.time() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = STATE_HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        """リクエストの成功を記録"""
+        with self._lock:
+            changed = self._state != STATE_CLOSED
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+        if changed:
+            self._notify(STATE_CLOSED)
+    
+    def record_failure(self):
+        """リクエストの失敗を記録"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            opened = False
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                opened = self._state != STATE_OPEN
+                self._state = STATE_OPEN
+                self._opened_at = time.time()
+        if opened:
+            self._notify(STATE_OPEN)
+    
+    def _notify(self, state):
+        """登録された通知先に状態変化を伝える"""
+        for callback in list(self._listeners):
+            try:
+                callback(state)
+            except Exception as e:
+                logger.exception("サーキットブレーカーの通知先でエラーが発生しました: %s", e)
+
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=8.0):
+    """
+    指数バックオフの待ち時間を計算（フルジッター）
+    
+    Args:
+        attempt (int): 試行回数（0始まり）
+        base_delay (float): 基準となる待ち時間（秒）
+        max_delay (float): 待ち時間の上限（秒）
+    
+    Returns:
+        float: 待ち時間（秒）
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+アクセストークン管理モジュール
+認証情報ごとにAITRIOSのアクセストークンをキャッシュし、期限前に自動更新する
+"""
+
+import logging
+import time
+import base64
+import hashlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 認証サーバーのURL
+PORTAL_URL = "https://auth.aitrios.sony-semicon.com/oauth2/default/v1/token"
+
+# 有効期限の何秒前に期限切れとみなすか
+EXPIRY_MARGIN = 10
+# 有効期限の何秒前にバックグラウンド更新を行うか
+REFRESH_AHEAD = 120
+# バックグラウンド更新に失敗した場合の再試行間隔（秒）
+REFRESH_RETRY_INTERVAL = 15
+
+# 認証情報ごとのトークンマネージャー {(client_id, secretのハッシュ): [TokenManager, 参照数]}
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(client_id, client_secret):
+    """
+    認証情報に対応するトークンマネージャーを取得（参照数を加算）
+    
+    使い終わったらrelease_token_managerで解放すること
+    
+    Args:
+        client_id (str): クライアントID
+        client_secret (str): クライアントシークレット
+    
+    Returns:
+        TokenManager: 認証情報ごとに共有されるトークンマネージャー
+    """
+    secret_hash = hashlib.sha256(client_secret.encode()).hexdigest()
+    key = (client_id, secret_hash)
+    with _managers_lock:
+        entry = _managers.get(key)
+        if entry is None:
+            entry = [TokenManager(client_id, client_secret), 0]
+            _managers[key] = entry
+        entry[1] += 1
+        return entry[0]
+
+
+def release_token_manager(manager):
+    """
+    トークンマネージャーを解放（参照数が0になったらバックグラウンド更新を止めて破棄する）
+    
+    Args:
+        manager (TokenManager): get_token_managerで取得したトークンマネージャー
+    """
+    with _managers_lock:
+        for key, entry in list(_managers.items()):
+            if entry[0] is manager:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del _managers[key]
+                    manager.close()
+                return
+
+
+class TokenManager:
+    """1組の認証情報に対するアクセストークンのキャッシュと更新を管理するクラス"""
+    
+    def __init__(self, client_id, client_secret):
+        """
+        トークンマネージャーの初期化
+        
+        Args:
+            client_id (str): クライアントID
+            client_secret (str): クライアントシークレット
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        
+        self._token = None
+        self._expiry = 0
+        self._refreshing = False
+        self._condition = threading.Condition()
+        self._refresh_timer = None
+        self._closed = False
+        
+        # バックグラウンド更新で使用する最後のセッションとタイムアウト
+        self._session = None
+        self._timeout = None
+        
+        auth = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+        self._headers = {
+            "Authorization": f"Basic {auth}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+    
+    def get_token(self, session, timeout=None):
+        """
+        有効なアクセストークンを取得
+        
+        期限切れの場合は1つのスレッドだけが認証サーバーへ問い合わせ、
+        他の呼び出し元はその結果を待つ
+        
+        Args:
+            session (requests.Session): 通信に使用するセッション
+            timeout (tuple, optional): (接続, 読み込み)タイムアウト秒
+        
+        Returns:
+            str: アクセストークン
+        """
+        with self._condition:
+            self._session = session
+            self._timeout = timeout
+            while True:
+                if self._token is not None and time.time() < self._expiry:
+                    return self._token
+                if not self._refreshing:
+                    self._refreshing = True
+                    break
+                # 他のスレッドの更新完了を待つ
+                self._condition.wait()
+        
+        return self._refresh(session, timeout)
+    
+    def invalidate(self, token=None):
+        """
+        キャッシュされたトークンを破棄する（401応答時など）
+        
+        Args:
+            token (str, optional): 拒否されたトークン（既に更新済みの場合は破棄しない）
+        """
+        with self._condition:
+            if token is not None and token != self._token:
+                return
+            self._token = None
+            self._expiry = 0
+    
+    def close(self):
+        """バックグラウンド更新を停止する（以後の取得は呼び出し時にのみ行う）"""
+        with self._condition:
+            self._closed = True
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+    
+    def _refresh(self, session, timeout):
+        """
+        認証サーバーからトークンを取得してキャッシュを更新
+        （呼び出し前に_refreshingをTrueにしておくこと）
+        
+        Returns:
+            str: 新しいアクセストークン
+        """
+        try:
+            token, expires_in = self._request_token(session, timeout)
+        except Exception:
+            with self._condition:
+                self._refreshing = False
+                self._condition.notify_all()
+            raise
+        
+        with self._condition:
+            self._token = token
+            self._expiry = time.time() + expires_in - EXPIRY_MARGIN
+            self._refreshing = False
+            self._condition.notify_all()
+            self._schedule_refresh(expires_in - REFRESH_AHEAD)
+        return token
+    
+    def _request_token(self, session, timeout):
+        """
+        認証サーバーにトークンを要求
+        
+        Returns:
+            tuple: (アクセストークン, 有効期間秒)
+        """
+        data = {
+            "grant_type": "client_credentials",
+            "scope": "system"
+        }
+        response = session.post(PORTAL_URL, headers=self._headers, data=data, timeout=timeout)
+        if response.status_code == 200:
+            token_data = response.json()
+            return token_data["access_token"], token_data.get("expires_in", 3600)
+        raise Exception(f"Failed to obtain access token: {response.text}")
+    
+    def _schedule_refresh(self, delay):
+        """
+        バックグラウンド更新を予約（_conditionを保持した状態で呼び出すこと）
+        
+        Args:
+            delay (float): 更新までの秒数
+        """
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        if self._closed:
+            return
+        self._refresh_timer = threading.Timer(max(delay, 1), self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+    
+    def _background_refresh(self):
+        """期限切れ前にトークンを更新する（タイマースレッドから呼ばれる）"""
+        with self._condition:
+            if self._closed or self._refreshing or self._session is None:
+                return
+            self._refreshing = True
+            session = self._session
+            timeout = self._timeout
+        
+        try:
+            self._refresh(session, timeout)
+        except Exception as e:
+            logger.warning("バックグラウンドでのトークン更新に失敗しました: %s", e)
+            # 現在のトークンが有効な間は再試行を続ける
+            with self._condition:
+                if time.time() < self._expiry:
+                    self._schedule_refresh(REFRESH_RETRY_INTERVAL)
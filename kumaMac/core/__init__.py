@@ -2,9 +2,22 @@
 コアロジックモジュール
 
 アプリケーションのコア機能を提供するモジュール
+（各モジュールは公開名が最初に参照されたときに読み込む）
 """
 
-from .detection_processor import DetectionProcessor
-from .settings_manager import SettingsManager
+from kumaMac.utils.lazy_import import lazy_exports
 
-__all__ = ['DetectionProcessor', 'SettingsManager']
\ No newline at end of file
+_EXPORTS = {
+    'DetectionProcessor': '.detection_processor',
+    'SettingsManager': '.settings_manager',
+    'DeviceStateService': '.device_state_service',
+    'DetectionFilter': '.detection_decoder',
+    'register_decoder': '.output_decoders', 'get_decoder': '.output_decoders',
+    'available_output_types': '.output_decoders',
+    'Pipeline': '.pipeline', 'LatestQueue': '.pipeline'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = ['DetectionProcessor', 'SettingsManager', 'DeviceStateService', 'DetectionFilter',
+           'register_decoder', 'get_decoder', 'available_output_types', 'Pipeline', 'LatestQueue']
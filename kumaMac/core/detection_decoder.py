@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+検出結果デコーダーモジュール
+ObjectDetectionTopのFlatBuffersデータを構造化NumPy配列に変換する
+"""
+
+import struct
+import numpy as np
+import flatbuffers
+from flatbuffers.table import Table
+
+# 検出結果1件分のレイアウト
+DETECTION_DTYPE = np.dtype([
+    ("class_id", "<u4"),
+    ("score", "<f4"),
+    ("left", "<i4"),
+    ("top", "<i4"),
+    ("right", "<i4"),
+    ("bottom", "<i4"),
+])
+
+# BoundingBoxユニオンの種類（BoundingBox.BoundingBox2d）
+BOUNDING_BOX_2D = 1
+
+# vtableの読み込みに使用するstruct
+_U16 = struct.Struct("<H")
+_I32 = struct.Struct("<i")
+
+# 各テーブルのvtable上のフィールド位置（4 + 2 * フィールド番号）
+# ObjectDetectionTop / ObjectDetectionData
+VT_PERCEPTION = 4
+VT_OBJECT_DETECTION_LIST = 4
+# GeneralObject
+VT_CLASS_ID = 4
+VT_BOUNDING_BOX_TYPE = 6
+VT_BOUNDING_BOX = 8
+VT_SCORE = 10
+# BoundingBox2d
+VT_LEFT = 4
+VT_TOP = 6
+VT_RIGHT = 8
+VT_BOTTOM = 10
+
+
+class DetectionFilter:
+    """
+    デコード時に適用する検出結果の絞り込み条件
+    
+    クラスIDとスコアはBoundingBox2dテーブルより先に読み込むため、
+    条件を満たさない検出は座標の読み込みと結果の生成を省略できる
+    """
+    
+    def __init__(self, min_score=0.0, class_min_scores=None, allowed_classes=None):
+        """
+        絞り込み条件の初期化
+        
+        Args:
+            min_score (float): 全クラス共通のスコアの下限
+            class_min_scores (dict, optional): {クラスID: スコアの下限}（共通の下限より優先）
+            allowed_classes (iterable, optional): 対象とするクラスIDの集合（Noneの場合は全クラス）
+        """
+        # スコアはfloat32で格納されているため、しきい値もfloat32に丸めて比較する
+        self.min_score = float(np.float32(min_score))
+        self.class_min_scores = {int(class_id): float(np.float32(score))
+                                 for class_id, score in (class_min_scores or {}).items()}
+        self.allowed_classes = None if allowed_classes is None else frozenset(int(c) for c in allowed_classes)
+        self._allowed_array = None
+        if self.allowed_classes is not None:
+            self._allowed_array = np.fromiter(self.allowed_classes, dtype=np.uint32, count=len(self.allowed_classes))
+    
+    @classmethod
+    def from_objclass(cls, objclass, min_score=0.0, class_min_scores=None):
+        """
+        クラスリストから絞り込み条件を作成（名前が'-'のクラスは対象外とする）
+        
+        Args:
+            objclass (list): クラスのリスト
+            min_score (float): 全クラス共通のスコアの下限
+            class_min_scores (dict, optional): {クラスID: スコアの下限}
+        
+        Returns:
+            DetectionFilter: 絞り込み条件
+        """
+        allowed = [class_id for class_id, name in enumerate(objclass) if name != '-']
+        return cls(min_score, class_min_scores, allowed)
+    
+    def is_noop(self):
+        """
+        絞り込みを行わない条件かどうか
+        
+        Returns:
+            bool: すべての検出を通す場合True
+        """
+        return (self.allowed_classes is None and self.min_score <= 0.0
+                and all(score <= 0.0 for score in self.class_min_scores.values()))
+    
+    def accepts(self, class_id, score):
+        """
+        検出1件が条件を満たすか判定
+        
+        Args:
+            class_id (int): クラスID
+            score (float): スコア
+        
+        Returns:
+            bool: 条件を満たす場合True
+        """
+        if self.allowed_classes is not None and class_id not in self.allowed_classes:
+            return False
+        return score >= self.class_min_scores.get(class_id, self.min_score)
+    
+    def mask(self, class_ids, scores):
+        """
+        複数の検出が条件を満たすかをまとめて判定
+        
+        Args:
+            class_ids (numpy.ndarray): クラスIDの配列
+            scores (numpy.ndarray): スコアの配列（float32）
+        
+        Returns:
+            numpy.ndarray: 条件を満たす検出がTrueの真偽値配列
+        """
+        if self.class_min_scores:
+            thresholds = np.full(len(scores), self.min_score, dtype=np.float32)
+            for class_id, min_score in self.class_min_scores.items():
+                thresholds[class_ids == class_id] = min_score
+            keep = scores >= thresholds
+        else:
+            keep = scores >= np.float32(self.min_score)
+        if self._allowed_array is not None:
+            keep &= np.isin(class_ids, self._allowed_array)
+        return keep
+
+
+def active_filter(detection_filter):
+    """
+    実際に絞り込みが必要な場合のみ条件を返す
+    
+    Args:
+        detection_filter (DetectionFilter): 絞り込み条件
+    
+    Returns:
+        DetectionFilter: 絞り込み条件（不要な場合はNone）
+    """
+    if detection_filter is None or detection_filter.is_noop():
+        return None
+    return detection_filter
+
+
+def empty_detections():
+    """
+    空の検出結果配列を作成
+    
+    Returns:
+        numpy.ndarray: DETECTION_DTYPEの空配列
+    """
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def _gather(data, positions, dtype):
+    """
+    バッファ上の任意の位置から同じ型の値をまとめて読み込む
+    
+    Args:
+        data (numpy.ndarray): バッファのuint8ビュー
+        positions (numpy.ndarray): 読み込む位置の配列
+        dtype (str): 値の型（リトルエンディアン）
+    
+    Returns:
+        numpy.ndarray: 読み込んだ値の配列
+    """
+    dtype = np.dtype(dtype)
+    index = positions[:, None] + np.arange(dtype.itemsize)
+    return np.ascontiguousarray(data[index]).view(dtype).reshape(-1)
+
+
+def _field_positions(data, table_pos, vt_offset):
+    """
+    各テーブルのフィールドの絶対位置を求める（Table.Offsetのベクトル版）
+    
+    Args:
+        data (numpy.ndarray): バッファのuint8ビュー
+        table_pos (numpy.ndarray): テーブル位置の配列
+        vt_offset (int): vtable上のフィールド位置
+    
+    Returns:
+        numpy.ndarray: フィールドの絶対位置（フィールドがない場合は-1）
+    """
+    vtable = table_pos - _gather(data, table_pos, "<i4")
+    vtable_len = _gather(data, vtable, "<u2")
+    offsets = np.zeros(len(table_pos), dtype=np.int64)
+    present = vtable_len > vt_offset
+    if present.any():
+        offsets[present] = _gather(data, vtable[present] + vt_offset, "<u2")
+    return np.where(offsets != 0, table_pos + offsets, -1)
+
+
+def read_fields(data, table_pos, vt_offset, dtype, out):
+    """
+    各テーブルのスカラーフィールドを読み込む（フィールドがない場合はoutの既定値のまま）
+    
+    Args:
+        data (numpy.ndarray): バッファのuint8ビュー
+        table_pos (numpy.ndarray): テーブル位置の配列
+        vt_offset (int): vtable上のフィールド位置
+        dtype (str): フィールドの型
+        out (numpy.ndarray): 書き込み先（既定値で初期化済み）
+    """
+    positions = _field_positions(data, table_pos, vt_offset)
+    present = positions >= 0
+    if present.any():
+        out[present] = _gather(data, positions[present], dtype)
+
+
+def read_uoffset(buf, pos):
+    """
+    uoffset（相対位置）をたどった先の絶対位置を返す
+    
+    Args:
+        buf: FlatBuffersバッファ
+        pos (int): uoffsetの位置
+    
+    Returns:
+        int: 参照先の絶対位置
+    """
+    return pos + flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, pos)
+
+
+def _get_object_positions(buf):
+    """
+    ObjectDetectionTop → ObjectDetectionData → GeneralObjectリストをたどり、
+    各GeneralObjectテーブルの位置を求める
+    
+    Args:
+        buf: FlatBuffersバッファ
+    
+    Returns:
+        numpy.ndarray: GeneralObjectテーブル位置の配列（データがない場合はNone）
+    """
+    top = Table(buf, flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, 0))
+    o = top.Offset(VT_PERCEPTION)
+    if o == 0:
+        return None
+    perception = Table(buf, read_uoffset(buf, top.Pos + o))
+    
+    o = perception.Offset(VT_OBJECT_DETECTION_LIST)
+    if o == 0:
+        return None
+    vector_pos = read_uoffset(buf, perception.Pos + o)
+    length = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, vector_pos)
+    
+    # オフセットのベクターはバッファ上の連続領域なのでコピーせずに参照する
+    elements_pos = vector_pos + 4
+    offsets = np.frombuffer(buf, dtype="<u4", count=length, offset=elements_pos)
+    return elements_pos + 4 * np.arange(length, dtype=np.int64) + offsets
+
+
+def decode_detections(buf, detection_filter=None):
+    """
+    検出結果をNumPyのベクトル演算でまとめてデコード
+    
+    Args:
+        buf (bytes): FlatBuffersでシリアライズされたデータ（bytes / bytearray / memoryview）
+        detection_filter (DetectionFilter, optional): 絞り込み条件
+    
+    Returns:
+        numpy.ndarray: DETECTION_DTYPEの構造化配列（BoundingBox2dを持つ検出のみ）
+    """
+    object_pos = _get_object_positions(buf)
+    if object_pos is None or len(object_pos) == 0:
+        return empty_detections()
+    
+    data = np.frombuffer(buf, dtype=np.uint8)
+    detection_filter = active_filter(detection_filter)
+    
+    # クラスIDとスコアを先に読み、条件を満たさない検出はここで除外する
+    class_ids = np.zeros(len(object_pos), dtype=np.uint32)
+    scores = np.zeros(len(object_pos), dtype=np.float32)
+    read_fields(data, object_pos, VT_CLASS_ID, "<u4", class_ids)
+    read_fields(data, object_pos, VT_SCORE, "<f4", scores)
+    if detection_filter is not None:
+        keep = detection_filter.mask(class_ids, scores)
+        object_pos = object_pos[keep]
+        class_ids = class_ids[keep]
+        scores = scores[keep]
+        if len(object_pos) == 0:
+            return empty_detections()
+    
+    # BoundingBox2dを持つ検出のみを対象にする
+    bbox_type = np.zeros(len(object_pos), dtype=np.uint8)
+    read_fields(data, object_pos, VT_BOUNDING_BOX_TYPE, "<u1", bbox_type)
+    bbox_field = _field_positions(data, object_pos, VT_BOUNDING_BOX)
+    keep = (bbox_type == BOUNDING_BOX_2D) & (bbox_field >= 0)
+    bbox_field = bbox_field[keep]
+    
+    detections = np.zeros(len(bbox_field), dtype=DETECTION_DTYPE)
+    if len(bbox_field) == 0:
+        return detections
+    
+    detections["class_id"] = class_ids[keep]
+    detections["score"] = scores[keep]
+    
+    bbox_pos = bbox_field + _gather(data, bbox_field, "<u4")
+    read_fields(data, bbox_pos, VT_LEFT, "<i4", detections["left"])
+    read_fields(data, bbox_pos, VT_TOP, "<i4", detections["top"])
+    read_fields(data, bbox_pos, VT_RIGHT, "<i4", detections["right"])
+    read_fields(data, bbox_pos, VT_BOTTOM, "<i4", detections["bottom"])
+    
+    return detections
+
+
+def _decode_object_generic(buf, pos, detection_filter=None):
+    """
+    GeneralObjectテーブル1件をflatbuffers.Tableでデコード
+    
+    Args:
+        buf: FlatBuffersバッファ
+        pos (int): GeneralObjectテーブルの位置
+        detection_filter (DetectionFilter, optional): 絞り込み条件
+    
+    Returns:
+        tuple: (class_id, score, left, top, right, bottom)、BoundingBox2dでない場合や
+               条件を満たさない場合はNone
+    """
+    uoffset = flatbuffers.number_types.UOffsetTFlags.py_type
+    detection_table = Table(buf, pos)
+    
+    # ClassIdを取得
+    class_id_offset = uoffset(detection_table.Offset(VT_CLASS_ID))
+    class_id = 0
+    if class_id_offset != 0:
+        class_id = detection_table.Get(flatbuffers.number_types.Uint32Flags, class_id_offset + detection_table.Pos)
+    
+    # Scoreを取得
+    score_offset = uoffset(detection_table.Offset(VT_SCORE))
+    score = 0.0
+    if score_offset != 0:
+        score = detection_table.Get(flatbuffers.number_types.Float32Flags, score_offset + detection_table.Pos)
+    
+    # 条件を満たさない場合はBoundingBoxを読まない
+    if detection_filter is not None and not detection_filter.accepts(class_id, score):
+        return None
+    
+    # BoundingBoxTypeを取得
+    bbox_type_offset = uoffset(detection_table.Offset(VT_BOUNDING_BOX_TYPE))
+    bbox_type = 0
+    if bbox_type_offset != 0:
+        bbox_type = detection_table.Get(flatbuffers.number_types.Uint8Flags, bbox_type_offset + detection_table.Pos)
+    
+    # BoundingBox2dの場合のみ処理
+    if bbox_type != BOUNDING_BOX_2D:
+        return None
+    bbox_offset = uoffset(detection_table.Offset(VT_BOUNDING_BOX))
+    if bbox_offset == 0:
+        return None
+    bbox_table = Table(buf, detection_table.Indirect(bbox_offset + detection_table.Pos))
+    
+    # 座標を取得
+    coords = []
+    for vt_offset in (VT_LEFT, VT_TOP, VT_RIGHT, VT_BOTTOM):
+        offset = uoffset(bbox_table.Offset(vt_offset))
+        value = 0
+        if offset != 0:
+            value = bbox_table.Get(flatbuffers.number_types.Int32Flags, offset + bbox_table.Pos)
+        coords.append(value)
+    
+    return (class_id, score, *coords)
+
+
+def decode_detections_generic(buf, detection_filter=None):
+    """
+    検出結果をflatbuffers.Tableで1件ずつデコード（汎用の経路）
+    
+    Args:
+        buf (bytes): FlatBuffersでシリアライズされたデータ
+        detection_filter (DetectionFilter, optional): 絞り込み条件
+    
+    Returns:
+        numpy.ndarray: DETECTION_DTYPEの構造化配列（BoundingBox2dを持つ検出のみ）
+    """
+    object_pos = _get_object_positions(buf)
+    if object_pos is None:
+        return empty_detections()
+    
+    detection_filter = active_filter(detection_filter)
+    rows = []
+    for pos in object_pos.tolist():
+        row = _decode_object_generic(buf, pos, detection_filter)
+        if row is not None:
+            rows.append(row)
+    
+    return np.array(rows, dtype=DETECTION_DTYPE)
+
+
+class _TableLayout:
+    """同じvtableを持つテーブルのフィールド読み出し方法（事前にコンパイルしたstruct）"""
+    
+    __slots__ = ["unpack_from", "indices", "defaults", "offsets"]
+    
+    def __init__(self, field_offsets, field_formats, defaults):
+        """
+        Args:
+            field_offsets (list): 各フィールドのテーブル先頭からの位置（0はフィールドなし）
+            field_formats (list): 各フィールドのstruct書式
+            defaults (list): フィールドがない場合の既定値
+        """
+        self.offsets = field_offsets
+        
+        # 存在するフィールドを位置順に並べ、間をパディングで埋めた書式を作る
+        present = sorted((offset, i) for i, offset in enumerate(field_offsets) if offset != 0)
+        fmt = "<"
+        cursor = 0
+        self.indices = [None] * len(field_offsets)
+        for n, (offset, i) in enumerate(present):
+            if offset < cursor:
+                raise ValueError("overlapping table fields")
+            if offset > cursor:
+                fmt += f"{offset - cursor}x"
+            fmt += field_formats[i]
+            cursor = offset + struct.calcsize("<" + field_formats[i])
+            self.indices[i] = n
+        self.unpack_from = struct.Struct(fmt).unpack_from
+        self.defaults = defaults
+    
+    def read(self, buf, pos):
+        """
+        テーブルの全フィールドを1回のunpackで読み込む
+        
+        Args:
+            buf: FlatBuffersバッファ
+            pos (int): テーブルの位置
+        
+        Returns:
+            list: フィールド値（既定値で補完済み）
+        """
+        values = self.unpack_from(buf, pos)
+        return [self.defaults[i] if index is None else values[index]
+                for i, index in enumerate(self.indices)]
+
+
+class VtableCachedDecoder:
+    """
+    vtableごとにフィールド位置を記憶して検出結果をデコードするクラス
+    
+    1フレーム内のGeneralObjectは通常同じvtableを共有するため、vtableの解決は
+    最初の1件だけ行い、以降は事前にコンパイルしたstruct.Structで一括して読み込む。
+    想定外のレイアウトの場合は汎用の経路（flatbuffers.Table）で読み込む
+    """
+    
+    # GeneralObjectのフィールド（class_id, bbox_type, bbox, score）
+    _OBJECT_FIELDS = ((VT_CLASS_ID, "I", 0), (VT_BOUNDING_BOX_TYPE, "B", 0),
+                      (VT_BOUNDING_BOX, "I", 0), (VT_SCORE, "f", 0.0))
+    # BoundingBox2dのフィールド（left, top, right, bottom）
+    _BBOX_FIELDS = ((VT_LEFT, "i", 0), (VT_TOP, "i", 0), (VT_RIGHT, "i", 0), (VT_BOTTOM, "i", 0))
+    
+    # 記憶するvtableの上限（想定外の入力でメモリが増え続けないようにする）
+    MAX_LAYOUTS = 64
+    
+    def __init__(self, vectorize_threshold=80):
+        """
+        デコーダーの初期化
+        
+        Args:
+            vectorize_threshold (int): この件数以上のフレームはdecode_detections（ベクトル演算）で読む
+        """
+        self.vectorize_threshold = vectorize_threshold
+        
+        # vtableのバイト列 → _TableLayout（コンパイルできない場合はNone）
+        self._object_layouts = {}
+        self._bbox_layouts = {}
+    
+    def _get_layout(self, buf, vtable_pos, fields, cache):
+        """
+        vtableに対応するレイアウトを取得（未登録ならコンパイルして記憶）
+        
+        Args:
+            buf: FlatBuffersバッファ
+            vtable_pos (int): vtableの位置
+            fields (tuple): (vtable上の位置, struct書式, 既定値)のタプル
+            cache (dict): レイアウトのキャッシュ
+        
+        Returns:
+            _TableLayout: レイアウト（汎用の経路で読む必要がある場合はNone）
+        """
+        vtable_len = _U16.unpack_from(buf, vtable_pos)[0]
+        key = bytes(buf[vtable_pos:vtable_pos + vtable_len])
+        if key in cache:
+            return cache[key]
+        
+        layout = None
+        try:
+            if vtable_len >= 4 and vtable_len % 2 == 0:
+                inline_size = _U16.unpack_from(key, 2)[0]
+                offsets = []
+                for vt_offset, fmt, _ in fields:
+                    offset = _U16.unpack_from(key, vt_offset)[0] if vt_offset < vtable_len else 0
+                    if offset != 0 and offset + struct.calcsize("<" + fmt) > inline_size:
+                        raise ValueError("field outside of table")
+                    offsets.append(offset)
+                layout = _TableLayout(offsets, [f[1] for f in fields], [f[2] for f in fields])
+        except (ValueError, struct.error):
+            layout = None
+        
+        if len(cache) < self.MAX_LAYOUTS:
+            cache[key] = layout
+        return layout
+    
+    def decode(self, buf, detection_filter=None):
+        """
+        検出結果をデコード
+        
+        Args:
+            buf (bytes): FlatBuffersでシリアライズされたデータ（bytes / bytearray / memoryview）
+            detection_filter (DetectionFilter, optional): 絞り込み条件
+        
+        Returns:
+            numpy.ndarray: DETECTION_DTYPEの構造化配列（BoundingBox2dを持つ検出のみ）
+        """
+        object_pos = _get_object_positions(buf)
+        if object_pos is None or len(object_pos) == 0:
+            return empty_detections()
+        if self.vectorize_threshold is not None and len(object_pos) >= self.vectorize_threshold:
+            return decode_detections(buf, detection_filter)
+        
+        detection_filter = active_filter(detection_filter)
+        unpack_soffset = _I32.unpack_from
+        # このフレーム内で解決済みのvtable位置 → レイアウト
+        object_layouts = {}
+        bbox_layouts = {}
+        rows = []
+        
+        for pos in object_pos.tolist():
+            vtable_pos = pos - unpack_soffset(buf, pos)[0]
+            if vtable_pos in object_layouts:
+                layout = object_layouts[vtable_pos]
+            else:
+                layout = self._get_layout(buf, vtable_pos, self._OBJECT_FIELDS, self._object_layouts)
+                object_layouts[vtable_pos] = layout
+            
+            if layout is None:
+                row = _decode_object_generic(buf, pos, detection_filter)
+                if row is not None:
+                    rows.append(row)
+                continue
+            
+            class_id, bbox_type, bbox_offset, score = layout.read(buf, pos)
+            if bbox_type != BOUNDING_BOX_2D or bbox_offset == 0:
+                continue
+            if detection_filter is not None and not detection_filter.accepts(class_id, score):
+                continue
+            
+            # ユニオンのオフセットはフィールド位置からの相対値
+            bbox_field = pos + layout.offsets[2]
+            bbox_pos = bbox_field + bbox_offset
+            bbox_vtable_pos = bbox_pos - unpack_soffset(buf, bbox_pos)[0]
+            if bbox_vtable_pos in bbox_layouts:
+                bbox_layout = bbox_layouts[bbox_vtable_pos]
+            else:
+                bbox_layout = self._get_layout(buf, bbox_vtable_pos, self._BBOX_FIELDS, self._bbox_layouts)
+                bbox_layouts[bbox_vtable_pos] = bbox_layout
+            
+            if bbox_layout is None:
+                row = _decode_object_generic(buf, pos, detection_filter)
+                if row is not None:
+                    rows.append(row)
+                continue
+            
+            rows.append((class_id, score, *bbox_layout.read(buf, bbox_pos)))
+        
+        return np.array(rows, dtype=DETECTION_DTYPE)
+
+
+def detections_to_dicts(detections):
+    """
+    構造化配列を従来の辞書のリストに変換（互換用）
+    
+    Args:
+        detections (numpy.ndarray): DETECTION_DTYPEの構造化配列
+    
+    Returns:
+        list: {"class_id", "score", "left", "top", "right", "bottom"}の辞書のリスト
+    """
+    names = detections.dtype.names
+    return [dict(zip(names, row)) for row in detections.tolist()]
@@ -6,41 +6,62 @@
 画像処理と検出のコア機能
 """
 
-import sys
-import os
 import base64
-import time
-import cv2
+import logging
+import asyncio
+import struct
 import numpy as np
 import threading
+from collections import namedtuple
 from datetime import datetime
 
-# SmartCameraディレクトリ（現在の2レベル上）のパスを取得
-current_path = os.path.dirname(os.path.abspath(__file__))  # core
-parent_path = os.path.dirname(current_path)  # kumaMac
-root_path = os.path.dirname(parent_path)  # SmartCamera
+from kumaMac.api.async_aitrios_client import AsyncAITRIOSClient
+from kumaMac.api.resilience import CircuitOpenError
+from kumaMac.core.device_state_service import DeviceStateService
+from kumaMac.core.detection_decoder import (DetectionFilter, decode_detections_generic,
+                                            detections_to_dicts, empty_detections)
+from kumaMac.utils.image_utils import download_image, download_image_scaled, format_detection_labels
+from kumaMac.utils.overlay_renderer import OverlayRenderer
+from kumaMac.utils.snapshot_writer import SnapshotWriter
+from kumaMac.core.output_decoders import OUTPUT_OBJECT_DETECTION, get_decoder
+from kumaMac.utils.buffer_pool import Base64Decoder
+from kumaMac.core.pipeline import Pipeline
+from kumaMac.core.inference_index import InferenceIndex
+from kumaMac.core.polling_scheduler import PollingScheduler
 
-# グローバルな変数でモジュールを確保
-sys.path.insert(0, root_path)
-ObjectDetectionTop = None
-BoundingBox = None
-BoundingBox2d = None
+logger = logging.getLogger(__name__)
 
-# モジュールの遅延インポート関数
-def ensure_modules_loaded():
-    global ObjectDetectionTop, BoundingBox, BoundingBox2d
-    if ObjectDetectionTop is None:
-        import ObjectDetectionTop
-        import BoundingBox
-        import BoundingBox2d
+# 画像との照合用に保持する推論結果の最大数
+RECENT_INFERENCE_LIMIT = 50
 
-from kumaMac.api.aitrios_client import AITRIOSClient
-from kumaMac.utils.image_utils import download_image, draw_bounding_boxes
+# スナップショットの既定の保存先
+DEFAULT_SNAPSHOT_PATH = 'jpeg.jpg'
+
+# 取得→デコード→描画の各処理段の入力キューの容量（追いつかない場合は古いフレームから捨てる）
+PIPELINE_QUEUE_SIZE = 1
+
+# 新しいデータの到着間隔が分かるまでのポーリング間隔（秒）
+IMAGE_POLL_INTERVAL = 5.0
+STREAMING_POLL_INTERVAL = 1.0
+
+# エラー発生後に再試行するまでの間隔（秒）
+ERROR_RETRY_INTERVAL = 5.0
+
+# 推論結果だけを表示する場合の画像サイズ
+BLANK_IMAGE_SIZE = (320, 320)
+
+# 取得段からデコード段に渡すフレーム（画像の"contents"と推論結果の"O"、どちらもNoneの場合がある）
+FetchedFrame = namedtuple("FetchedFrame", ["image_name", "image_contents", "metadata"])
+
+# デコード段から描画段に渡すフレーム（output_typeがNoneの場合は推論結果なし、
+# contentsは原寸で保存するための元の画像の"contents"）
+DecodedFrame = namedtuple("DecodedFrame", ["image", "result", "scale_x", "scale_y", "output_type", "renderer",
+                                           "contents"], defaults=(None,))
 
 class DetectionProcessor:
     """AITRIOSからの画像取得と物体検出を処理するクラス"""
     
-    def __init__(self, aitrios_client, objclass, callback=None):
+    def __init__(self, aitrios_client, objclass, callback=None, device_state_service=None):
         """
         検出プロセッサの初期化
         
@@ -48,16 +69,60 @@ class DetectionProcessor:
             aitrios_client (AITRIOSClient): AITRIOSとの通信クライアント
             objclass (list): 検出対象のクラスリスト
             callback (function, optional): 結果通知用のコールバック関数
+            device_state_service (DeviceStateService, optional): 共有のデバイス状態サービス
         """
         self.aitrios_client = aitrios_client
         self.objclass = objclass
         self.callback = callback
         self.detected_labels = []
-        self.device_monitor_thread = None
-        self.device_monitor_flag = threading.Event()
         
-        # 初期化時にモジュールを確保
-        ensure_modules_loaded()
+        # デバイス状態はUIと共有するサービスから取得する
+        if device_state_service is None:
+            device_state_service = DeviceStateService(aitrios_client)
+        self.device_state = device_state_service
+        
+        # 画像と推論結果を並行取得するための非同期クライアント（同期クライアントと状態を共有）
+        self.async_client = AsyncAITRIOSClient(aitrios_client)
+        
+        # モデルの出力形式に応じたデコーダーと描画関数（既定は物体検出）
+        self.output_type = None
+        self.detection_decoder = None
+        self.render_output = None
+        self.set_output_type(OUTPUT_OBJECT_DETECTION)
+        
+        # スナップショットは専用スレッドで保存する（オーバーレイの描画も保存側で行う）
+        self.overlay_renderer = OverlayRenderer(objclass)
+        self.snapshot_writer = SnapshotWriter(DEFAULT_SNAPSHOT_PATH)
+        
+        # デコード時に適用する絞り込み条件（既定では'-'のクラスを除外する）
+        self.min_score = 0.0
+        self.class_min_scores = {}
+        self.allowed_classes = None
+        self.detection_filter = None
+        self.update_detection_filter()
+        
+        # メタデータと画像のBase64デコード先バッファをフレーム間で再利用する
+        self.base64_decoder = Base64Decoder()
+        
+        # 表示先のサイズ（画像はこのサイズを下回らない範囲で縮小デコードする）
+        self.display_size = None
+        
+        # 増分取得した推論結果の時刻順インデックス
+        self.inference_index = InferenceIndex(RECENT_INFERENCE_LIMIT)
+        
+        # 直近の結果から直接探した最後の画像のタイムスタンプ（同じ画像では1回だけ探す）
+        self._fallback_timestamp = None
+        
+        # 最後に表示したフレーム（画像名, 画像の"contents", 対応する推論結果のT）
+        # 推論結果が後から届いた場合にこのフレームを描き直す
+        self.displayed_frame = None
+        
+        # ポーリング間隔の調整と停止・状態変化による待機の中断
+        self.scheduler = PollingScheduler(base_interval=IMAGE_POLL_INTERVAL)
+        
+        # 実行中の処理パイプライン（process_imagesの実行中のみ）
+        self.pipeline = None
+        self._reported_drops = 0
     
     def set_callback(self, callback):
         """
@@ -68,6 +133,21 @@ class DetectionProcessor:
         """
         self.callback = callback
     
+    def set_aitrios_client(self, aitrios_client):
+        """
+        通信クライアントを差し替える
+        
+        Args:
+            aitrios_client (AITRIOSClient): AITRIOSとの通信クライアント
+        """
+        self.aitrios_client = aitrios_client
+        # 処理ループが使用中の非同期クライアントは書き換えず、新しいものに置き換える
+        # （処理ループは取得のたびにself.async_clientを参照する）
+        old_async_client = self.async_client
+        self.async_client = AsyncAITRIOSClient(aitrios_client)
+        old_async_client.close(cancel_pending=False)
+        self.device_state.set_client(aitrios_client)
+    
     def set_objclass(self, objclass):
         """
         検出オブジェクトのクラスリストを更新
@@ -76,16 +156,94 @@ class DetectionProcessor:
             objclass (list): 検出対象のクラスリスト
         """
         self.objclass = objclass
+        self.overlay_renderer.set_objclass(objclass)
+        self.update_detection_filter()
+    
+    def configure_snapshots(self, path=None, quality=None, interval=None, enabled=None):
+        """
+        スナップショット保存の設定を変更
+        
+        Args:
+            path (str, optional): 保存先のファイルパス
+            quality (int, optional): JPEGの品質（0〜100）
+            interval (float, optional): 保存の最小間隔（秒）
+            enabled (bool, optional): 保存を行うかどうか
+        """
+        self.snapshot_writer.configure(path=path, quality=quality, min_interval=interval, enabled=enabled)
     
-    def notify_status(self, message):
+    def request_stop(self):
+        """処理ループの停止を要求（待機中のループはすぐに戻る）"""
+        self.scheduler.stop()
+    
+    def close(self):
+        """保存待ちのスナップショットを書き出し、通信用のスレッドを終了する"""
+        self.request_stop()
+        self.async_client.close()
+        self.snapshot_writer.close()
+    
+    def set_display_size(self, width, height):
+        """
+        表示先のサイズを設定（UIスレッドから呼び出してよい）
+        
+        Args:
+            width (int): 表示先の幅（0以下の場合は原寸でデコード）
+            height (int): 表示先の高さ
+        """
+        self.display_size = (width, height) if width > 0 and height > 0 else None
+    
+    def set_output_type(self, output_type, **options):
+        """
+        モデルの出力形式を切り替える
+        
+        Args:
+            output_type (str): 出力形式の名前（output_decodersに登録されたもの）
+            **options: デコーダーに渡すオプション
+        """
+        self.detection_decoder, self.render_output = get_decoder(output_type, **options)
+        self.output_type = output_type
+    
+    def set_match_tolerance(self, tolerance_ms):
+        """
+        画像と推論結果の照合で許容するタイムスタンプの差を設定
+        
+        Args:
+            tolerance_ms (int): 許容する差（ミリ秒、0の場合は完全一致のみ）
+        """
+        self.inference_index.tolerance_ms = max(0, int(tolerance_ms))
+    
+    def set_detection_filter(self, min_score=0.0, class_min_scores=None, allowed_classes=None):
+        """
+        デコード時に適用する絞り込み条件を設定
+        
+        Args:
+            min_score (float): 全クラス共通のスコアの下限
+            class_min_scores (dict, optional): {クラスID: スコアの下限}
+            allowed_classes (iterable, optional): 対象とするクラスIDの集合（Noneの場合はクラスリストの'-'以外）
+        """
+        self.min_score = min_score
+        self.class_min_scores = dict(class_min_scores or {})
+        self.allowed_classes = None if allowed_classes is None else set(allowed_classes)
+        self.update_detection_filter()
+    
+    def update_detection_filter(self):
+        """現在のクラスリストと設定から絞り込み条件を作り直す"""
+        if self.allowed_classes is None:
+            self.detection_filter = DetectionFilter.from_objclass(self.objclass, self.min_score, self.class_min_scores)
+        else:
+            self.detection_filter = DetectionFilter(self.min_score, self.class_min_scores, self.allowed_classes)
+    
+    def notify_status(self, message, *args):
         """
         ステータスメッセージをコールバックで通知
         
         Args:
-            message (str): ステータスメッセージ
+            message (str): ステータスメッセージ（argsがある場合は%形式の書式）
+            *args: 書式に埋め込む値
         """
+        # 毎回の処理で出るメッセージのためDEBUGで記録する（レベルが高い場合は書式化もしない）
+        logger.debug(message, *args)
         if self.callback:
-            self.callback("status", message)
+            self.callback("status", message % args if args else message)
     
     def notify_device_state(self, connection_state, operation_state):
         """
@@ -110,163 +268,362 @@ class DetectionProcessor:
             bytes: デコードされたバイナリデータ
         """
         return base64.b64decode(encoded_data)
-
-    def deserialize_flatbuffers(self, buf):
+    
+    def decode_inference_metadata(self, encoded_data):
         """
-        FlatBuffersデータをデシリアライズ（直接インポート方式）
+        Base64エンコードされた推論結果メタデータを検出結果に変換
+        
+        デコード結果はプールのバッファ上でそのままデシリアライズし、
+        検出結果を取り出した時点でバッファを返却する
         
         Args:
-            buf (bytes): FlatBuffersでシリアライズされたデータ
+            encoded_data (str): 推論結果の"O"フィールド
         
         Returns:
-            list: 検出結果のリスト
+            numpy.ndarray: 検出結果の構造化配列（DETECTION_DTYPE）
+        """
+        with self.base64_decoder.decode(encoded_data) as buf:
+            return self.deserialize_detections(buf)
+    
+    def decode_output(self, buf):
+        """
+        物体検出以外の出力をデシリアライズ
+        
+        Args:
+            buf (memoryview): 出力テンソルのデータ
+        
+        Returns:
+            出力形式ごとのデコード結果（失敗した場合はNone）
         """
         try:
-            # SmartCameraディレクトリのパスを取得（実行時も確認）
-            import sys
-            import os
-            current_path = os.path.dirname(os.path.abspath(__file__))  # core
-            parent_path = os.path.dirname(current_path)  # kumaMac
-            root_path = os.path.dirname(parent_path)  # SmartCamera
-            
-            # FlatBuffersファイルの直接インポート
-            sys.path.insert(0, root_path)
-            
-            # 絶対インポートを使用
-            import flatbuffers
-            from flatbuffers.table import Table
-            
-            # ObjectDetectionTopの実装を直接組み込む
-            table_pos = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, 0)
-            obj_table = Table(buf, table_pos)
-            
-            # Perceptionフィールドを取得
-            o = flatbuffers.number_types.UOffsetTFlags.py_type(obj_table.Offset(4))
-            if o == 0:
-                self.notify_status("パーセプションデータなし")
-                return []
-            
-            perception_pos = obj_table.Indirect(o + obj_table.Pos)
-            perception_table = Table(buf, perception_pos)
-            
-            # ObjectDetectionListの長さを取得
-            o = flatbuffers.number_types.UOffsetTFlags.py_type(perception_table.Offset(4))
-            if o == 0:
-                self.notify_status("検出オブジェクトなし")
-                return []
-            
-            list_length = perception_table.VectorLen(o)
-            self.notify_status(f"検出オブジェクト数: {list_length}")
+            return self.detection_decoder.decode(buf, self.detection_filter)
+        except Exception as e:
+            logger.exception("出力のデシリアライズに失敗しました（%s）", self.output_type)
+            self.notify_status("デシリアライズエラー: %s", e)
+            return None
+    
+    def decode_result(self, encoded_data):
+        """
+        推論結果メタデータを現在の出力形式でデコード
+        
+        物体検出はプールのバッファ上でデシリアライズしてすぐに返却する。
+        それ以外の出力はバッファのビューを返すため、描画が終わるまで
+        有効なように専用のバイト列にデコードする
+        
+        Args:
+            encoded_data (str): 推論結果の"O"フィールド
+        
+        Returns:
+            出力形式ごとのデコード結果
+        """
+        if self.output_type == OUTPUT_OBJECT_DETECTION:
+            return self.decode_inference_metadata(encoded_data)
+        return self.decode_output(self.decode_base64(encoded_data))
+    
+    def render_inference(self, image, encoded_data, scale_x=1, scale_y=1):
+        """
+        推論結果メタデータをデコードして画像に描画
+        
+        Args:
+            image (numpy.ndarray): 描画先の画像
+            encoded_data (str): 推論結果の"O"フィールド
+            scale_x (float): 検出座標に掛けるX方向の係数（縮小デコードした場合の縮小率）
+            scale_y (float): 検出座標に掛けるY方向の係数
+        
+        Returns:
+            tuple: (描画された画像, ラベルのリスト)
+        """
+        result = self.decode_result(encoded_data)
+        return self.render_output(image, result, self.objclass, scale_x=scale_x, scale_y=scale_y)
+    
+    def publish_inference(self, image, encoded_data, scale_x=1, scale_y=1):
+        """
+        推論結果をデコードして画像と検出情報を通知
+        
+        Args:
+            image (numpy.ndarray): 推論結果に対応する画像
+            encoded_data (str): 推論結果の"O"フィールド
+            scale_x (float): 検出座標に掛けるX方向の係数（縮小デコードした場合の縮小率）
+            scale_y (float): 検出座標に掛けるY方向の係数
+        """
+        result = self.decode_result(encoded_data)
+        self.publish_frame(DecodedFrame(image, result, scale_x, scale_y, self.output_type, self.render_output))
+    
+    def decode_frame(self, frame):
+        """
+        取得したフレームの画像と推論結果をデコード（パイプラインのデコード段）
+        
+        Args:
+            frame (FetchedFrame): 取得段から渡されたフレーム
+        
+        Returns:
+            DecodedFrame: 描画段に渡すフレーム
+        """
+        if frame.image_contents is None:
+            # 画像がない場合は真っ黒な画像に推論結果を表示する
+            image = np.zeros((BLANK_IMAGE_SIZE[1], BLANK_IMAGE_SIZE[0], 3), dtype=np.uint8)
+            scale_x = scale_y = 1
+        else:
+            image, scale_x, scale_y = self.decode_image_for_display(frame.image_contents)
+            if image is None:
+                raise Exception(f"画像 {frame.image_name} をデコードできません")
+        
+        if frame.metadata is None:
+            return DecodedFrame(image, None, scale_x, scale_y, None, None, frame.image_contents)
+        
+        # デコード時点の出力形式と描画関数を組にして渡す（途中で切り替えられても食い違わない）
+        output_type, renderer = self.output_type, self.render_output
+        result = self.decode_result(frame.metadata)
+        return DecodedFrame(image, result, scale_x, scale_y, output_type, renderer, frame.image_contents)
+    
+    def publish_frame(self, frame):
+        """
+        デコード済みのフレームを描画して通知（パイプラインの描画段）
+        
+        物体検出の場合はボックスを描画せずに画像と検出結果を"frame"イベントで通知し、
+        UI側で縮小後の表示画像に重ねて描画する。スナップショットは縮小デコードした
+        表示用の画像ではなく、保存スレッドで原寸にデコードした画像に描画して保存する
+        
+        Args:
+            frame (DecodedFrame): デコード段から渡されたフレーム
+        """
+        image, result, scale_x, scale_y = frame.image, frame.result, frame.scale_x, frame.scale_y
+        snapshot = self.full_size_loader(frame)
+        if frame.output_type is None:
+            self.detected_labels = ["推論結果なし"]
+            frame_event = ("image", image)
+            self.snapshot_writer.submit(snapshot or image)
+        elif frame.output_type == OUTPUT_OBJECT_DETECTION:
+            self.detected_labels = format_detection_labels(result, self.objclass)
+            frame_event = ("frame", (image, result, scale_x, scale_y))
             
-            results = []
-            for i in range(list_length):
-                try:
-                    # ベクターの要素を取得
-                    x = perception_table.Vector(o)
-                    x += flatbuffers.number_types.UOffsetTFlags.py_type(i) * 4
-                    x = perception_table.Indirect(x)
-                    detection_table = Table(buf, x)
-                    
-                    # ClassIdを取得
-                    class_id_offset = flatbuffers.number_types.UOffsetTFlags.py_type(detection_table.Offset(4))
-                    class_id = 0
-                    if class_id_offset != 0:
-                        class_id = detection_table.Get(flatbuffers.number_types.Uint32Flags, class_id_offset + detection_table.Pos)
-                    
-                    # Scoreを取得
-                    score_offset = flatbuffers.number_types.UOffsetTFlags.py_type(detection_table.Offset(10))
-                    score = 0.0
-                    if score_offset != 0:
-                        score = detection_table.Get(flatbuffers.number_types.Float32Flags, score_offset + detection_table.Pos)
-                    
-                    # BoundingBoxTypeを取得
-                    bbox_type_offset = flatbuffers.number_types.UOffsetTFlags.py_type(detection_table.Offset(6))
-                    bbox_type = 0
-                    if bbox_type_offset != 0:
-                        bbox_type = detection_table.Get(flatbuffers.number_types.Uint8Flags, bbox_type_offset + detection_table.Pos)
-                    
-                    # BoundingBox2dの場合のみ処理
-                    if bbox_type == 1:  # BoundingBox2d
-                        bbox_offset = flatbuffers.number_types.UOffsetTFlags.py_type(detection_table.Offset(8))
-                        if bbox_offset != 0:
-                            # BoundingBoxテーブルにアクセス
-                            bbox_table = Table(buf, detection_table.Indirect(bbox_offset + detection_table.Pos))
-                            
-                            # 座標を取得
-                            left = top = right = bottom = 0
-                            
-                            # left
-                            left_offset = flatbuffers.number_types.UOffsetTFlags.py_type(bbox_table.Offset(4))
-                            if left_offset != 0:
-                                left = bbox_table.Get(flatbuffers.number_types.Int32Flags, left_offset + bbox_table.Pos)
-                            
-                            # top
-                            top_offset = flatbuffers.number_types.UOffsetTFlags.py_type(bbox_table.Offset(6))
-                            if top_offset != 0:
-                                top = bbox_table.Get(flatbuffers.number_types.Int32Flags, top_offset + bbox_table.Pos)
-                            
-                            # right
-                            right_offset = flatbuffers.number_types.UOffsetTFlags.py_type(bbox_table.Offset(8))
-                            if right_offset != 0:
-                                right = bbox_table.Get(flatbuffers.number_types.Int32Flags, right_offset + bbox_table.Pos)
-                            
-                            # bottom
-                            bottom_offset = flatbuffers.number_types.UOffsetTFlags.py_type(bbox_table.Offset(10))
-                            if bottom_offset != 0:
-                                bottom = bbox_table.Get(flatbuffers.number_types.Int32Flags, bottom_offset + bbox_table.Pos)
-                            
-                            # 結果を追加
-                            results.append({
-                                "class_id": class_id,
-                                "score": score,
-                                "left": left,
-                                "top": top,
-                                "right": right,
-                                "bottom": bottom
-                            })
-                except Exception as e:
-                    self.notify_status(f"オブジェクト {i} の処理中にエラー: {str(e)}")
+            # スナップショットには保存スレッド側でオーバーレイを描画する
+            overlay = self.overlay_renderer
+            if snapshot is not None:
+                self.snapshot_writer.submit(snapshot, lambda full: overlay.draw(full, result))
+            else:
+                self.snapshot_writer.submit(image, lambda snapshot: overlay.draw(snapshot, result, scale_x, scale_y))
+        else:
+            rendered, self.detected_labels = frame.renderer(image, result, self.objclass,
+                                                            scale_x=scale_x, scale_y=scale_y)
+            frame_event = ("image", rendered)
+            if snapshot is not None:
+                renderer, objclass = frame.renderer, self.objclass
+                self.snapshot_writer.submit(snapshot, lambda full: renderer(full, result, objclass)[0])
+            else:
+                self.snapshot_writer.submit(rendered)
+        
+        # GUIに画像とステータスを表示
+        if self.callback:
+            self.callback(*frame_event)
+            self.callback("detection", self.detected_labels)
+    
+    def on_pipeline_error(self, stage_name, error):
+        """
+        パイプラインの処理段で発生したエラーの通知
+        
+        Args:
+            stage_name (str): 処理段の名前
+            error (Exception): 発生した例外
+        """
+        logger.error("パイプラインの%s段でエラーが発生しました", stage_name, exc_info=error)
+        if stage_name == "decode":
+            self.notify_status("画像処理エラー: %s", error)
+        else:
+            self.notify_status("推論結果処理エラー: %s", error)
+    
+    def get_pipeline_stats(self):
+        """
+        処理パイプラインの各段の統計情報を取得
+        
+        Returns:
+            dict: {処理段の名前: キューの深さなどの統計情報}（停止中は空）
+        """
+        pipeline = self.pipeline
+        return pipeline.stats() if pipeline is not None else {}
+    
+    def report_pipeline_stats(self):
+        """処理パイプラインの統計情報を通知（フレームが捨てられた場合はステータスにも表示）"""
+        stats = self.get_pipeline_stats()
+        if not stats:
+            return
+        if self.callback:
+            self.callback("pipeline", stats)
+        
+        dropped = sum(stage["dropped"] for stage in stats.values())
+        if dropped != self._reported_drops:
+            self._reported_drops = dropped
+            depths = ", ".join(f"{name}={stage['queue_depth']}" for name, stage in stats.items())
+            self.notify_status("処理が追いつかないため古いフレームを破棄しました（累計 %d 件, キュー: %s）", dropped, depths)
+    
+    def decode_image(self, encoded_data):
+        """
+        Base64エンコードされた画像を原寸でデコード（保存や切り出し用）
+        
+        Args:
+            encoded_data (str): 画像の"contents"フィールド
+        
+        Returns:
+            numpy.ndarray: OpenCV画像データ
+        """
+        return download_image(encoded_data, self.base64_decoder)
+    
+    def full_size_loader(self, frame):
+        """
+        スナップショット用に元の画像を原寸でデコードする関数を作成
+        
+        Args:
+            frame (DecodedFrame): デコード済みのフレーム
+        
+        Returns:
+            function: 原寸の画像を返す関数（保存しない場合や表示用の画像が原寸の場合はNone）
+        """
+        if (not self.snapshot_writer.enabled or frame.contents is None
+                or (frame.scale_x == 1 and frame.scale_y == 1)):
+            return None
+        # 保存スレッドから呼ばれるため、処理スレッドのバッファプールは使わない
+        contents = frame.contents
+        return lambda: download_image(contents)
+    
+    def decode_image_for_display(self, encoded_data):
+        """
+        Base64エンコードされた画像を表示サイズに合わせて縮小デコード
+        
+        Args:
+            encoded_data (str): 画像の"contents"フィールド
+        
+        Returns:
+            tuple: (OpenCV画像データ, X方向の縮小率, Y方向の縮小率)
+        """
+        return download_image_scaled(encoded_data, self.display_size, self.base64_decoder)
+    
+    def deserialize_detections(self, buf):
+        """
+        FlatBuffersデータを構造化NumPy配列にデシリアライズ
+        
+        Args:
+            buf (bytes): FlatBuffersでシリアライズされたデータ
+        
+        Returns:
+            numpy.ndarray: 検出結果の構造化配列（DETECTION_DTYPE）
+        """
+        try:
+            try:
+                detections = self.detection_decoder.decode(buf, self.detection_filter)
+            except (IndexError, ValueError, struct.error):
+                # レイアウトが想定と異なる場合は1件ずつ読む汎用の経路で再試行
+                detections = decode_detections_generic(buf, self.detection_filter)
             
-            # 結果がなかった場合の処理を追加
-            if len(results) == 0:
+            self.notify_status("検出オブジェクト数: %d", len(detections))
+            if len(detections) == 0:
                 self.notify_status("推論結果なし")
-                
-            return results
+            return detections
         except Exception as e:
-            self.notify_status(f"デシリアライズエラー: {str(e)}")
-            import traceback
-            self.notify_status(traceback.format_exc())
-            return []
-            
-            
-    def monitor_device_state(self, running_flag):
+            logger.exception("検出結果のデシリアライズに失敗しました")
+            self.notify_status("デシリアライズエラー: %s", e)
+            return empty_detections()
+    
+    def deserialize_flatbuffers(self, buf):
         """
-        デバイス状態を定期的に監視
+        FlatBuffersデータをデシリアライズ（辞書のリストを返す互換用）
         
         Args:
-            running_flag (threading.Event): 処理実行のフラグ
+            buf (bytes): FlatBuffersでシリアライズされたデータ
+        
+        Returns:
+            list: 検出結果のリスト
         """
-        while running_flag.is_set():
-            try:
-                # デバイス状態の取得
-                connection_state, operation_state = self.aitrios_client.get_connection_state()
-                
-                # 状態の通知
-                self.notify_device_state(connection_state, operation_state)
-                
-                # デバイス状態に応じたログ
-                if connection_state == "Connected":
-                    self.notify_status(f"デバイス接続中: {operation_state}")
-                else:
-                    self.notify_status(f"デバイス未接続: {connection_state}")
-                
-                # 10秒ごとに状態を更新
-                time.sleep(10)
-                
-            except Exception as e:
-                self.notify_status(f"デバイス状態取得エラー: {str(e)}")
-                time.sleep(10)
-                
+        return detections_to_dicts(self.deserialize_detections(buf))
+    
+    def update_recent_inferences(self, inference_results):
+        """
+        増分取得した推論結果を照合用のインデックスに追加
+        
+        Args:
+            inference_results (list): 新しい推論結果のリスト
+        
+        Returns:
+            list: 新しく追加されたタイムスタンプ(T)のリスト
+        """
+        return self.inference_index.update(inference_results)
+    
+    def find_matching_inference(self, image_timestamp):
+        """
+        画像のタイムスタンプに対応する推論結果を探す
+        
+        Args:
+            image_timestamp (str): 画像のタイムスタンプ
+        
+        Returns:
+            dict: 推論結果（見つからない場合はNone）
+        """
+        inference = self.inference_index.lookup(image_timestamp)
+        if inference is None and image_timestamp != self._fallback_timestamp:
+            # インデックスにない場合は直近の結果をストリーム解析で探す（一致した時点で打ち切り）
+            # 遅れて届く結果は増分取得でインデックスに入るため、同じ画像で探し直すことはしない
+            self._fallback_timestamp = image_timestamp
+            inference = self.aitrios_client.find_inference_by_timestamp(image_timestamp, 10)
+            if inference is not None:
+                self.inference_index.add(inference)
+        return inference
+    
+    def submit_image(self, pipeline, image_name, image_contents):
+        """
+        画像を対応する推論結果と組にしてパイプラインに渡す
+        
+        表示中のフレームと同じ画像の場合は、前回なかった推論結果が
+        届いたときだけ描き直す
+        
+        Args:
+            pipeline (Pipeline): 処理パイプライン
+            image_name (str): 画像のファイル名
+            image_contents (str): 画像の"contents"フィールド
+        """
+        image_timestamp = image_name.split('.')[0]  # 拡張子を除いたファイル名（タイムスタンプ）
+        displayed = self.displayed_frame
+        if displayed is not None and displayed[0] == image_name and displayed[2] is not None:
+            # 表示済みで推論結果も反映済み
+            return
+        
+        matching_inference = self.find_matching_inference(image_timestamp)
+        metadata = matching_inference.get("O") if matching_inference is not None else None
+        if metadata is None:
+            if displayed is not None and displayed[0] == image_name:
+                # 推論結果がまだ届いていない同じ画像は描き直さない
+                return
+            self.notify_status("画像 %s に対応する推論結果が見つかりません", image_name)
+            self.displayed_frame = (image_name, image_contents, None)
+        else:
+            if displayed is not None and displayed[0] == image_name:
+                self.notify_status("遅れて届いた推論結果で画像 %s を描き直します", image_name)
+            else:
+                self.notify_status("画像 %s に対応する推論結果を発見", image_name)
+            self.displayed_frame = (image_name, image_contents, matching_inference.get("T"))
+        
+        # 推論結果がなくても画像を表示する
+        pipeline.submit(FetchedFrame(image_name, image_contents, metadata))
+    
+    def on_device_state_changed(self, connection_state, operation_state, timestamp):
+        """
+        デバイス状態サービスからの変更通知
+        
+        Args:
+            connection_state (str): 接続状態
+            operation_state (str): 動作状態
+            timestamp (str): 取得時刻
+        """
+        # 状態の通知
+        self.notify_device_state(connection_state, operation_state)
+        
+        # 待機中のループを起こして新しい状態ですぐに処理する
+        self.scheduler.wake()
+        
+        # デバイス状態に応じたログ
+        if connection_state == "Connected":
+            self.notify_status("デバイス接続中: %s", operation_state)
+        else:
+            self.notify_status("デバイス未接続: %s", connection_state)
+    
     def process_images(self, running_flag):
         """
         画像取得と検出処理のメインループ
@@ -274,199 +631,141 @@ class DetectionProcessor:
         Args:
             running_flag (threading.Event): 処理実行のフラグ
         """
-        # 実行時にもパスの設定を確認
-        import sys
-        import os
-        current_path = os.path.dirname(os.path.abspath(__file__))  # core
-        parent_path = os.path.dirname(current_path)  # kumaMac
-        root_path = os.path.dirname(parent_path)  # SmartCamera
-        
-        if root_path not in sys.path:
-            sys.path.insert(0, root_path)
-            self.notify_status(f"パスを追加: {root_path}")
-        
-        # デバイス状態監視スレッドの開始
-        self.device_monitor_flag.set()
-        self.device_monitor_thread = threading.Thread(
-            target=self.monitor_device_state,
-            args=(self.device_monitor_flag,)
-        )
-        self.device_monitor_thread.daemon = True
-        self.device_monitor_thread.start()
+        # デバイス状態の変更通知を購読（状態の監視は共有サービスが行う）
+        self.device_state.subscribe(self.on_device_state_changed)
+        
+        # 推論結果の増分取得を最新から始める
+        self.aitrios_client.reset_inference_cursor()
+        self.inference_index.clear()
+        self._fallback_timestamp = None
+        self.displayed_frame = None
+        
+        # 並行取得に使用するこのスレッド専用のイベントループ
+        loop = asyncio.new_event_loop()
+        
+        # このスレッドは取得段として動き、デコードと描画はそれぞれ専用のスレッドで行う
+        pipeline = Pipeline(on_error=self.on_pipeline_error)
+        pipeline.add_stage("decode", self.decode_frame, PIPELINE_QUEUE_SIZE)
+        pipeline.add_stage("render", self.publish_frame, PIPELINE_QUEUE_SIZE)
+        pipeline.start()
+        self.pipeline = pipeline
+        self._reported_drops = 0
+        
+        # 待機はスケジューラーで行い、停止や状態変化ですぐに戻る
+        scheduler = self.scheduler
+        scheduler.reset()
         
         # 現在のデバイス状態
         current_connection_state = "Unknown"
         current_operation_state = "Unknown"
         
-        while running_flag.is_set():
+        # 新しい画像の到着を判定するための直前の画像名
+        last_image_name = None
+        
+        while running_flag.is_set() and not scheduler.stopped:
             try:
+                # APIが遮断中の場合はリクエストを積み上げずに回復を待つ
+                breaker = self.aitrios_client.circuit_breaker
+                if breaker.is_open():
+                    retry_after = breaker.retry_after()
+                    self.notify_status("AITRIOS APIが応答しないため %.0f 秒待機します", retry_after)
+                    scheduler.wait(max(retry_after, 1))
+                    continue
+                
                 # 最新のデバイス状態を取得
                 try:
-                    connection_state, operation_state = self.aitrios_client.get_connection_state()
+                    connection_state, operation_state = self.device_state.get_state()
                     current_connection_state = connection_state
                     current_operation_state = operation_state
-                    self.notify_status(f"デバイス状態: {connection_state} - {operation_state}")
+                    self.notify_status("デバイス状態: %s - %s", connection_state, operation_state)
                 except Exception as e:
-                    self.notify_status(f"デバイス状態取得エラー: {str(e)}")
+                    self.notify_status("デバイス状態取得エラー: %s", e)
+                
+                # Idleや未接続の間は新しいデータが届かないため間隔を伸ばす
+                scheduler.set_idle(current_connection_state != "Connected" or current_operation_state == "Idle")
                 
                 # StreamingInferenceResultモードでの処理
                 if current_connection_state == "Connected" and current_operation_state == "StreamingInferenceResult":
                     self.notify_status("推論結果ストリーミングモードで動作中")
+                    scheduler.base_interval = STREAMING_POLL_INTERVAL
                     
-                    # 推論結果のみを取得
-                    inference_results = self.aitrios_client.get_inference_results(1)
+                    # 前回以降の新しい推論結果のみを取得
+                    inference_results = self.aitrios_client.get_new_inference_results(1)
+                    scheduler.observe(len(inference_results) > 0)
                     
-                    if isinstance(inference_results, list) and len(inference_results) > 0:
+                    if len(inference_results) > 0:
                         result = inference_results[0]
                         if "inference_result" in result and "Inferences" in result["inference_result"]:
                             for inference in result["inference_result"]["Inferences"]:
                                 if "O" in inference:
-                                    try:
-                                        # メタデータのデコードとデシリアライズ
-                                        decoded_data = self.decode_base64(inference["O"])
-                                        deserialized_data = self.deserialize_flatbuffers(decoded_data)
-                                        
-                                        # 真っ黒な320x320の画像を生成
-                                        self.notify_status("黒画像に推論結果を表示")
-                                        image = np.zeros((320, 320, 3), dtype=np.uint8)  # 黒い画像
-                                        
-                                        # バウンディングボックスの描画と検出情報の取得
-                                        image_with_boxes, detection_labels = draw_bounding_boxes(image, deserialized_data, self.objclass, scale_x=1, scale_y=1)
-                                        
-                                        # 検出情報を保存
-                                        self.detected_labels = detection_labels
-                                        
-                                        # 画像をjpegで保存
-                                        output_path = 'jpeg.jpg'
-                                        cv2.imwrite(output_path, image_with_boxes)
-                                        
-                                        # GUIに画像とステータスを表示
-                                        if self.callback:
-                                            # OpenCV画像をRGB形式に変換
-                                            self.callback("image", image_with_boxes)
-                                            self.callback("detection", self.detected_labels)
-                                    except Exception as e:
-                                        self.notify_status(f"推論結果処理エラー: {str(e)}")
-                                    
+                                    # 真っ黒な画像に推論結果を表示（デコード段で画像を生成する）
+                                    self.notify_status("黒画像に推論結果を表示")
+                                    pipeline.submit(FetchedFrame(None, None, inference["O"]))
                                     break  # 最初の推論結果のみを処理
                     
-                    # 短い間隔で更新
-                    time.sleep(1)
+                    self.report_pipeline_stats()
+                    
+                    # 推論結果の到着間隔に合わせて待機
+                    scheduler.wait()
                     continue
                 
                 # 通常モードでの処理 (画像取得を含む)
+                scheduler.base_interval = IMAGE_POLL_INTERVAL
                 # 画像ディレクトリの取得
                 directories = self.aitrios_client.get_image_directories()
                 if not directories or not directories[0]['devices']:
                     self.notify_status("画像ディレクトリが見つかりません")
-                    time.sleep(5)
+                    scheduler.wait()
                     continue
-
+                
                 # 最新の1つの画像サブディレクトリ名を取得
                 latest_subdirs = directories[0]['devices'][0]['Image'][-1:]
-
+                
                 for i, subdir in enumerate(reversed(latest_subdirs)):
-                    if not running_flag.is_set():
+                    if not running_flag.is_set() or scheduler.stopped:
                         break
                     
-                    # 最新の画像を取得
-                    self.notify_status(f"{subdir}から最新画像を取得中")
-                    image_data = self.aitrios_client.get_images(subdir)
+                    # 最新の画像と前回以降の新しい推論結果を並行して取得
+                    self.notify_status("%sから最新画像と推論結果を取得中", subdir)
+                    image_data, new_inferences = loop.run_until_complete(
+                        self.async_client.get_image_and_new_inference_results(subdir, 10)
+                    )
+                    added_timestamps = self.update_recent_inferences(new_inferences)
                     
                     if not image_data or 'images' not in image_data or len(image_data['images']) == 0:
-                        self.notify_status(f"サブディレクトリ {subdir} に画像が見つかりません")
+                        self.notify_status("サブディレクトリ %s に画像が見つかりません", subdir)
+                        scheduler.observe(len(added_timestamps) > 0)
                         continue
                     
                     # 最新画像の情報を取得
                     latest_image = image_data['images'][0]
                     image_name = latest_image["name"]
-                    image_timestamp = image_name.split('.')[0]  # 拡張子を除いたファイル名（タイムスタンプ）
+                    self.notify_status("最新画像: %s", image_name)
                     
-                    self.notify_status(f"最新画像: {image_name}, タイムスタンプ: {image_timestamp}")
+                    # 新しい画像か推論結果が届いた間隔からポーリング間隔を調整する
+                    scheduler.observe(image_name != last_image_name or len(added_timestamps) > 0)
+                    last_image_name = image_name
                     
-                    # 推論結果を取得
-                    self.notify_status("推論結果を取得中")
-                    inference_results = self.aitrios_client.get_inference_results(10)
-                    
-                    found_matching_inference = False
-                    matching_inference = None
-                    
-                    # 推論結果から画像のタイムスタンプと一致するものを探す
-                    if isinstance(inference_results, list) and len(inference_results) > 0:
-                        for result in inference_results:
-                            if "inference_result" in result and "Inferences" in result["inference_result"]:
-                                for inference in result["inference_result"]["Inferences"]:
-                                    if "T" in inference and inference["T"] == image_timestamp:
-                                        matching_inference = inference
-                                        found_matching_inference = True
-                                        self.notify_status(f"画像 {image_name} に対応する推論結果を発見")
-                                        break
-                                if found_matching_inference:
-                                    break
-                    
-                    # 一致する推論結果が見つからない場合
-                    if not found_matching_inference:
-                        self.notify_status(f"画像 {image_name} に対応する推論結果が見つかりません")
-                        
-                        # この部分を追加：推論結果がなくても画像を表示
-                        try:
-                            # 画像をダウンロード
-                            image = download_image(latest_image["contents"])
-                            
-                            # 推論結果なしの場合でも画像を表示
-                            detection_labels = ["推論結果なし"]
-                            self.detected_labels = detection_labels
-                            
-                            # 画像をjpegで保存
-                            output_path = 'jpeg.jpg'
-                            cv2.imwrite(output_path, image)
-                            
-                            # GUIに画像とステータスを表示
-                            if self.callback:
-                                self.callback("image", image)
-                                self.callback("detection", self.detected_labels)
-                        except Exception as e:
-                            self.notify_status(f"画像処理エラー: {str(e)}")
-                        
-                        continue
-                    
-                    # 対応する推論結果が見つかった場合の処理
-                    if matching_inference and "O" in matching_inference:
-                        try:
-                            # メタデータのデコードとデシリアライズ
-                            decoded_data = self.decode_base64(matching_inference["O"])
-                            deserialized_data = self.deserialize_flatbuffers(decoded_data)
-                            
-                            # 画像をダウンロード
-                            image = download_image(latest_image["contents"])
-                            
-                            # バウンディングボックスの描画と検出情報の取得
-                            image_with_boxes, detection_labels = draw_bounding_boxes(image, deserialized_data, self.objclass, scale_x=1, scale_y=1)
-                            
-                            # 検出情報を保存
-                            self.detected_labels = detection_labels
-                            
-                            # 画像をjpegで保存
-                            output_path = 'jpeg.jpg'
-                            cv2.imwrite(output_path, image_with_boxes)
-                            
-                            # GUIに画像とステータスを表示
-                            if self.callback:
-                                # OpenCV画像をRGB形式に変換
-                                self.callback("image", image_with_boxes)
-                                self.callback("detection", self.detected_labels)
-                        except Exception as e:
-                            self.notify_status(f"推論結果処理エラー: {str(e)}")
+                    # デコードと描画は後段に任せ、このスレッドは次の取得に進む
+                    # （表示中の画像の推論結果が遅れて届いた場合はここで描き直される）
+                    self.submit_image(pipeline, image_name, latest_image["contents"])
                 
-                # 処理間隔を設ける
-                time.sleep(5)
+                self.report_pipeline_stats()
                 
+                # 画像の到着間隔に合わせて待機
+                scheduler.wait()
+            
+            except CircuitOpenError as e:
+                logger.warning("AITRIOS API遮断中: %s", e)
+                self.notify_status("AITRIOS API遮断中: %s", e)
+                scheduler.wait(max(e.retry_after, 1))
             except Exception as e:
-                self.notify_status(f"エラー: {str(e)}")
-                time.sleep(5)
-        
-        # 処理終了時にデバイス監視も終了
-        if self.device_monitor_flag.is_set():
-            self.device_monitor_flag.clear()
-            if self.device_monitor_thread and self.device_monitor_thread.is_alive():
-                self.device_monitor_thread.join(1.0)
\ No newline at end of file
+                logger.exception("画像処理ループでエラーが発生しました")
+                self.notify_status("エラー: %s", e)
+                scheduler.wait(ERROR_RETRY_INTERVAL)
+        
+        # 処理終了時にパイプラインとイベントループを閉じ、デバイス状態の購読を解除
+        self.pipeline = None
+        pipeline.stop()
+        loop.close()
+        self.device_state.unsubscribe(self.on_device_state_changed)
\ No newline at end of file
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+デバイス状態サービスモジュール
+UIと検出プロセッサで共有するデバイス状態のキャッシュと変更通知
+"""
+
+import logging
+import time
+import threading
+from datetime import datetime
+
+from kumaMac.api.resilience import CircuitOpenError
+from kumaMac.core.polling_scheduler import PollingScheduler
+
+logger = logging.getLogger(__name__)
+
+# キャッシュの有効期間（秒）
+DEFAULT_TTL = 2.0
+# バックグラウンド監視の間隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+# 未接続の間に監視の間隔を伸ばす上限（秒）
+MAX_POLL_INTERVAL = 30.0
+
+
+class DeviceStateService:
+    """デバイス状態を1か所で取得・キャッシュし、購読者へ配信するクラス"""
+    
+    def __init__(self, aitrios_client, ttl=DEFAULT_TTL, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        デバイス状態サービスの初期化
+        
+        Args:
+            aitrios_client (AITRIOSClient): AITRIOSとの通信クライアント
+            ttl (float): キャッシュの有効期間（秒）
+            poll_interval (float): バックグラウンド監視の間隔（秒）
+        """
+        self.aitrios_client = aitrios_client
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        
+        # キャッシュされた状態
+        self._state = ("Unknown", "Unknown")
+        self._fetched_at = 0
+        self._device_info = None
+        self._etag = None
+        
+        # 同時リクエストを1つにまとめるための状態
+        self._condition = threading.Condition()
+        self._fetching = False
+        
+        # 購読者のリスト [(callback, changes_only)]
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        
+        # バックグラウンド監視スレッド
+        self._poll_thread = None
+        self._poll_scheduler = PollingScheduler(base_interval=poll_interval, min_interval=poll_interval,
+                                                max_interval=max(poll_interval, MAX_POLL_INTERVAL))
+    
+    def set_client(self, aitrios_client):
+        """
+        通信クライアントを差し替える（設定変更時）
+        
+        Args:
+            aitrios_client (AITRIOSClient): 新しい通信クライアント
+        """
+        with self._condition:
+            self.aitrios_client = aitrios_client
+            self._device_info = None
+            self._etag = None
+            self._fetched_at = 0
+    
+    def invalidate(self):
+        """キャッシュを無効化し、次回の取得で必ず問い合わせるようにする"""
+        with self._condition:
+            self._fetched_at = 0
+        # 未接続で監視の間隔が伸びている場合も次の監視を早める
+        self._poll_scheduler.set_idle(False)
+    
+    def get_state(self, max_age=None):
+        """
+        デバイスの接続状態と動作状態を取得
+        
+        キャッシュが有効期間内ならそのまま返し、期限切れの場合は1つのスレッドだけが
+        APIへ問い合わせ、同時に呼び出した他のスレッドはその結果を共有する
+        
+        Args:
+            max_age (float, optional): 許容するキャッシュの経過秒数（省略時はTTL）
+        
+        Returns:
+            tuple: (接続状態, 動作状態)
+        """
+        if max_age is None:
+            max_age = self.ttl
+        
+        # APIが遮断中の場合は問い合わせずに最後の状態を返す
+        breaker = getattr(self.aitrios_client, "circuit_breaker", None)
+        if breaker is not None and breaker.is_open():
+            return self._state
+        
+        requested_at = time.time()
+        while True:
+            with self._condition:
+                while True:
+                    if requested_at - self._fetched_at <= max_age:
+                        return self._state
+                    if not self._fetching:
+                        self._fetching = True
+                        break
+                    # 実行中の問い合わせ結果を待つ
+                    self._condition.wait()
+                    # 待機中に取得された結果は呼び出し後のものなので新鮮とみなす
+                    if self._fetched_at >= requested_at:
+                        return self._state
+            
+            state = self._fetch()
+            if state is not None:
+                return state
+            # 取得中にクライアントが差し替えられたため、新しいクライアントで取り直す
+    
+    def refresh(self):
+        """
+        キャッシュを無視して最新の状態を取得
+        
+        Returns:
+            tuple: (接続状態, 動作状態)
+        """
+        return self.get_state(max_age=0)
+    
+    def _fetch(self):
+        """
+        APIからデバイス状態を取得してキャッシュと購読者を更新
+        （呼び出し前に_fetchingをTrueにしておくこと）
+        
+        Returns:
+            tuple: (接続状態, 動作状態)。取得中にクライアントが差し替えられた場合はNone
+        """
+        with self._condition:
+            client = self.aitrios_client
+            etag = self._etag if self._device_info is not None else None
+        
+        try:
+            device_info, new_etag = client.get_device_info_conditional(etag)
+            if device_info is None:
+                # 304 Not Modified: 前回の内容を再利用
+                device_info = self._device_info
+            state = client.parse_connection_state(device_info)
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                logger.warning("デバイス状態の取得に失敗しました: %s", e)
+            device_info, new_etag = None, None
+            state = ("Unknown", "Unknown")
+        
+        with self._condition:
+            self._fetching = False
+            self._condition.notify_all()
+            # 取得中にクライアントが差し替えられた場合は古いクライアントの結果を破棄する
+            if client is not self.aitrios_client:
+                return None
+            previous = self._state
+            self._device_info = device_info
+            self._etag = new_etag
+            self._fetched_at = time.time()
+            self._state = state
+        
+        self._publish(state, changed=(state != previous))
+        return state
+    
+    def subscribe(self, callback, changes_only=True):
+        """
+        状態の通知を購読する
+        
+        Args:
+            callback (function): callback(接続状態, 動作状態, タイムスタンプ)
+            changes_only (bool): Trueの場合は状態が変化した時のみ通知
+        """
+        with self._subscribers_lock:
+            self._subscribers.append((callback, changes_only))
+    
+    def unsubscribe(self, callback):
+        """
+        状態の購読を解除する
+        
+        Args:
+            callback (function): subscribeで登録したコールバック
+        """
+        with self._subscribers_lock:
+            self._subscribers = [s for s in self._subscribers if s[0] != callback]
+    
+    def _publish(self, state, changed):
+        """
+        購読者に状態を通知
+        
+        Args:
+            state (tuple): (接続状態, 動作状態)
+            changed (bool): 前回から状態が変化したかどうか
+        """
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for callback, changes_only in subscribers:
+            if changes_only and not changed:
+                continue
+            try:
+                callback(state[0], state[1], timestamp)
+            except Exception as e:
+                logger.exception("デバイス状態の通知先でエラーが発生しました: %s", e)
+    
+    def start(self):
+        """バックグラウンドでの定期的な状態監視を開始"""
+        if self._poll_thread and self._poll_thread.is_alive():
+            return
+        self._poll_scheduler.reset()
+        self._poll_thread = threading.Thread(target=self._poll_loop)
+        self._poll_thread.daemon = True
+        self._poll_thread.start()
+    
+    def stop(self):
+        """バックグラウンドでの状態監視を停止"""
+        self._poll_scheduler.stop()
+        if self._poll_thread and self._poll_thread.is_alive() \
+                and self._poll_thread is not threading.current_thread():
+            self._poll_thread.join(1.0)
+        self._poll_thread = None
+    
+    def _poll_loop(self):
+        """定期的に状態を取得して購読者に配信する（未接続の間は間隔を伸ばす）"""
+        scheduler = self._poll_scheduler
+        while not scheduler.stopped:
+            connection_state, _ = self.get_state(max_age=self.poll_interval / 2)
+            scheduler.set_idle(connection_state != "Connected")
+            
+            # APIが遮断中の場合は再試行可能になるまで待つ
+            interval = scheduler.next_interval()
+            breaker = getattr(self.aitrios_client, "circuit_breaker", None)
+            if breaker is not None and breaker.is_open():
+                interval = max(interval, breaker.retry_after())
+            scheduler.wait(interval)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+推論結果インデックスモジュール
+画像のタイムスタンプと推論結果（T）を照合するための時刻順インデックス
+"""
+
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime
+
+# 既定で保持する推論結果の数
+DEFAULT_INDEX_LIMIT = 50
+
+# AITRIOSのタイムスタンプ形式（yyyyMMddHHmmssfff）の桁数
+TIMESTAMP_DIGITS = 17
+
+
+def timestamp_to_ms(timestamp):
+    """
+    タイムスタンプ文字列をミリ秒に変換
+    
+    Args:
+        timestamp (str): タイムスタンプ（yyyyMMddHHmmssfff形式、または整数のミリ秒）
+    
+    Returns:
+        int: エポックからのミリ秒（解釈できない場合はNone）
+    """
+    if not isinstance(timestamp, str) or not timestamp.isdigit():
+        return None
+    if len(timestamp) == TIMESTAMP_DIGITS:
+        try:
+            moment = datetime.strptime(timestamp[:14], "%Y%m%d%H%M%S")
+        except ValueError:
+            return None
+        # タイムゾーンに依存しないよう、エポックからの差分で計算する
+        seconds = (moment - datetime(1970, 1, 1)).total_seconds()
+        return int(seconds) * 1000 + int(timestamp[14:])
+    return int(timestamp)
+
+
+class InferenceIndex:
+    """
+    直近の推論結果をタイムスタンプ順に保持するインデックス
+    
+    キーは時刻順に並べた配列で管理し、完全一致は辞書で、
+    許容誤差内の最も近い結果は二分探索で探す
+    """
+    
+    def __init__(self, limit=DEFAULT_INDEX_LIMIT, tolerance_ms=0):
+        """
+        インデックスの初期化
+        
+        Args:
+            limit (int): 保持する推論結果の最大数
+            tolerance_ms (int): 照合時に許容するタイムスタンプの差（ミリ秒）
+        """
+        self.limit = limit
+        self.tolerance_ms = tolerance_ms
+        # タイムスタンプ(T) → 推論結果（追加順）
+        self._records = OrderedDict()
+        # ミリ秒に変換できたタイムスタンプの昇順配列と、対応するT
+        self._keys = []
+        self._timestamps = []
+    
+    def __len__(self):
+        return len(self._records)
+    
+    def __contains__(self, timestamp):
+        return timestamp in self._records
+    
+    def clear(self):
+        """インデックスを空にする"""
+        self._records.clear()
+        self._keys = []
+        self._timestamps = []
+    
+    def add(self, inference):
+        """
+        推論結果を追加
+        
+        Args:
+            inference (dict): 推論結果（Inferencesの要素）
+        
+        Returns:
+            bool: 新しく追加された場合True（Tがない場合や登録済みの場合False）
+        """
+        timestamp = inference.get("T")
+        if timestamp is None:
+            return False
+        
+        is_new = timestamp not in self._records
+        self._records[timestamp] = inference
+        if is_new:
+            key = timestamp_to_ms(timestamp)
+            if key is not None:
+                index = bisect_left(self._keys, key)
+                self._keys.insert(index, key)
+                self._timestamps.insert(index, timestamp)
+        
+        # 上限を超えた場合は最も古い時刻のものから削除する
+        while len(self._records) > self.limit:
+            self._evict_oldest()
+        return is_new and timestamp in self._records
+    
+    def _evict_oldest(self):
+        """最も古い推論結果を削除"""
+        if self._keys:
+            self._keys.pop(0)
+            timestamp = self._timestamps.pop(0)
+            del self._records[timestamp]
+        else:
+            self._records.popitem(last=False)
+    
+    def update(self, inference_results):
+        """
+        増分取得した推論結果レコードを追加
+        
+        Args:
+            inference_results (list): 推論結果レコードのリスト
+        
+        Returns:
+            list: 新しく追加されたタイムスタンプ(T)のリスト
+        """
+        added = []
+        for result in inference_results:
+            for inference in result.get("inference_result", {}).get("Inferences", []):
+                if self.add(inference):
+                    added.append(inference["T"])
+        return added
+    
+    def lookup(self, timestamp, tolerance_ms=None):
+        """
+        タイムスタンプに一致する推論結果を探す
+        
+        完全一致がない場合は許容誤差内で最も近い推論結果を返す
+        
+        Args:
+            timestamp (str): 画像のタイムスタンプ
+            tolerance_ms (int, optional): 許容するタイムスタンプの差（Noneの場合は既定値）
+        
+        Returns:
+            dict: 推論結果（見つからない場合はNone）
+        """
+        inference = self._records.get(timestamp)
+        if inference is not None:
+            return inference
+        
+        if tolerance_ms is None:
+            tolerance_ms = self.tolerance_ms
+        key = timestamp_to_ms(timestamp)
+        if tolerance_ms <= 0 or key is None or not self._keys:
+            return None
+        
+        # 前後の2件のうち近い方を候補にする
+        index = bisect_left(self._keys, key)
+        best = None
+        best_diff = tolerance_ms + 1
+        for candidate in (index - 1, index):
+            if 0 <= candidate < len(self._keys):
+                diff = abs(self._keys[candidate] - key)
+                if diff < best_diff:
+                    best, best_diff = candidate, diff
+        if best is None:
+            return None
+        return self._records[self._timestamps[best]]
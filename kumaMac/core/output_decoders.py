@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+出力テンソルデコーダーモジュール
+モデルの出力形式ごとにデコーダーと描画関数を登録し、設定に応じて選択する
+
+標準で登録するのは、生成コード（ObjectDetectionTop.py）でレイアウトが確認できる物体検出のみ。
+クラス分類・セグメンテーション・キーポイントのデコーダーは、リポジトリに
+スキーマ（.fbs）や生成コードがなくフィールド位置を確認できないため登録しない。
+使用するモデルのスキーマとフィールド位置が一致することを確認したうえで、
+register_decoder(OUTPUT_SEGMENTATION, SegmentationDecoder, draw_segmentation)
+のように明示的に登録すること
+"""
+
+from collections import namedtuple
+import numpy as np
+import flatbuffers
+from flatbuffers.table import Table
+
+from kumaMac.core.detection_decoder import VtableCachedDecoder, active_filter, read_fields, read_uoffset
+from kumaMac.utils.image_utils import draw_bounding_boxes
+
+# 出力形式の名前
+OUTPUT_OBJECT_DETECTION = "object_detection"
+OUTPUT_CLASSIFICATION = "classification"
+OUTPUT_SEGMENTATION = "segmentation"
+OUTPUT_KEYPOINTS = "keypoints"
+
+# クラス分類結果1件分のレイアウト
+CLASSIFICATION_DTYPE = np.dtype([
+    ("class_id", "<u4"),
+    ("score", "<f4"),
+])
+
+# 各テーブルのvtable上のフィールド位置（4 + 2 * フィールド番号）
+# スキーマで確認していない想定のレイアウト（モジュールの説明を参照）
+# ClassificationTop / ClassificationData / GeneralClassification
+VT_PERCEPTION = 4
+VT_CLASSIFICATION_LIST = 4
+VT_CLASS_ID = 4
+VT_SCORE = 6
+# SemanticSegmentationData
+VT_HEIGHT = 4
+VT_WIDTH = 6
+VT_CLASS_ID_MAP = 8
+VT_NUM_CLASS_ID = 10
+VT_SCORE_MAP = 12
+
+# セグメンテーション結果（class_mapとscore_mapは入力バッファのビュー）
+SegmentationResult = namedtuple("SegmentationResult", ["class_map", "score_map", "num_classes"])
+
+# キーポイント結果（keypointsは入力バッファのビューで形状は(人数, キーポイント数, 3)）
+KeypointResult = namedtuple("KeypointResult", ["keypoints", "scores"])
+
+# 出力形式名 → (デコーダーを作る関数, 描画関数)
+_REGISTRY = {}
+
+
+def register_decoder(output_type, factory, renderer):
+    """
+    出力形式のデコーダーを登録
+    
+    Args:
+        output_type (str): 出力形式の名前
+        factory (function): factory(**options)でデコーダーを返す関数（decode(buf, detection_filter)を持つこと）
+        renderer (function): renderer(image, result, objclass, scale_x, scale_y)で
+                             (描画された画像, ラベルのリスト)を返す関数
+    """
+    _REGISTRY[output_type] = (factory, renderer)
+
+
+def get_decoder(output_type, **options):
+    """
+    登録されたデコーダーを作成
+    
+    Args:
+        output_type (str): 出力形式の名前
+        **options: デコーダーに渡すオプション
+    
+    Returns:
+        tuple: (デコーダー, 描画関数)
+    
+    Raises:
+        Exception: 出力形式が登録されていない場合
+    """
+    if output_type not in _REGISTRY:
+        raise Exception(f"未対応の出力形式です: {output_type}")
+    factory, renderer = _REGISTRY[output_type]
+    return factory(**options), renderer
+
+
+def available_output_types():
+    """
+    登録されている出力形式の一覧
+    
+    Returns:
+        list: 出力形式の名前のリスト
+    """
+    return list(_REGISTRY)
+
+
+def _get_perception(buf):
+    """
+    ルートテーブルのperceptionフィールドが指すテーブルを取得
+    
+    Args:
+        buf: FlatBuffersバッファ
+    
+    Returns:
+        Table: perceptionテーブル（ない場合はNone）
+    """
+    top = Table(buf, flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, 0))
+    o = top.Offset(VT_PERCEPTION)
+    if o == 0:
+        return None
+    return Table(buf, read_uoffset(buf, top.Pos + o))
+
+
+def _vector_view(buf, table, vt_offset, dtype):
+    """
+    テーブルのスカラー型ベクターをコピーせずにNumPy配列として参照
+    
+    Args:
+        buf: FlatBuffersバッファ
+        table (Table): ベクターを持つテーブル
+        vt_offset (int): vtable上のフィールド位置
+        dtype (str): 要素の型
+    
+    Returns:
+        numpy.ndarray: バッファのビュー（フィールドがない場合はNone）
+    """
+    o = table.Offset(vt_offset)
+    if o == 0:
+        return None
+    vector_pos = read_uoffset(buf, table.Pos + o)
+    length = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, vector_pos)
+    return np.frombuffer(buf, dtype=dtype, count=length, offset=vector_pos + 4)
+
+
+def _read_scalar(table, vt_offset, flags, default=0):
+    """
+    テーブルのスカラーフィールドを読み込む
+    
+    Args:
+        table (Table): テーブル
+        vt_offset (int): vtable上のフィールド位置
+        flags: flatbuffers.number_typesの型
+        default: フィールドがない場合の値
+    
+    Returns:
+        フィールドの値
+    """
+    o = table.Offset(vt_offset)
+    if o == 0:
+        return default
+    return table.Get(flags, table.Pos + o)
+
+
+class ClassificationDecoder:
+    """ClassificationTopのFlatBuffersデータをデコードするクラス"""
+    
+    def __init__(self, top_k=5):
+        """
+        Args:
+            top_k (int): スコアの高い順に返す件数（Noneの場合は全件）
+        """
+        self.top_k = top_k
+    
+    def decode(self, buf, detection_filter=None):
+        """
+        クラス分類結果をデコード
+        
+        Args:
+            buf (bytes): FlatBuffersでシリアライズされたデータ（bytes / bytearray / memoryview）
+            detection_filter (DetectionFilter, optional): 絞り込み条件
+        
+        Returns:
+            numpy.ndarray: CLASSIFICATION_DTYPEの構造化配列（スコアの高い順）
+        """
+        perception = _get_perception(buf)
+        if perception is None:
+            return np.empty(0, dtype=CLASSIFICATION_DTYPE)
+        o = perception.Offset(VT_CLASSIFICATION_LIST)
+        if o == 0:
+            return np.empty(0, dtype=CLASSIFICATION_DTYPE)
+        
+        vector_pos = read_uoffset(buf, perception.Pos + o)
+        length = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, vector_pos)
+        elements_pos = vector_pos + 4
+        offsets = np.frombuffer(buf, dtype="<u4", count=length, offset=elements_pos)
+        table_pos = elements_pos + 4 * np.arange(length, dtype=np.int64) + offsets
+        
+        data = np.frombuffer(buf, dtype=np.uint8)
+        results = np.zeros(length, dtype=CLASSIFICATION_DTYPE)
+        if length == 0:
+            return results
+        read_fields(data, table_pos, VT_CLASS_ID, "<u4", results["class_id"])
+        read_fields(data, table_pos, VT_SCORE, "<f4", results["score"])
+        
+        detection_filter = active_filter(detection_filter)
+        if detection_filter is not None:
+            results = results[detection_filter.mask(results["class_id"], results["score"])]
+        
+        order = np.argsort(results["score"], kind="stable")[::-1]
+        if self.top_k is not None:
+            order = order[:self.top_k]
+        return results[order]
+
+
+class SegmentationDecoder:
+    """SemanticSegmentationTopのFlatBuffersデータをデコードするクラス"""
+    
+    def decode(self, buf, detection_filter=None):
+        """
+        セグメンテーション結果をデコード
+        
+        クラスIDマップとスコアマップはバッファのビューとして返すため、
+        バッファを解放する前に描画などの処理を済ませること
+        
+        Args:
+            buf (bytes): FlatBuffersでシリアライズされたデータ（bytes / bytearray / memoryview）
+            detection_filter (DetectionFilter, optional): 使用しない（インターフェースを揃えるための引数）
+        
+        Returns:
+            SegmentationResult: セグメンテーション結果（データがない場合はNone）
+        """
+        perception = _get_perception(buf)
+        if perception is None:
+            return None
+        
+        number_types = flatbuffers.number_types
+        height = _read_scalar(perception, VT_HEIGHT, number_types.Uint16Flags)
+        width = _read_scalar(perception, VT_WIDTH, number_types.Uint16Flags)
+        num_classes = _read_scalar(perception, VT_NUM_CLASS_ID, number_types.Uint16Flags)
+        
+        class_map = _vector_view(buf, perception, VT_CLASS_ID_MAP, "<u2")
+        if class_map is None or len(class_map) != height * width:
+            return None
+        score_map = _vector_view(buf, perception, VT_SCORE_MAP, "<f4")
+        if score_map is not None:
+            score_map = score_map.reshape(height, width) if len(score_map) == height * width else None
+        
+        return SegmentationResult(class_map.reshape(height, width), score_map, num_classes)
+
+
+class KeypointDecoder:
+    """
+    姿勢推定モデルの出力テンソルをデコードするクラス
+    
+    出力はfloat32の密な配列で、1人あたりnum_keypoints個の(x, y, score)が
+    人数分並んでいるものとする（入力テンソル上の画素座標）
+    """
+    
+    def __init__(self, num_keypoints=17, min_score=0.0):
+        """
+        Args:
+            num_keypoints (int): 1人あたりのキーポイント数（COCO形式は17）
+            min_score (float): この値未満の人物（キーポイントの平均スコア）を除外する
+        """
+        self.num_keypoints = num_keypoints
+        self.min_score = min_score
+    
+    def decode(self, buf, detection_filter=None):
+        """
+        キーポイントをデコード
+        
+        Args:
+            buf (bytes): 出力テンソルのバイト列（bytes / bytearray / memoryview）
+            detection_filter (DetectionFilter, optional): 絞り込み条件（min_scoreのみ使用）
+        
+        Returns:
+            KeypointResult: キーポイント結果（keypointsはバッファのビュー）
+        """
+        stride = self.num_keypoints * 3
+        count = len(buf) // (4 * stride)
+        keypoints = np.frombuffer(buf, dtype="<f4", count=count * stride).reshape(count, self.num_keypoints, 3)
+        scores = keypoints[:, :, 2].mean(axis=1) if count else np.empty(0, dtype=np.float32)
+        
+        min_score = self.min_score
+        if detection_filter is not None:
+            min_score = max(min_score, detection_filter.min_score)
+        if min_score > 0 and count:
+            keep = scores >= min_score
+            if not keep.all():
+                # 除外がある場合のみコピーが発生する
+                keypoints = keypoints[keep]
+                scores = scores[keep]
+        
+        return KeypointResult(keypoints, scores)
+
+
+register_decoder(OUTPUT_OBJECT_DETECTION, VtableCachedDecoder, draw_bounding_boxes)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+処理パイプラインモジュール
+取得・デコード・描画などの処理段を有界キューでつなぎ、それぞれ専用スレッドで実行する
+"""
+
+import time
+import threading
+from collections import deque
+
+# キューの既定の容量（超えた分は古い項目から捨てる）
+DEFAULT_QUEUE_SIZE = 1
+
+
+class PipelineClosed(Exception):
+    """キューが閉じられ、取り出す項目がないことを示す例外"""
+    pass
+
+
+class LatestQueue:
+    """容量を超えた場合に最も古い項目を捨てる有界キュー（最新の項目を優先する）"""
+    
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            maxsize (int): キューの容量
+        """
+        self.maxsize = maxsize
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        
+        # 統計情報
+        self.put_count = 0
+        self.dropped = 0
+    
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+    
+    def put(self, item):
+        """
+        項目を追加（満杯の場合は最も古い項目を捨てる）
+        
+        Args:
+            item: 追加する項目
+        
+        Returns:
+            bool: 追加できた場合True（閉じられている場合False）
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._condition.notify()
+            return True
+    
+    def get(self):
+        """
+        項目を取り出す（項目が届くまで待つ）
+        
+        Returns:
+            取り出した項目
+        
+        Raises:
+            PipelineClosed: キューが閉じられて空の場合
+        """
+        with self._condition:
+            while not self._items:
+                if self._closed:
+                    raise PipelineClosed()
+                self._condition.wait()
+            return self._items.popleft()
+    
+    def close(self):
+        """キューを閉じ、残っている項目を捨てて待機中のスレッドを起こす"""
+        with self._condition:
+            self._closed = True
+            self._items.clear()
+            self._condition.notify_all()
+
+
+class PipelineStage:
+    """入力キューから項目を取り出して処理し、結果を次の段のキューに渡す処理段"""
+    
+    def __init__(self, name, handler, input_queue, on_error=None):
+        """
+        Args:
+            name (str): 処理段の名前
+            handler (function): handler(項目)で結果を返す関数（Noneを返した場合は次の段に渡さない）
+            input_queue (LatestQueue): 入力キュー
+            on_error (function, optional): on_error(処理段の名前, 例外)でエラーを通知する関数
+        """
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = None
+        self.on_error = on_error
+        self._thread = None
+        
+        # 統計情報
+        self.processed = 0
+        self.errors = 0
+        self.average_ms = 0.0
+    
+    def start(self):
+        """処理段のスレッドを開始"""
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+    
+    def join(self, timeout=None):
+        """
+        処理段のスレッドの終了を待つ
+        
+        Args:
+            timeout (float, optional): 最大待ち時間（秒）
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _run(self):
+        """処理段のスレッドの処理"""
+        while True:
+            try:
+                item = self.input_queue.get()
+            except PipelineClosed:
+                return
+            
+            started = time.perf_counter()
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                if self.on_error:
+                    self.on_error(self.name, e)
+                continue
+            
+            # 処理時間の指数移動平均
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.average_ms = elapsed_ms if self.processed == 0 else self.average_ms * 0.8 + elapsed_ms * 0.2
+            self.processed += 1
+            
+            if result is not None and self.output_queue is not None:
+                self.output_queue.put(result)
+    
+    def stats(self):
+        """
+        処理段の統計情報
+        
+        Returns:
+            dict: キューの深さ・捨てた項目数・処理数・エラー数・平均処理時間（ミリ秒）
+        """
+        return {
+            "queue_depth": len(self.input_queue),
+            "dropped": self.input_queue.dropped,
+            "processed": self.processed,
+            "errors": self.errors,
+            "average_ms": self.average_ms,
+        }
+
+
+class Pipeline:
+    """処理段を順につないだパイプライン"""
+    
+    def __init__(self, on_error=None):
+        """
+        Args:
+            on_error (function, optional): on_error(処理段の名前, 例外)でエラーを通知する関数
+        """
+        self.on_error = on_error
+        self.stages = []
+    
+    def add_stage(self, name, handler, maxsize=DEFAULT_QUEUE_SIZE):
+        """
+        パイプラインの末尾に処理段を追加
+        
+        Args:
+            name (str): 処理段の名前
+            handler (function): handler(項目)で結果を返す関数
+            maxsize (int): この処理段の入力キューの容量
+        
+        Returns:
+            PipelineStage: 追加した処理段
+        """
+        stage = PipelineStage(name, handler, LatestQueue(maxsize), self.on_error)
+        if self.stages:
+            self.stages[-1].output_queue = stage.input_queue
+        self.stages.append(stage)
+        return stage
+    
+    def start(self):
+        """すべての処理段を開始"""
+        for stage in self.stages:
+            stage.start()
+    
+    def submit(self, item):
+        """
+        先頭の処理段に項目を渡す（処理が追いつかない場合は古い項目が捨てられる）
+        
+        Args:
+            item: 処理する項目
+        
+        Returns:
+            bool: 受け付けた場合True
+        """
+        return self.stages[0].input_queue.put(item)
+    
+    def stop(self, timeout=1.0):
+        """
+        すべてのキューを閉じて処理段を終了
+        
+        Args:
+            timeout (float): 処理段ごとの最大待ち時間（秒）
+        """
+        for stage in self.stages:
+            stage.input_queue.close()
+        for stage in self.stages:
+            stage.join(timeout)
+    
+    def stats(self):
+        """
+        各処理段の統計情報
+        
+        Returns:
+            dict: {処理段の名前: 統計情報}
+        """
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ポーリングスケジューラーモジュール
+新しいデータの到着間隔に合わせてポーリング間隔を調整し、停止や状態変化で待機を中断する
+"""
+
+import time
+import threading
+
+# 既定のポーリング間隔（秒）
+DEFAULT_BASE_INTERVAL = 5.0
+DEFAULT_MIN_INTERVAL = 0.5
+DEFAULT_MAX_INTERVAL = 30.0
+
+# 待機中（Idle・未接続）の間隔を伸ばす倍率
+DEFAULT_BACKOFF_FACTOR = 2.0
+
+# 到着間隔に対するポーリング間隔の比率（到着間隔の半分で問い合わせる）
+DEFAULT_POLL_RATIO = 0.5
+
+# 到着間隔の指数移動平均の係数
+DEFAULT_SMOOTHING = 0.3
+
+
+class PollingScheduler:
+    """
+    ポーリングの間隔を決めて待機するクラス
+    
+    新しいデータが届いた間隔の移動平均からポーリング間隔を求め、
+    待機中は間隔を指数的に伸ばす。待機はイベント待ちで行うため、
+    stop()やwake()を呼ぶとすぐに戻る
+    """
+    
+    def __init__(self, base_interval=DEFAULT_BASE_INTERVAL, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 poll_ratio=DEFAULT_POLL_RATIO, smoothing=DEFAULT_SMOOTHING):
+        """
+        スケジューラーの初期化
+        
+        Args:
+            base_interval (float): 到着間隔が分からない場合の間隔（秒）
+            min_interval (float): 間隔の下限（秒）
+            max_interval (float): 間隔の上限（秒）
+            backoff_factor (float): 待機中に間隔を伸ばす倍率
+            poll_ratio (float): 到着間隔に対するポーリング間隔の比率
+            smoothing (float): 到着間隔の指数移動平均の係数
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.poll_ratio = poll_ratio
+        self.smoothing = smoothing
+        
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._woken = False
+        
+        # 到着間隔の推定と待機中のバックオフ
+        self._last_arrival = None
+        self._arrival_period = None
+        self._idle = False
+        self._backoff_level = 0
+    
+    @property
+    def stopped(self):
+        """停止が要求されているかどうか"""
+        return self._stopped
+    
+    def reset(self):
+        """停止状態と到着間隔の推定を初期化（ループの開始時に呼び出す）"""
+        with self._condition:
+            self._stopped = False
+            self._woken = False
+            self._last_arrival = None
+            self._arrival_period = None
+            self._idle = False
+            self._backoff_level = 0
+    
+    def stop(self):
+        """停止を要求し、待機中のスレッドをすぐに戻す"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+    
+    def wake(self):
+        """待機中のスレッドをすぐに戻す（状態の変化時など）"""
+        with self._condition:
+            self._woken = True
+            self._backoff_level = 0
+            self._condition.notify_all()
+    
+    def set_idle(self, idle):
+        """
+        待機中かどうかを設定（待機中は間隔を指数的に伸ばす）
+        
+        Args:
+            idle (bool): デバイスがIdle・未接続などで新しいデータが届かない状態の場合True
+        """
+        with self._condition:
+            if not idle:
+                self._backoff_level = 0
+            self._idle = idle
+    
+    def observe(self, arrived):
+        """
+        ポーリングの結果を記録
+        
+        Args:
+            arrived (bool): 新しいデータ（画像や推論結果）が届いた場合True
+        """
+        if not arrived:
+            return
+        now = time.monotonic()
+        with self._condition:
+            if self._last_arrival is not None:
+                period = now - self._last_arrival
+                if self._arrival_period is None:
+                    self._arrival_period = period
+                else:
+                    self._arrival_period += (period - self._arrival_period) * self.smoothing
+            self._last_arrival = now
+            self._backoff_level = 0
+    
+    def next_interval(self):
+        """
+        次のポーリングまでの間隔を取得
+        
+        Returns:
+            float: 間隔（秒）
+        """
+        with self._condition:
+            if self._idle:
+                interval = self.base_interval * (self.backoff_factor ** self._backoff_level)
+            elif self._arrival_period is not None:
+                # 前回の到着から平均より長く空いている場合は到着が遅くなったとみなす
+                period = max(self._arrival_period, time.monotonic() - self._last_arrival)
+                interval = period * self.poll_ratio
+            else:
+                interval = self.base_interval
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def wait(self, interval=None):
+        """
+        次のポーリングまで待機
+        
+        Args:
+            interval (float, optional): 待機する秒数（省略時はnext_interval()）
+        
+        Returns:
+            bool: 停止が要求された場合False
+        """
+        if interval is None:
+            interval = self.next_interval()
+        deadline = time.monotonic() + interval
+        with self._condition:
+            if self._idle and interval < self.max_interval:
+                self._backoff_level += 1
+            while not self._stopped and not self._woken:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            self._woken = False
+            return not self._stopped
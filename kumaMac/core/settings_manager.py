@@ -6,10 +6,30 @@
 アプリケーション設定の読み書きを管理
 """
 
+import logging
 import os
 import re
 import settings
 
+logger = logging.getLogger(__name__)
+
+# 設定ファイルに項目がない場合の既定値
+DEFAULT_SETTINGS = {
+    'DEVICE_ID': "",
+    'CLIENT_ID': "",
+    'CLIENT_SECRET': "",
+    'numberofclass': 3,
+    'objclass': ["CLASS0", "CLASS1", "CLASS2"],
+    'output_type': "object_detection",
+    'snapshot_enabled': True,
+    'snapshot_path': "jpeg.jpg",
+    'snapshot_quality': 90,
+    'snapshot_interval': 1.0,
+    'inference_match_tolerance_ms': 0,
+    'log_capacity': 1000,
+    'log_history_path': "logs/status.log",
+}
+
 class SettingsManager:
     """設定ファイルの読み書きを管理するクラス"""
     
@@ -26,15 +46,15 @@ class SettingsManager:
         if hasattr(settings_module, '__file__'):
             # モジュールの実際のファイルパスを取得
             self.settings_file = os.path.abspath(settings_module.__file__)
-            print(f"設定ファイルのパス: {self.settings_file}")
+            logger.info("設定ファイルのパス: %s", self.settings_file)
         else:
             # モジュールのファイルパスが取得できない場合のフォールバック
-            print("警告: モジュールのファイルパスが取得できません。フォールバックを使用します。")
+            logger.warning("モジュールのファイルパスが取得できません。フォールバックを使用します。")
             # 現在のプロジェクトディレクトリを取得
             current_dir = os.path.dirname(os.path.abspath(__file__))
             parent_dir = os.path.dirname(current_dir)
             self.settings_file = os.path.join(parent_dir, "settings.py")
-            print(f"フォールバックパス: {self.settings_file}")
+            logger.info("フォールバックパス: %s", self.settings_file)
         
         self.config = {}
         self.load_settings()
@@ -46,21 +66,30 @@ class SettingsManager:
         Returns:
             dict: 読み込まれた設定
         """
-        self.config = {
-            'DEVICE_ID': getattr(self.settings_module, 'DEVICE_ID', ""),
-            'CLIENT_ID': getattr(self.settings_module, 'CLIENT_ID', ""),
-            'CLIENT_SECRET': getattr(self.settings_module, 'CLIENT_SECRET', ""),
-            'numberofclass': getattr(self.settings_module, 'numberofclass', 3),
-            'objclass': getattr(self.settings_module, 'objclass', ["CLASS0", "CLASS1", "CLASS2"]),
-        }
+        self.config = {key: getattr(self.settings_module, key, default)
+                       for key, default in DEFAULT_SETTINGS.items()}
         return self.config
     
+    def resolve_path(self, path):
+        """
+        設定ファイルからの相対パスを絶対パスに変換
+        
+        Args:
+            path (str): パス
+        
+        Returns:
+            str: 絶対パス
+        """
+        if os.path.isabs(path):
+            return path
+        return os.path.join(os.path.dirname(self.settings_file), path)
+    
     def save_settings(self, new_settings):
         """
         新しい設定をファイルに保存
         
         Args:
-            new_settings (dict): 保存する新しい設定
+            new_settings (dict): 保存する新しい設定（含まれない項目は変更しない）
             
         Returns:
             bool: 保存が成功したかどうか
@@ -70,7 +99,7 @@ class SettingsManager:
             if not os.path.exists(self.settings_file):
                 raise FileNotFoundError(f"設定ファイルが見つかりません: {self.settings_file}")
             
-            print(f"設定を保存: {self.settings_file}")
+            logger.info("設定を保存: %s", self.settings_file)
             
             # 設定ファイルの内容を一旦読み込む
             with open(self.settings_file, 'r', encoding='utf-8') as f:
@@ -88,7 +117,7 @@ class SettingsManager:
                     if re.search(pattern, modified_content):
                         modified_content = re.sub(pattern, replacement, modified_content)
                     else:
-                        print(f"警告: {key}のパターンがマッチしませんでした")
+                        logger.warning("%sのパターンがマッチしませんでした", key)
             
             # numberofclassの更新
             if 'numberofclass' in new_settings:
@@ -98,7 +127,7 @@ class SettingsManager:
                 if re.search(pattern, modified_content):
                     modified_content = re.sub(pattern, replacement, modified_content)
                 else:
-                    print(f"警告: numberofclassのパターンがマッチしませんでした")
+                    logger.warning("numberofclassのパターンがマッチしませんでした")
             
             # objclassの更新
             if 'objclass' in new_settings:
@@ -119,13 +148,13 @@ class SettingsManager:
                 if re.search(pattern, modified_content, re.DOTALL):
                     modified_content = re.sub(pattern, replacement, modified_content, flags=re.DOTALL)
                 else:
-                    print(f"警告: objclassのパターンがマッチしませんでした")
+                    logger.warning("objclassのパターンがマッチしませんでした")
             
             # LINE Notify関連の設定は削除
             
             # 変更がないかチェック
             if content == modified_content:
-                print("情報: 変更がありませんでした。現在の設定が既に保存されています。")
+                logger.info("変更がありませんでした。現在の設定が既に保存されています。")
                 # 変更がなくても成功として扱う
                 return True
             
@@ -137,15 +166,13 @@ class SettingsManager:
             for key, value in new_settings.items():
                 setattr(self.settings_module, key, value)
             
-            # コンフィグを更新
-            self.config = new_settings
+            # コンフィグを更新（設定画面で編集しない項目は現在の値を残す）
+            self.config.update(new_settings)
             
-            print("設定が正常に保存されました")
+            logger.info("設定が正常に保存されました")
             return True
         except Exception as e:
-            print(f"設定保存エラー: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("設定保存エラー: %s", e)
             return False
             
     def get_setting(self, key, default=None):
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ヘッドレス実行モジュール
+Tkを使わずに画像取得と検出処理を実行し、検出結果をJSON Linesで出力する
+
+使い方:
+    python -m kumaMac.daemon [--output detections.jsonl] [--settings path/to/settings.py]
+"""
+
+import os
+import sys
+import json
+import signal
+import logging
+import argparse
+import threading
+import importlib.util
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 画像を保存しない場合のデコードサイズ（JPEGを1/8などの縮小デコードで済ませる）
+HEADLESS_DECODE_SIZE = (160, 120)
+
+# 停止要求後に処理スレッドの終了を待つ最大秒数
+SHUTDOWN_TIMEOUT = 10.0
+
+
+class JsonLinesWriter:
+    """
+    検出プロセッサのコールバックを受けて1フレーム1行のJSONを書き出すクラス
+    
+    フレームの通知（"frame"または"image"）に続く"detection"の通知で1行を出力する
+    """
+    
+    def __init__(self, stream, objclass, output_type, include_status=False, include_stats=False):
+        """
+        書き出しクラスの初期化
+        
+        Args:
+            stream: 書き出し先（テキストモードのファイル）
+            objclass (list): クラスのリスト
+            output_type (str): モデルの出力形式
+            include_status (bool): ステータスメッセージも出力するかどうか
+            include_stats (bool): パイプラインの統計情報も出力するかどうか
+        """
+        self.stream = stream
+        self.objclass = objclass
+        self.output_type = output_type
+        self.include_status = include_status
+        self.include_stats = include_stats
+        self._lock = threading.Lock()
+        self._detections = None
+    
+    def write(self, record):
+        """
+        1行のJSONを書き出す
+        
+        Args:
+            record (dict): 出力する内容
+        """
+        record = dict(record, time=datetime.now().isoformat(timespec="milliseconds"))
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+    
+    def format_detections(self, detections):
+        """
+        検出結果の構造化配列を辞書のリストに変換
+        
+        Args:
+            detections (numpy.ndarray): 検出結果の構造化配列（DETECTION_DTYPE）
+        
+        Returns:
+            list: {"class_id", "class", "score", "left", "top", "right", "bottom"}の辞書のリスト
+        """
+        results = []
+        for class_id, score, left, top, right, bottom in zip(
+                detections["class_id"].tolist(), detections["score"].tolist(), detections["left"].tolist(),
+                detections["top"].tolist(), detections["right"].tolist(), detections["bottom"].tolist()):
+            name = self.objclass[class_id] if 0 <= class_id < len(self.objclass) else f"Unknown-{class_id}"
+            results.append({"class_id": class_id, "class": name, "score": round(score, 4),
+                            "left": left, "top": top, "right": right, "bottom": bottom})
+        return results
+    
+    def __call__(self, event_type, data):
+        """
+        検出プロセッサからのコールバック
+        
+        Args:
+            event_type (str): イベントタイプ
+            data: イベントデータ
+        """
+        if event_type == "frame":
+            _, detections, _, _ = data
+            self._detections = self.format_detections(detections)
+        elif event_type == "image":
+            self._detections = None
+        elif event_type == "detection":
+            record = {"type": "detection", "output_type": self.output_type, "labels": list(data)}
+            if self._detections is not None:
+                record["detections"] = self._detections
+            self._detections = None
+            self.write(record)
+        elif event_type == "device_state":
+            connection_state, operation_state, timestamp = data
+            self.write({"type": "device_state", "connection_state": connection_state,
+                        "operation_state": operation_state})
+        elif event_type == "status" and self.include_status:
+            self.write({"type": "status", "message": data})
+        elif event_type == "pipeline" and self.include_stats:
+            self.write({"type": "pipeline", "stages": data})
+
+
+def load_settings_module(path=None):
+    """
+    設定モジュールを読み込む
+    
+    Args:
+        path (str, optional): 設定ファイルのパス（省略時は通常のsettingsモジュール）
+    
+    Returns:
+        module: 設定モジュール
+    """
+    if path is None:
+        import settings
+        return settings
+    
+    # 他のモジュールが import settings で同じものを参照できるように登録する
+    spec = importlib.util.spec_from_file_location("settings", os.path.abspath(path))
+    if spec is None:
+        raise Exception(f"設定ファイルを読み込めません: {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["settings"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args(argv=None):
+    """
+    コマンドライン引数を解析
+    
+    Args:
+        argv (list, optional): 引数のリスト
+    
+    Returns:
+        argparse.Namespace: 解析結果
+    """
+    parser = argparse.ArgumentParser(prog="python -m kumaMac.daemon",
+                                     description="Tkを使わずに検出処理を実行し、結果をJSON Linesで出力します")
+    parser.add_argument("--output", "-o", default="-", help="出力先のファイル（既定は標準出力）")
+    parser.add_argument("--settings", default=None, help="設定ファイルのパス（既定はsettings.py）")
+    parser.add_argument("--status", action="store_true", help="ステータスメッセージも出力する")
+    parser.add_argument("--stats", action="store_true", help="パイプラインの統計情報も出力する")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    """
+    ヘッドレスで検出処理を実行（シグナルを受けるまで戻らない）
+    
+    Args:
+        args (argparse.Namespace): コマンドライン引数
+    
+    Returns:
+        int: 終了コード
+    """
+    settings = load_settings_module(args.settings)
+    
+    # 標準出力はJSON Lines専用にし、ログは標準エラー出力とファイルに書く
+    from kumaMac.utils.logging_setup import setup_logging_from_settings, shutdown_logging
+    setup_logging_from_settings(settings)
+    
+    # 重いモジュールは引数の解析とログの設定が終わってから読み込む
+    from kumaMac.api.aitrios_client import AITRIOSClient
+    from kumaMac.core.detection_processor import DetectionProcessor
+    from kumaMac.core.settings_manager import SettingsManager
+    
+    settings_manager = SettingsManager(settings)
+    config = settings_manager.config
+    
+    if args.output == "-":
+        stream = sys.stdout
+    else:
+        stream = open(args.output, "a", encoding="utf-8")
+    
+    client = AITRIOSClient(settings.DEVICE_ID, settings.CLIENT_ID, settings.CLIENT_SECRET)
+    writer = JsonLinesWriter(stream, config['objclass'], config['output_type'],
+                             include_status=args.status, include_stats=args.stats)
+    processor = DetectionProcessor(client, config['objclass'], writer)
+    processor.set_output_type(config['output_type'])
+    processor.set_match_tolerance(config['inference_match_tolerance_ms'])
+    processor.configure_snapshots(
+        path=settings_manager.resolve_path(config['snapshot_path']),
+        quality=config['snapshot_quality'],
+        interval=config['snapshot_interval'],
+        enabled=config['snapshot_enabled']
+    )
+    # スナップショットを保存しない場合は画像を小さくデコードするだけでよい
+    if not config['snapshot_enabled']:
+        processor.set_display_size(*HEADLESS_DECODE_SIZE)
+    
+    # シグナルを受けたら処理ループの待機を中断して終了する
+    stop_event = threading.Event()
+    
+    def _request_stop(signum, frame):
+        logger.info("シグナル %s を受信しました。停止します", signum)
+        stop_event.set()
+    
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _request_stop)
+    
+    running_flag = threading.Event()
+    running_flag.set()
+    worker = threading.Thread(target=processor.process_images, args=(running_flag,), name="processor")
+    worker.start()
+    logger.info("ヘッドレスモードで処理を開始しました（出力: %s）", args.output)
+    
+    exit_code = 0
+    try:
+        # 処理スレッドが異常終了した場合も抜ける
+        while not stop_event.wait(1.0):
+            if not worker.is_alive():
+                logger.error("処理スレッドが終了しました")
+                exit_code = 1
+                break
+    finally:
+        running_flag.clear()
+        processor.request_stop()
+        worker.join(SHUTDOWN_TIMEOUT)
+        if worker.is_alive():
+            logger.warning("処理スレッドが %s 秒以内に終了しませんでした", SHUTDOWN_TIMEOUT)
+        processor.close()
+        processor.device_state.stop()
+        client.close()
+        if stream is not sys.stdout:
+            stream.close()
+        logger.info("停止しました")
+        shutdown_logging()
+    return exit_code
+
+
+def main(argv=None):
+    """
+    ヘッドレス実行のエントリーポイント
+    
+    Args:
+        argv (list, optional): コマンドライン引数
+    
+    Returns:
+        int: 終了コード
+    """
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
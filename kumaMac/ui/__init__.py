@@ -2,10 +2,17 @@
 UIモジュール
 
 アプリケーションのユーザーインターフェースを提供するモジュール
+（各モジュールは公開名が最初に参照されたときに読み込む）
 """
 
-from .main_window import KumakitaApp
-from .main_tab import MainTab
-from .settings_tab import SettingsTab
+from kumaMac.utils.lazy_import import lazy_exports
 
-__all__ = ['KumakitaApp', 'MainTab', 'SettingsTab']
\ No newline at end of file
+_EXPORTS = {
+    'KumakitaApp': '.main_window',
+    'MainTab': '.main_tab',
+    'SettingsTab': '.settings_tab'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = ['KumakitaApp', 'MainTab', 'SettingsTab']
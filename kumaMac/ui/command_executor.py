@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+UIコマンド実行モジュール
+ボタン操作などから呼び出すAPI通信をバックグラウンドのスレッドで実行し、結果をUIスレッドに返す
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from kumaMac.ui.ui_dispatcher import BATCH
+
+logger = logging.getLogger(__name__)
+
+# コマンドを実行するスレッドの数
+COMMAND_WORKERS = 2
+
+# 結果をUIスレッドに返すイベントタイプ
+COMMAND_EVENT = "command"
+
+
+class CommandExecutor:
+    """
+    UIから要求されたコマンドをバックグラウンドで実行するクラス
+    
+    同じキーのコマンドが実行中の場合は新しく受け付けない（ボタンの連打などで
+    同じリクエストが溜まらないようにする）。設定変更などで実行中のコマンドの結果が
+    古くなる場合は、rerun=Trueで完了後にやり直す。完了時のコールバックは
+    配送キュー経由でUIスレッドから呼び出す
+    """
+    
+    def __init__(self, dispatcher, max_workers=COMMAND_WORKERS):
+        """
+        コマンド実行クラスの初期化
+        
+        Args:
+            dispatcher (UIDispatcher): 結果をUIスレッドに返す配送キュー
+            max_workers (int): コマンドを実行するスレッドの数
+        """
+        self.dispatcher = dispatcher
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-command")
+        # 完了済みのFutureへのコールバックは登録した場で呼ばれるため、再入できるロックを使う
+        self._lock = threading.RLock()
+        # 実行中のコマンド {キー: Future}
+        self._in_flight = {}
+        # 実行中のコマンドの完了後にやり直すコマンド {キー: (関数, 成功時, 失敗時)}
+        self._reruns = {}
+        self._closed = False
+        
+        # 完了したコマンドのコールバックはまとめてUIスレッドで呼び出す
+        dispatcher.register(COMMAND_EVENT, self._deliver, BATCH)
+    
+    def submit(self, key, func, on_success=None, on_error=None, rerun=False):
+        """
+        コマンドをバックグラウンドで実行（UIスレッドから呼び出す）
+        
+        Args:
+            key (str): コマンドのキー（同じキーのコマンドは同時に1つだけ実行する）
+            func (function): 実行する関数（引数なし）
+            on_success (function, optional): 成功時にUIスレッドで呼び出す関数 on_success(戻り値)
+            on_error (function, optional): 失敗時にUIスレッドで呼び出す関数 on_error(例外)
+            rerun (bool): 同じキーのコマンドが実行中の場合は完了後にこのコマンドを実行する
+                （実行中のコマンドの結果は古いものとして通知しない）
+        
+        Returns:
+            bool: 受け付けた場合True（同じキーのコマンドが実行中でrerunでない場合、
+                  または終了済みの場合False）
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if key in self._in_flight:
+                if not rerun:
+                    return False
+                # 何度要求されても完了後に最後の1回だけ実行する
+                self._reruns[key] = (func, on_success, on_error)
+                return True
+            self._start(key, func, on_success, on_error)
+        return True
+    
+    def _start(self, key, func, on_success, on_error):
+        """
+        コマンドの実行を開始（_lockを保持した状態で呼び出すこと）
+        
+        Args:
+            key (str): コマンドのキー
+            func (function): 実行する関数
+            on_success (function): 成功時のコールバック
+            on_error (function): 失敗時のコールバック
+        """
+        future = self._executor.submit(func)
+        self._in_flight[key] = future
+        future.add_done_callback(lambda f: self._on_done(key, f, on_success, on_error))
+    
+    def is_running(self, key):
+        """
+        コマンドが実行中かどうか
+        
+        Args:
+            key (str): コマンドのキー
+        
+        Returns:
+            bool: 実行中の場合True
+        """
+        with self._lock:
+            return key in self._in_flight
+    
+    def shutdown(self):
+        """未実行のコマンドを取り消して受付を終了（実行中のコマンドの完了は待たない）"""
+        with self._lock:
+            self._closed = True
+            self._reruns.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _on_done(self, key, future, on_success, on_error):
+        """
+        コマンドの完了時の処理（実行したスレッドから呼ばれる）
+        
+        Args:
+            key (str): コマンドのキー
+            future (concurrent.futures.Future): 完了したコマンド
+            on_success (function): 成功時のコールバック
+            on_error (function): 失敗時のコールバック
+        """
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            rerun = self._reruns.pop(key, None)
+            if rerun is not None and not self._closed:
+                self._start(key, *rerun)
+        if rerun is not None or future.cancelled():
+            # やり直す場合は古い結果を通知しない
+            return
+        
+        error = future.exception()
+        if error is not None:
+            logger.warning("コマンド %s の実行エラー: %s", key, error)
+            if on_error is not None:
+                self.dispatcher.post(COMMAND_EVENT, (on_error, error))
+        elif on_success is not None:
+            self.dispatcher.post(COMMAND_EVENT, (on_success, future.result()))
+    
+    def _deliver(self, completions):
+        """
+        完了したコマンドのコールバックを呼び出す（UIスレッドで実行される）
+        
+        Args:
+            completions (list): [(コールバック, 戻り値または例外)]
+        """
+        for callback, value in completions:
+            try:
+                callback(value)
+            except Exception as e:
+                logger.exception("コマンドの完了処理エラー: %s", e)
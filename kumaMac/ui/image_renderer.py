@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+画像描画モジュール
+キャンバスへのフレーム表示を、バッファとキャンバス項目を再利用して行う
+"""
+
+import tkinter as tk
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+# キャンバスがまだ表示されていない場合に使用するサイズ
+DEFAULT_CANVAS_SIZE = (320, 320)
+
+
+class ImageRenderer:
+    """
+    OpenCV画像をキャンバスに表示するクラス（UIスレッドから呼び出すこと）
+    
+    表示位置と倍率は画像サイズとキャンバスサイズが変わったときだけ計算し直し、
+    縮小結果の書き込み先・PhotoImage・キャンバス上の画像項目はフレーム間で使い回す
+    """
+    
+    def __init__(self, canvas):
+        """
+        描画クラスの初期化
+        
+        Args:
+            canvas (tk.Canvas): 表示先のキャンバス
+        """
+        self.canvas = canvas
+        self.canvas_size = None
+        
+        # (元画像の幅, 高さ) → (表示幅, 表示高さ, X位置, Y位置)の計算結果
+        self._geometry_key = None
+        self._geometry = None
+        
+        # 縮小結果の書き込み先とTk側の画像
+        self._buffer = None
+        self._photo = None
+        self._item = None
+        
+        # キャンバスサイズ変更時に描き直すための最後のフレームとオーバーレイ
+        self.last_frame = None
+        self.last_overlay = None
+    
+    def set_canvas_size(self, width, height):
+        """
+        キャンバスのサイズを設定（次の描画で表示位置を計算し直す）
+        
+        Args:
+            width (int): キャンバスの幅
+            height (int): キャンバスの高さ
+        """
+        if width > 1 and height > 1 and (width, height) != self.canvas_size:
+            self.canvas_size = (width, height)
+            self._geometry_key = None
+    
+    def _get_canvas_size(self):
+        """
+        キャンバスのサイズを取得
+        
+        Returns:
+            tuple: (幅, 高さ)
+        """
+        if self.canvas_size is None:
+            self.set_canvas_size(self.canvas.winfo_width(), self.canvas.winfo_height())
+        return self.canvas_size or DEFAULT_CANVAS_SIZE
+    
+    def _get_geometry(self, image_width, image_height):
+        """
+        アスペクト比を維持してキャンバスに収める表示サイズと位置を取得
+        
+        Args:
+            image_width (int): 画像の幅
+            image_height (int): 画像の高さ
+        
+        Returns:
+            tuple: (表示幅, 表示高さ, X位置, Y位置)
+        """
+        key = (image_width, image_height)
+        if key != self._geometry_key:
+            canvas_width, canvas_height = self._get_canvas_size()
+            ratio = min(canvas_width / image_width, canvas_height / image_height)
+            width = max(1, int(image_width * ratio))
+            height = max(1, int(image_height * ratio))
+            x = max(0, (canvas_width - width) // 2)
+            y = max(0, (canvas_height - height) // 2)
+            self._geometry = (width, height, x, y)
+            self._geometry_key = key
+        return self._geometry
+    
+    def render(self, cv_image, overlay=None):
+        """
+        画像をキャンバスに表示
+        
+        Args:
+            cv_image (numpy.ndarray): OpenCV形式（BGR）の画像
+            overlay (function, optional): overlay(表示画像, X方向の倍率, Y方向の倍率)で
+                                          縮小後の表示画像に重ねて描画する関数
+        """
+        if cv_image is None:
+            return
+        self.last_frame = cv_image
+        self.last_overlay = overlay
+        
+        image_height, image_width = cv_image.shape[:2]
+        width, height, x, y = self._get_geometry(image_width, image_height)
+        
+        # 縮小結果は使い回しのバッファに直接書き込む
+        if self._buffer is None or self._buffer.shape[:2] != (height, width):
+            self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+        if (width, height) == (image_width, image_height):
+            if overlay is None:
+                resized = np.ascontiguousarray(cv_image)
+            else:
+                # 元画像を書き換えないようにバッファへ写してから描画する
+                np.copyto(self._buffer, cv_image)
+                resized = self._buffer
+        else:
+            interpolation = cv2.INTER_AREA if width < image_width else cv2.INTER_LINEAR
+            cv2.resize(cv_image, (width, height), dst=self._buffer, interpolation=interpolation)
+            resized = self._buffer
+        
+        if overlay is not None:
+            overlay(resized, width / image_width, height / image_height)
+        
+        # BGRからRGBへの並べ替えはPILの取り込み時に行う
+        pil_image = Image.frombuffer("RGB", (width, height), resized, "raw", "BGR", 0, 1)
+        
+        if self._photo is not None and (self._photo.width(), self._photo.height()) == (width, height):
+            # 同じサイズなら既存のPhotoImageに上書きする
+            self._photo.paste(pil_image)
+        else:
+            self._photo = ImageTk.PhotoImage(image=pil_image)
+            if self._item is not None:
+                self.canvas.itemconfig(self._item, image=self._photo)
+        
+        if self._item is None:
+            self._item = self.canvas.create_image(x, y, anchor=tk.NW, image=self._photo)
+        else:
+            self.canvas.coords(self._item, x, y)
+    
+    def rerender(self):
+        """最後に表示したフレームを現在のキャンバスサイズで描き直す"""
+        if self.last_frame is not None:
+            self.render(self.last_frame, self.last_overlay)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ログパネルモジュール
+直近のログだけを画面に保持し、全履歴はファイルから必要なときに読み込む
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from collections import deque
+
+from kumaMac.utils.log_history import LogHistory
+
+# 画面に保持するログの行数
+DEFAULT_LOG_CAPACITY = 1000
+
+
+class LogPanel:
+    """
+    ログ表示パネル
+    
+    直近のログをリングバッファに保持し、届いたログは1回の処理で
+    まとめてウィジェットに挿入して上限を超えた古い行を削除する。
+    全履歴は書き込みスレッドが履歴ファイルに追記し、別ウィンドウで末尾から読み込む
+    """
+    
+    def __init__(self, parent, capacity=DEFAULT_LOG_CAPACITY, history_path=None):
+        """
+        ログパネルの初期化
+        
+        Args:
+            parent (tk.Widget): 親ウィジェット
+            capacity (int): 画面に保持するログの行数
+            history_path (str, optional): 全履歴を保存するファイルのパス（Noneの場合は保存しない）
+        """
+        self.parent = parent
+        self.capacity = capacity
+        self.lines = deque(maxlen=capacity)
+        self.history = LogHistory(history_path) if history_path else None
+        
+        # ウィジェットへの反映待ちのログ
+        self._pending = []
+        self._flush_scheduled = False
+        # ウィジェットのテキストの行数（改行を含むメッセージは複数行になる）
+        self._widget_lines = 0
+        
+        self.text = tk.Text(parent, height=6, width=40, font=("Helvetica", 9), state=tk.DISABLED)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+        
+        # ログのスクロールバー
+        scrollbar = ttk.Scrollbar(self.text, command=self.text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.config(yscrollcommand=scrollbar.set)
+        
+        # 全履歴の表示ボタン
+        self.history_button = ttk.Button(parent, text="全履歴を表示", command=self.show_history)
+        self.history_button.pack(anchor=tk.E, padx=2, pady=(0, 2))
+    
+    def set_history_path(self, history_path):
+        """
+        全履歴を保存するファイルを設定
+        
+        Args:
+            history_path (str): 履歴ファイルのパス（Noneの場合は保存しない）
+        """
+        if self.history is not None:
+            self.history.close()
+        self.history = LogHistory(history_path) if history_path else None
+    
+    def set_capacity(self, capacity):
+        """
+        画面に保持するログの行数を変更
+        
+        Args:
+            capacity (int): 行数
+        """
+        self.capacity = max(1, int(capacity))
+        self.lines = deque(self.lines, maxlen=self.capacity)
+        self._trim()
+    
+    def append(self, message):
+        """
+        ログを1行追加（反映は次の処理でまとめて行う）
+        
+        Args:
+            message (str): ログメッセージ
+        """
+        self.extend([message])
+    
+    def extend(self, messages):
+        """
+        ログをまとめて追加（反映は次の処理でまとめて行う）
+        
+        Args:
+            messages (list): ログメッセージのリスト
+        """
+        if not messages:
+            return
+        self.lines.extend(messages)
+        self._pending.extend(messages)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.text.after_idle(self.flush)
+    
+    def flush(self):
+        """反映待ちのログをウィジェットに1回で挿入し、古い行を削除"""
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.history is not None:
+            self.history.append(pending)
+        
+        # 画面に残らない分は挿入しない
+        if len(pending) > self.capacity:
+            pending = pending[-self.capacity:]
+        
+        # 末尾を表示中の場合だけ自動でスクロールする（過去のログを読んでいる間は動かさない）
+        follow = self.text.yview()[1] >= 1.0
+        
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, "\n".join(pending) + "\n")
+        self._widget_lines += sum(message.count("\n") + 1 for message in pending)
+        self._trim()
+        self.text.config(state=tk.DISABLED)
+        if follow:
+            self.text.see(tk.END)
+    
+    def _trim(self):
+        """上限を超えた古い行をウィジェットから削除"""
+        excess = self._widget_lines - self.capacity
+        if excess <= 0:
+            return
+        state = self.text.cget("state")
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.config(state=state)
+        self._widget_lines -= excess
+    
+    def show_history(self):
+        """全履歴を別ウィンドウで表示（末尾から必要な分だけ読み込む）"""
+        self.flush()
+        if self.history is None:
+            lines = "\n".join(self.lines)
+            HistoryWindow(self.parent, None, lines)
+        else:
+            # 直前のログまで読めるように書き込み待ちの分を追記させる
+            self.history.flush()
+            HistoryWindow(self.parent, self.history)
+    
+    def close(self):
+        """反映待ちのログを履歴ファイルに追記して書き込みスレッドを終了"""
+        pending, self._pending = self._pending, []
+        if self.history is not None:
+            self.history.append(pending)
+            self.history.close()
+
+
+class HistoryWindow:
+    """ログの全履歴を表示するウィンドウ"""
+    
+    def __init__(self, parent, history, text=None):
+        """
+        履歴ウィンドウの初期化
+        
+        Args:
+            parent (tk.Widget): 親ウィジェット
+            history (LogHistory): 読み込む履歴ファイル（Noneの場合はtextを表示）
+            text (str, optional): 履歴ファイルがない場合に表示するテキスト
+        """
+        self.history = history
+        # 次に読み込む範囲の終わり（バイト位置）
+        self.next_end = None
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("ログの全履歴")
+        self.window.geometry("800x500")
+        
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.more_button = ttk.Button(button_frame, text="さらに古いログを読み込む", command=self.load_older)
+        self.more_button.pack(side=tk.LEFT)
+        
+        self.text = tk.Text(self.window, font=("Helvetica", 9), wrap=tk.NONE)
+        scrollbar = ttk.Scrollbar(self.window, command=self.text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self.text.config(yscrollcommand=scrollbar.set)
+        
+        if history is None:
+            self.text.insert(tk.END, text or "")
+            self.more_button.config(state=tk.DISABLED)
+        else:
+            self.load_older()
+        self.text.config(state=tk.DISABLED)
+        self.text.see(tk.END)
+    
+    def load_older(self):
+        """読み込み済みの範囲より前のログを先頭に追加"""
+        try:
+            text, start = self.history.read_chunk(self.next_end)
+        except OSError as e:
+            text, start = f"ログ履歴の読み込みエラー: {str(e)}\n", 0
+        self.next_end = start
+        
+        self.text.config(state=tk.NORMAL)
+        self.text.insert("1.0", text)
+        self.text.config(state=tk.DISABLED)
+        if start <= 0:
+            self.more_button.config(state=tk.DISABLED)
@@ -8,8 +8,12 @@
 
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-from kumaMac.utils.image_utils import convert_cv_to_pil
+from kumaMac.ui.image_renderer import ImageRenderer
+from kumaMac.ui.log_panel import LogPanel
+from kumaMac.utils.overlay_renderer import OverlayRenderer
+
+# サイズ変更イベントをまとめて処理するまでの待ち時間（ミリ秒）
+RESIZE_DEBOUNCE_MS = 100
 
 class MainTab:
     """メイン監視タブのUI実装"""
@@ -95,6 +99,16 @@ class MainTab:
         self.canvas = tk.Canvas(self.left_frame, bg="black")
         self.canvas.pack(fill=tk.BOTH, expand=True)
         
+        # キャンバスのサイズ変更を通知するコールバック
+        self.display_size_callback = None
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        
+        # サイズ変更イベントの処理予約（連続したイベントは最後の1回だけ処理する）
+        self.adjust_after_id = None
+        self.canvas_resize_after_id = None
+        self.pending_canvas_size = None
+        self.square_size = None
+        
         # 左側フレームの幅を高さに合わせる処理
         self.parent.after(100, self.adjust_left_frame_width)
         
@@ -122,29 +136,62 @@ class MainTab:
         self.log_frame = ttk.LabelFrame(self.right_frame, text="ログ")
         self.log_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
         
-        self.log_text = tk.Text(self.log_frame, height=6, width=40, font=("Helvetica", 9), state=tk.DISABLED)
-        self.log_text.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+        # 直近のログだけを画面に保持し、全履歴はファイルから読み込む
+        self.log_panel = LogPanel(self.log_frame)
+        self.log_text = self.log_panel.text
         
-        # ログのスクロールバー
-        log_scrollbar = ttk.Scrollbar(self.log_text, command=self.log_text.yview)
-        log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.log_text.config(yscrollcommand=log_scrollbar.set)
-        
-        # 画像表示用の変数
-        self.photo = None
+        # 画像表示（キャンバス上の画像項目とバッファを使い回す）
+        self.renderer = ImageRenderer(self.canvas)
+        self.overlay_renderer = OverlayRenderer([])
     
     def on_window_resize(self, event):
         """ウィンドウサイズ変更時に呼ばれるハンドラー"""
         # イベントが左側フレームのものかチェック
         if event.widget == self.parent:
-            # 少し遅延してフレームサイズを再調整
-            self.parent.after(100, self.adjust_left_frame_width)
+            # 連続したイベントはまとめて、最後のイベントから少し遅延してフレームサイズを再調整
+            if self.adjust_after_id is not None:
+                self.parent.after_cancel(self.adjust_after_id)
+            self.adjust_after_id = self.parent.after(RESIZE_DEBOUNCE_MS, self.adjust_left_frame_width)
+    
+    def on_canvas_resize(self, event):
+        """キャンバスサイズ変更時に呼ばれるハンドラー"""
+        if event.width <= 1 or event.height <= 1:
+            return
+        self.pending_canvas_size = (event.width, event.height)
+        if self.canvas_resize_after_id is not None:
+            self.canvas.after_cancel(self.canvas_resize_after_id)
+        self.canvas_resize_after_id = self.canvas.after(RESIZE_DEBOUNCE_MS, self.apply_canvas_resize)
+    
+    def apply_canvas_resize(self):
+        """確定したキャンバスサイズで最後のフレームを描き直し、表示サイズを通知する"""
+        self.canvas_resize_after_id = None
+        width, height = self.pending_canvas_size
+        self.renderer.set_canvas_size(width, height)
+        self.renderer.rerender()
+        if self.display_size_callback:
+            self.display_size_callback(width, height)
+    
+    def set_display_size_callback(self, callback):
+        """
+        表示サイズの通知先を設定
+        
+        Args:
+            callback (function): callback(幅, 高さ)
+        """
+        self.display_size_callback = callback
     
     def adjust_left_frame_width(self):
         """左側フレームの幅を高さに合わせて正方形にする"""
+        self.adjust_after_id = None
+        
         # 左側フレームの高さを取得
         height = self.left_frame.winfo_height()
         if height > 1:  # 有効な高さがある場合のみ調整
+            # 高さが変わっていなければ何もしない（不要なConfigureイベントを発生させない）
+            if height == self.square_size:
+                return
+            self.square_size = height
+            
             # 左側のコンテナフレームの幅を高さと同じに設定
             self.left_frame_container.config(width=height)
             # ウィジェットのサイズ変更を防止
@@ -154,7 +201,7 @@ class MainTab:
             self.canvas.config(width=height, height=height)
         else:
             # まだフレームが表示されていない場合は後で再試行
-            self.parent.after(100, self.adjust_left_frame_width)
+            self.adjust_after_id = self.parent.after(RESIZE_DEBOUNCE_MS, self.adjust_left_frame_width)
     
     def set_button_commands(self, start_command, stop_command, inference_start_command=None, inference_stop_command=None):
         """
@@ -220,10 +267,33 @@ class MainTab:
         Args:
             message (str): 表示するログメッセージ
         """
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_panel.append(message)
+    
+    def update_log_lines(self, messages):
+        """
+        複数のログメッセージをまとめて追加（挿入とスクロールは1回だけ行う）
+        
+        Args:
+            messages (list): 表示するログメッセージのリスト
+        """
+        self.log_panel.extend(messages)
+    
+    def configure_log(self, capacity=None, history_path=None):
+        """
+        ログパネルの設定を変更
+        
+        Args:
+            capacity (int, optional): 画面に保持するログの行数
+            history_path (str, optional): 全履歴を保存するファイルのパス
+        """
+        if capacity is not None:
+            self.log_panel.set_capacity(capacity)
+        if history_path is not None:
+            self.log_panel.set_history_path(history_path)
+    
+    def close(self):
+        """ログパネルの書き込みスレッドを終了"""
+        self.log_panel.close()
     
     def update_device_state(self, connection_state, operation_state, timestamp):
         """
@@ -260,38 +330,32 @@ class MainTab:
         Args:
             cv_image (numpy.ndarray): OpenCV形式の画像
         """
-        # OpenCV画像をPIL形式に変換
-        pil_image = convert_cv_to_pil(cv_image)
-        
-        # キャンバスのサイズを取得
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        
-        # キャンバスがまだ表示されていない場合の対応
-        if canvas_width <= 1:
-            canvas_width = 320
-        if canvas_height <= 1:
-            canvas_height = 320
-        
-        # 画像のリサイズ（アスペクト比を維持）
-        img_width, img_height = pil_image.size
-        ratio = min(canvas_width/img_width, canvas_height/img_height)
-        new_width = int(img_width * ratio)
-        new_height = int(img_height * ratio)
-        
-        pil_image = pil_image.resize((new_width, new_height), Image.LANCZOS)
-        
-        # PIL画像をTkinter用に変換
-        self.photo = ImageTk.PhotoImage(image=pil_image)
+        self.renderer.render(cv_image)
+    
+    def update_frame(self, cv_image, detections, scale_x=1, scale_y=1):
+        """
+        画像を更新し、検出結果を表示解像度で重ねて描画
         
-        # キャンバスをクリアして新しい画像を表示
-        self.canvas.delete("all")
+        Args:
+            cv_image (numpy.ndarray): OpenCV形式の画像
+            detections (numpy.ndarray): 検出結果の構造化配列（DETECTION_DTYPE）
+            scale_x (float): 検出座標を画像の座標に変換するX方向の係数
+            scale_y (float): 検出座標を画像の座標に変換するY方向の係数
+        """
+        def _overlay(display_image, ratio_x, ratio_y):
+            self.overlay_renderer.draw(display_image, detections, scale_x * ratio_x, scale_y * ratio_y)
         
-        # 画像をキャンバスの中央に配置
-        x = max(0, (canvas_width - new_width) // 2)
-        y = max(0, (canvas_height - new_height) // 2)
+        self.renderer.render(cv_image, _overlay)
+    
+    def set_objclass(self, objclass):
+        """
+        オーバーレイ表示に使用するクラスリストを更新
         
-        self.canvas.create_image(x, y, anchor=tk.NW, image=self.photo)
+        Args:
+            objclass (list): クラスのリスト
+        """
+        self.overlay_renderer.set_objclass(objclass)
+        self.renderer.rerender()
     
     def update_detection_info(self, detections):
         """
@@ -13,11 +13,11 @@ import time
 from datetime import datetime
 
 import settings
-from kumaMac.api.aitrios_client import AITRIOSClient
-from kumaMac.core.detection_processor import DetectionProcessor
-from kumaMac.core.settings_manager import SettingsManager
-from kumaMac.ui.main_tab import MainTab
+from kumaMac.core.device_state_service import DeviceStateService
+from kumaMac.core.settings_manager import SettingsManager, DEFAULT_SETTINGS
 from kumaMac.ui.settings_tab import SettingsTab
+from kumaMac.ui.ui_dispatcher import UIDispatcher, BATCH
+from kumaMac.ui.command_executor import CommandExecutor
 
 class KumakitaApp(tk.Tk):
     """アプリケーションのメインウィンドウクラス"""
@@ -34,6 +34,11 @@ class KumakitaApp(tk.Tk):
         # 設定マネージャーの初期化
         self.settings_manager = SettingsManager(settings)
         
+        # 重いモジュール（requests・numpy・cv2・PIL）はモジュールの読み込み時ではなく
+        # ウィンドウの作成時に読み込む
+        from kumaMac.api.aitrios_client import AITRIOSClient
+        from kumaMac.core.detection_processor import DetectionProcessor
+        
         # APIクライアントの初期化
         self.aitrios_client = AITRIOSClient(
             settings.DEVICE_ID,
@@ -41,24 +46,37 @@ class KumakitaApp(tk.Tk):
             settings.CLIENT_SECRET
         )
         
+        # UIと検出プロセッサで共有するデバイス状態サービス
+        self.device_state = DeviceStateService(self.aitrios_client, ttl=2.0, poll_interval=2.0)
+        
         # 検出プロセッサの初期化
         self.processor = DetectionProcessor(
             self.aitrios_client,
             settings.objclass,
-            self.handle_processor_callback
+            self.handle_processor_callback,
+            device_state_service=self.device_state
         )
+        self.processor.set_output_type(self.settings_manager.config['output_type'])
+        self.processor.set_match_tolerance(self.settings_manager.get_setting(
+            'inference_match_tolerance_ms', DEFAULT_SETTINGS['inference_match_tolerance_ms']))
+        self.apply_snapshot_settings(self.settings_manager.config)
         
         # 処理状態の管理用変数
         self.running_flag = threading.Event()
         self.processing_thread = None
         
-        # 状態更新タイマーID
-        self.status_update_timer = None
+        # デバイス状態を購読中かどうか
+        self.status_update_subscribed = False
         
         # UIの初期化
         self.init_ui()
+        self.init_dispatcher()
+        self.watch_circuit_breaker(self.aitrios_client)
+        
+        # UIから呼び出すAPI通信はバックグラウンドで実行し、結果を配送キューで受け取る
+        self.commands = CommandExecutor(self.dispatcher)
         
-        # アプリケーション起動時にデバイス状態を初期確認
+        # アプリケーション起動時にデバイス状態を初期確認（ウィンドウの表示は待たせない）
         self.check_device_status()
         
         # 定期的なデバイス状態の更新を開始
@@ -86,7 +104,8 @@ class KumakitaApp(tk.Tk):
         # タブ切り替えイベントの設定
         self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
-        # メインタブのUI
+        # メインタブのUI（画像の描画にcv2とPILを使うため、ここで読み込む）
+        from kumaMac.ui.main_tab import MainTab
         self.main_tab = MainTab(self.main_tab_frame)
         self.main_tab.set_button_commands(
             start_command=self.start_processing,
@@ -95,6 +114,11 @@ class KumakitaApp(tk.Tk):
             inference_stop_command=self.stop_inference
         )
         
+        # 画像は表示サイズに合わせて縮小デコードし、検出結果は表示解像度で重ねる
+        self.main_tab.set_display_size_callback(self.processor.set_display_size)
+        self.main_tab.set_objclass(self.settings_manager.config['objclass'])
+        self.apply_log_settings(self.settings_manager.config)
+        
         # 設定タブのUI
         self.settings_tab = SettingsTab(self.settings_tab_frame, self.settings_manager)
         self.settings_tab.set_cancel_command(lambda: self.tab_control.select(0))
@@ -107,6 +131,16 @@ class KumakitaApp(tk.Tk):
         # アプリケーション終了時の処理を設定
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def init_dispatcher(self):
+        """ワーカースレッドからのイベントをUIスレッドでまとめて反映する配送キューを初期化"""
+        self.dispatcher = UIDispatcher(self)
+        # フレームと検出情報・デバイス状態は最新のものだけを、ステータスはまとめて反映する
+        self.dispatcher.register("frame", self.show_frame)
+        self.dispatcher.register("detection", self.main_tab.update_detection_info)
+        self.dispatcher.register("device_state", lambda state: self.apply_device_state(*state))
+        self.dispatcher.register("status", self.apply_status_messages, BATCH)
+        self.dispatcher.start()
+    
     def on_tab_changed(self, event):
         """タブ切り替え時の処理"""
         selected_tab = self.tab_control.index("current")
@@ -119,114 +153,234 @@ class KumakitaApp(tk.Tk):
     
     def start_periodic_status_update(self):
         """定期的なデバイス状態更新を開始"""
-        # 既存のタイマーがあればキャンセル
-        if self.status_update_timer:
-            self.after_cancel(self.status_update_timer)
-        
-        # 更新間隔（ミリ秒）
-        update_interval = 2000  # 2秒ごと
-        
-        # 最初の更新を予約
-        self.status_update_timer = self.after(update_interval, self.periodic_status_update)
+        # 共有サービスがバックグラウンドで状態を監視し、結果を購読者へ配信する
+        if not self.status_update_subscribed:
+            self.device_state.subscribe(self.on_device_state_update, changes_only=False)
+            self.status_update_subscribed = True
+        self.device_state.start()
     
     def stop_periodic_status_update(self):
         """定期的なデバイス状態更新を停止"""
-        if self.status_update_timer:
-            self.after_cancel(self.status_update_timer)
-            self.status_update_timer = None
+        if self.status_update_subscribed:
+            self.device_state.unsubscribe(self.on_device_state_update)
+            self.status_update_subscribed = False
+        self.device_state.stop()
     
-    def periodic_status_update(self):
-        """定期的なデバイス状態更新の実行"""
-        # デバイス状態を確認
-        self.check_device_status()
+    def on_device_state_update(self, connection_state, operation_state, timestamp):
+        """
+        デバイス状態サービスからの通知（監視スレッドから呼ばれる）
         
-        # 次の更新を予約（再帰的に呼び出し）
-        self.status_update_timer = self.after(2000, self.periodic_status_update)
+        Args:
+            connection_state (str): 接続状態
+            operation_state (str): 動作状態
+            timestamp (str): 取得時刻
+        """
+        self.dispatcher.post("device_state", (connection_state, operation_state, timestamp))
+    
+    def apply_device_state(self, connection_state, operation_state, timestamp):
+        """
+        デバイス状態をUIに反映
+        
+        Args:
+            connection_state (str): 接続状態
+            operation_state (str): 動作状態
+            timestamp (str): 取得時刻
+        """
+        self.main_tab.update_device_state(connection_state, operation_state, timestamp)
+    
+    def check_device_status(self, rerun=False):
+        """
+        デバイス状態をバックグラウンドで確認し、結果をUIに反映
+        
+        Args:
+            rerun (bool): 確認中の場合は完了後にもう一度確認する（確認中の結果は反映しない）
+        """
+        self.commands.submit("device_status", self.device_state.get_state,
+                             on_success=self.on_device_status_checked,
+                             on_error=lambda e: self.update_status(f"デバイス状態取得エラー: {str(e)}"),
+                             rerun=rerun)
+    
+    def on_device_status_checked(self, state):
+        """
+        デバイス状態の確認結果をUIに反映
+        
+        Args:
+            state (tuple): (接続状態, 動作状態)
+        """
+        connection_state, operation_state = state
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # UI更新
+        self.main_tab.update_device_state(connection_state, operation_state, timestamp)
+        
+        # ステータス更新
+        status_message = "デバイス接続中" if connection_state == "Connected" else "デバイス未接続"
+        self.update_status(f"{status_message} ({operation_state})")
+    
+    def refresh_device_status(self):
+        """キャッシュを無視してデバイス状態を再取得"""
+        self.device_state.invalidate()
+        # 旧クライアントでの確認が実行中でも、その完了後に取り直す
+        self.check_device_status(rerun=True)
+    
+    def run_inference_command(self, start):
+        """
+        推論の開始・停止を実行（バックグラウンドのスレッドで実行される）
+        
+        Args:
+            start (bool): 開始する場合True、停止する場合False
+        
+        Returns:
+            tuple: (APIの結果（条件を満たさない場合はNone）, 接続状態, 動作状態)
+        """
+        # 実行中に設定が変更されても同じクライアントを使う
+        client = self.aitrios_client
+        
+        # デバイス状態を取得（共有キャッシュを利用）
+        connection_state, operation_state = self.device_state.get_state()
+        
+        if start:
+            # Connected && Idleの場合のみ実行
+            if connection_state == "Connected" and operation_state == "Idle":
+                return client.start_inference(), connection_state, operation_state
+        else:
+            # Connectedでかつ、Idle以外の場合に実行
+            if connection_state == "Connected" and operation_state != "Idle":
+                return client.stop_inference(), connection_state, operation_state
+        return None, connection_state, operation_state
     
-    def check_device_status(self):
-        """アプリケーション起動時のデバイス状態確認"""
-        try:
-            # デバイス状態の取得
-            connection_state, operation_state = self.aitrios_client.get_connection_state()
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # UI更新
-            self.main_tab.update_device_state(connection_state, operation_state, timestamp)
-            
-            # ステータス更新
-            status_message = "デバイス接続中" if connection_state == "Connected" else "デバイス未接続"
-            self.update_status(f"{status_message} ({operation_state})")
-            
-        except Exception as e:
-            self.update_status(f"デバイス状態取得エラー: {str(e)}")
-
     def start_inference(self):
         """推論処理を開始する"""
-        try:
-            # デバイス状態を取得
-            connection_state, operation_state = self.aitrios_client.get_connection_state()
+        accepted = self.commands.submit("inference", lambda: self.run_inference_command(True),
+                                        on_success=self.on_inference_started,
+                                        on_error=lambda e: self.update_status(f"推論開始エラー: {str(e)}"))
+        if not accepted:
+            self.update_status("推論の開始・停止を実行中です")
+    
+    def on_inference_started(self, outcome):
+        """
+        推論開始の結果をUIに反映
+        
+        Args:
+            outcome (tuple): (APIの結果, 接続状態, 動作状態)
+        """
+        result, connection_state, operation_state = outcome
+        if result is None:
+            self.update_status(f"推論開始条件を満たしていません: {connection_state} - {operation_state}")
+        elif result.get("result") == "SUCCESS":
+            self.update_status("推論を開始しました")
             
-            # Connected && Idleの場合のみ実行
-            if connection_state == "Connected" and operation_state == "Idle":
-                # 推論開始APIを呼び出す
-                result = self.aitrios_client.start_inference()
-                if result.get("result") == "SUCCESS":
-                    self.update_status("推論を開始しました")
-                    
-                    # 自動的に表示も開始
-                    self.start_processing()
-                    
-                    # 1秒後にデバイス状態を再取得（APIが非同期のため）
-                    self.after(1000, self.check_device_status)
-                else:
-                    error_message = result.get("message", "Unknown error")
-                    self.update_status(f"推論開始エラー: {error_message}")
-            else:
-                self.update_status(f"推論開始条件を満たしていません: {connection_state} - {operation_state}")
-        except Exception as e:
-            self.update_status(f"推論開始エラー: {str(e)}")
+            # 自動的に表示も開始
+            self.start_processing()
+            
+            # 1秒後にデバイス状態を再取得（APIが非同期のため）
+            self.device_state.invalidate()
+            self.after(1000, self.refresh_device_status)
+        else:
+            error_message = result.get("message", "Unknown error")
+            self.update_status(f"推論開始エラー: {error_message}")
     
     def stop_inference(self):
         """推論処理を停止する"""
-        try:
-            # デバイス状態を取得
-            connection_state, operation_state = self.aitrios_client.get_connection_state()
+        accepted = self.commands.submit("inference", lambda: self.run_inference_command(False),
+                                        on_success=self.on_inference_stopped,
+                                        on_error=lambda e: self.update_status(f"推論停止エラー: {str(e)}"))
+        if not accepted:
+            self.update_status("推論の開始・停止を実行中です")
+    
+    def on_inference_stopped(self, outcome):
+        """
+        推論停止の結果をUIに反映
+        
+        Args:
+            outcome (tuple): (APIの結果, 接続状態, 動作状態)
+        """
+        result, connection_state, operation_state = outcome
+        if result is None:
+            self.update_status(f"推論停止条件を満たしていません: {connection_state} - {operation_state}")
+        elif result.get("result") == "SUCCESS":
+            self.update_status("推論を停止しました")
             
-            # Connectedでかつ、Idle以外の場合に実行
-            if connection_state == "Connected" and operation_state != "Idle":
-                # 推論停止APIを呼び出す
-                result = self.aitrios_client.stop_inference()
-                if result.get("result") == "SUCCESS":
-                    self.update_status("推論を停止しました")
-                    
-                    # 1秒後にデバイス状態を再取得（APIが非同期のため）
-                    self.after(1000, self.check_device_status)
-                else:
-                    error_message = result.get("message", "Unknown error")
-                    self.update_status(f"推論停止エラー: {error_message}")
-            else:
-                self.update_status(f"推論停止条件を満たしていません: {connection_state} - {operation_state}")
-        except Exception as e:
-            self.update_status(f"推論停止エラー: {str(e)}")
+            # 1秒後にデバイス状態を再取得（APIが非同期のため）
+            self.device_state.invalidate()
+            self.after(1000, self.refresh_device_status)
+        else:
+            error_message = result.get("message", "Unknown error")
+            self.update_status(f"推論停止エラー: {error_message}")
+    
+    def watch_circuit_breaker(self, aitrios_client):
+        """
+        APIクライアントのサーキットブレーカーの状態変化をステータスに表示
+        
+        Args:
+            aitrios_client (AITRIOSClient): 監視するクライアント
+        """
+        def _on_state_changed(state):
+            if state == "open":
+                self.update_status("AITRIOS APIが応答しないため、リクエストを一時停止しています")
+            elif state == "closed":
+                self.update_status("AITRIOS APIへの接続が回復しました")
+        
+        aitrios_client.circuit_breaker.add_listener(_on_state_changed)
     
     def on_settings_changed(self):
         """設定変更時のコールバック"""
         # APIクライアントの更新
+        # 新しいクライアントを先に作成してから旧クライアントを閉じることで、
+        # 共有セッションのkeep-alive接続を維持したまま切り替える
+        from kumaMac.api.aitrios_client import AITRIOSClient
         config = self.settings_manager.config
+        old_client = self.aitrios_client
         self.aitrios_client = AITRIOSClient(
             config['DEVICE_ID'],
             config['CLIENT_ID'],
             config['CLIENT_SECRET']
         )
+        self.watch_circuit_breaker(self.aitrios_client)
         
-        # 検出プロセッサの更新
-        self.processor.aitrios_client = self.aitrios_client
+        # 検出プロセッサとデバイス状態サービスを新しいクライアントに切り替えてから旧クライアントを閉じる
+        # （旧クライアントは実行中のリクエストが終わった時点で参照を解放する）
+        self.processor.set_aitrios_client(self.aitrios_client)
+        old_client.close()
         self.processor.set_objclass(config['objclass'])
+        self.main_tab.set_objclass(config['objclass'])
+        self.processor.set_output_type(config['output_type'])
+        self.processor.set_match_tolerance(
+            config.get('inference_match_tolerance_ms', DEFAULT_SETTINGS['inference_match_tolerance_ms']))
+        self.apply_snapshot_settings(config)
+        self.apply_log_settings(config)
         
         self.update_status("設定が更新されました")
         
         # デバイス状態を再取得
-        self.check_device_status()
+        self.refresh_device_status()
+    
+    def apply_snapshot_settings(self, config):
+        """
+        スナップショット保存の設定を検出プロセッサに反映
+        
+        Args:
+            config (dict): 設定
+        """
+        self.processor.configure_snapshots(
+            path=self.settings_manager.resolve_path(config.get('snapshot_path', DEFAULT_SETTINGS['snapshot_path'])),
+            quality=config.get('snapshot_quality', DEFAULT_SETTINGS['snapshot_quality']),
+            interval=config.get('snapshot_interval', DEFAULT_SETTINGS['snapshot_interval']),
+            enabled=config.get('snapshot_enabled', DEFAULT_SETTINGS['snapshot_enabled'])
+        )
+    
+    def apply_log_settings(self, config):
+        """
+        ログパネルの設定を反映
+        
+        Args:
+            config (dict): 設定
+        """
+        self.main_tab.configure_log(
+            capacity=config.get('log_capacity', DEFAULT_SETTINGS['log_capacity']),
+            history_path=self.settings_manager.resolve_path(
+                config.get('log_history_path', DEFAULT_SETTINGS['log_history_path']))
+        )
     
     def handle_processor_callback(self, event_type, data):
         """
@@ -236,38 +390,49 @@ class KumakitaApp(tk.Tk):
             event_type (str): イベントタイプ
             data: イベントデータ
         """
+        # ワーカースレッドから呼ばれるため、UIへの反映はすべて配送キュー経由で行う
         if event_type == "status":
             self.update_status(data)
-        elif event_type == "image":
+        elif event_type in ("image", "frame"):
+            # 画像のみと検出結果付きのフレームは同じ枠で最新のものだけを描画する
+            self.dispatcher.post("frame", (event_type, data))
+        elif event_type in ("detection", "device_state"):
+            self.dispatcher.post(event_type, data)
+    
+    def show_frame(self, frame):
+        """
+        配送キューから取り出したフレームをキャンバスに描画
+        
+        Args:
+            frame (tuple): ("image", 画像) または ("frame", (画像, 検出結果, X方向の係数, Y方向の係数))
+        """
+        event_type, data = frame
+        if event_type == "frame":
+            self.main_tab.update_frame(*data)
+        else:
             self.main_tab.update_image(data)
-        elif event_type == "detection":
-            self.main_tab.update_detection_info(data)
-        elif event_type == "device_state":
-            connection_state, operation_state, timestamp = data
-            self.main_tab.update_device_state(connection_state, operation_state, timestamp)
     
     def update_status(self, message):
         """
-        ステータスバーとログを更新
+        ステータスバーとログを更新（どのスレッドからでも呼び出せる）
         
         Args:
             message (str): ステータスメッセージ
         """
-        # UIスレッドからの呼び出しを保証
-        def _update():
-            # ステータスバーの更新
-            self.status_bar.config(text=message)
-            
-            # ログの更新
-            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-            log_message = f"[{timestamp}] {message}"
-            self.main_tab.update_log(log_message)
-        
-        # スレッドからの呼び出しの場合はafter()を使用
-        if threading.current_thread() is not threading.main_thread():
-            self.after(0, _update)
-        else:
-            _update()
+        # 時刻は呼び出し時点のものを記録し、反映は配送キューでまとめて行う
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.dispatcher.post("status", (timestamp, message))
+    
+    def apply_status_messages(self, messages):
+        """
+        溜まったステータスメッセージをまとめて反映
+        
+        Args:
+            messages (list): [(時刻, メッセージ)]
+        """
+        # ステータスバーには最新のメッセージだけを表示する
+        self.status_bar.config(text=messages[-1][1])
+        self.main_tab.update_log_lines([f"[{timestamp}] {message}" for timestamp, message in messages])
     
     def start_processing(self):
         """処理を開始"""
@@ -287,6 +452,8 @@ class KumakitaApp(tk.Tk):
         """処理を停止"""
         if self.running_flag.is_set():
             self.running_flag.clear()
+            # 待機中の処理ループをすぐに戻す
+            self.processor.request_stop()
             if self.processing_thread and self.processing_thread.is_alive():
                 self.processing_thread.join(1.0)  # 最大1秒待機
             
@@ -304,4 +471,9 @@ class KumakitaApp(tk.Tk):
         
         # 終了確認
         if messagebox.askokcancel("終了確認", "アプリケーションを終了しますか？"):
+            self.commands.shutdown()
+            self.dispatcher.stop()
+            self.processor.close()
+            self.aitrios_client.close()
+            self.main_tab.close()
             self.destroy()
\ No newline at end of file
@@ -6,10 +6,13 @@
 設定画面のUIを実装
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from kumaMac.utils.file_utils import export_classes_to_csv, import_classes_from_csv
 
+logger = logging.getLogger(__name__)
+
 class SettingsTab:
     """設定タブのUI実装"""
     
@@ -357,9 +360,8 @@ class SettingsTab:
                                               f"メソッドの定義: {sig}")
         
         except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            print(error_details)  # コンソールにトレースバックを出力
+            # ログにトレースバックを出力
+            logger.exception("設定の保存中にエラーが発生しました")
             messagebox.showerror("エラー", f"設定の保存中にエラーが発生しました: {str(e)}\n\n詳細: {type(e).__name__}")
     
     def set_on_settings_changed(self, callback):
@@ -410,4 +412,4 @@ class SettingsTab:
             
         except Exception as e:
             # エラーが発生しても機能に影響しないよう静かに失敗
-            print(f"視覚的フィードバックでエラー: {str(e)}")
\ No newline at end of file
+            logger.debug("視覚的フィードバックでエラー: %s", e)
\ No newline at end of file
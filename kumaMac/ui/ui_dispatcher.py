@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+UIイベント配送モジュール
+ワーカースレッドからのイベントをキューに溜め、UIスレッドの定期処理でまとめて反映する
+"""
+
+import logging
+import time
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# キューを処理する間隔（ミリ秒）
+UI_PUMP_INTERVAL_MS = 33
+
+# 1回の処理で反映するまとめ処理イベントの上限
+MAX_BATCH_PER_TICK = 200
+
+# 溜めておくまとめ処理イベントの上限（超えた分は古いものから捨てる）
+MAX_PENDING_BATCH = 5000
+
+# イベントの扱い
+COALESCE = "coalesce"  # 最新のものだけを反映する
+BATCH = "batch"        # 溜まったものをリストでまとめて反映する
+
+
+class UIDispatcher:
+    """
+    ワーカースレッドからUIへのイベントを配送するクラス
+    
+    post()はどのスレッドからでも呼び出せる。UIスレッドのafterで定期的に
+    キューを取り出し、フレームなどは最新のものだけを、ステータスなどは
+    1回の処理あたりの上限までまとめてハンドラーに渡す
+    """
+    
+    def __init__(self, root, interval_ms=UI_PUMP_INTERVAL_MS, max_batch_per_tick=MAX_BATCH_PER_TICK,
+                 max_pending_batch=MAX_PENDING_BATCH):
+        """
+        配送クラスの初期化
+        
+        Args:
+            root (tk.Misc): afterを呼び出すウィジェット
+            interval_ms (int): キューを処理する間隔（ミリ秒）
+            max_batch_per_tick (int): 1回の処理で反映するまとめ処理イベントの上限
+            max_pending_batch (int): 溜めておくまとめ処理イベントの上限
+        """
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_batch_per_tick = max_batch_per_tick
+        self.max_pending_batch = max_pending_batch
+        
+        # イベントタイプ → (扱い, ハンドラー)（登録順に処理する）
+        self._handlers = {}
+        self._lock = threading.Lock()
+        # 最新のみ反映するイベント {イベントタイプ: データ}
+        self._latest = {}
+        # まとめて反映するイベント {イベントタイプ: deque}
+        self._batches = {}
+        self._after_id = None
+        
+        # 統計情報
+        self.coalesced = 0
+        self.dropped = 0
+        self.last_tick_ms = 0.0
+    
+    def register(self, event_type, handler, mode=COALESCE):
+        """
+        イベントのハンドラーを登録
+        
+        Args:
+            event_type (str): イベントタイプ
+            handler (function): COALESCEの場合はhandler(データ)、BATCHの場合はhandler(データのリスト)
+            mode (str): COALESCEまたはBATCH
+        """
+        if mode not in (COALESCE, BATCH):
+            raise Exception(f"不明なイベントの扱いです: {mode}")
+        with self._lock:
+            self._handlers[event_type] = (mode, handler)
+            if mode == BATCH:
+                self._batches.setdefault(event_type, deque(maxlen=self.max_pending_batch))
+    
+    def post(self, event_type, data):
+        """
+        イベントをキューに追加（どのスレッドからでも呼び出せる）
+        
+        Args:
+            event_type (str): イベントタイプ
+            data: イベントデータ
+        
+        Returns:
+            bool: 登録済みのイベントタイプの場合True
+        """
+        with self._lock:
+            entry = self._handlers.get(event_type)
+            if entry is None:
+                return False
+            if entry[0] == COALESCE:
+                if event_type in self._latest:
+                    self.coalesced += 1
+                self._latest[event_type] = data
+            else:
+                batch = self._batches[event_type]
+                if len(batch) == batch.maxlen:
+                    self.dropped += 1
+                batch.append(data)
+        return True
+    
+    def start(self):
+        """定期処理を開始（UIスレッドから呼び出す）"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._pump)
+    
+    def stop(self):
+        """定期処理を停止（UIスレッドから呼び出す）"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+    
+    def flush(self):
+        """キューに溜まったイベントをすぐに反映（UIスレッドから呼び出す）"""
+        self._drain()
+    
+    def _take(self):
+        """
+        キューから今回反映するイベントを取り出す
+        
+        Returns:
+            list: [(ハンドラー, 扱い, データ)]（登録順）
+        """
+        work = []
+        with self._lock:
+            for event_type, (mode, handler) in self._handlers.items():
+                if mode == COALESCE:
+                    if event_type in self._latest:
+                        work.append((handler, mode, self._latest.pop(event_type)))
+                else:
+                    batch = self._batches[event_type]
+                    if batch:
+                        count = min(len(batch), self.max_batch_per_tick)
+                        work.append((handler, mode, [batch.popleft() for _ in range(count)]))
+        return work
+    
+    def _drain(self):
+        """取り出したイベントをハンドラーに渡す"""
+        started = time.perf_counter()
+        for handler, mode, data in self._take():
+            try:
+                handler(data)
+            except Exception as e:
+                logger.exception("UIイベント処理エラー: %s", e)
+        self.last_tick_ms = (time.perf_counter() - started) * 1000
+    
+    def _pump(self):
+        """定期処理（UIスレッドで実行される）"""
+        self._after_id = None
+        try:
+            self._drain()
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._pump)
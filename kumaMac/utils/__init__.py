@@ -2,12 +2,33 @@
 ユーティリティモジュール
 
 汎用的なユーティリティ関数を提供するモジュール
+（各モジュールは公開名が最初に参照されたときに読み込む）
 """
 
-from .image_utils import download_image, draw_bounding_boxes, resize_for_display, convert_cv_to_pil
-from .file_utils import export_classes_to_csv, import_classes_from_csv, ensure_directory, get_latest_file
+from .lazy_import import lazy_exports
+
+_EXPORTS = {
+    'download_image': '.image_utils', 'download_image_scaled': '.image_utils',
+    'decode_image_buffer': '.image_utils', 'decode_image_scaled': '.image_utils',
+    'jpeg_size': '.image_utils', 'draw_bounding_boxes': '.image_utils',
+    'draw_classifications': '.image_utils', 'draw_segmentation': '.image_utils',
+    'draw_keypoints': '.image_utils', 'format_detection_labels': '.image_utils',
+    'resize_for_display': '.image_utils', 'convert_cv_to_pil': '.image_utils',
+    'BufferPool': '.buffer_pool', 'Base64Decoder': '.buffer_pool',
+    'OverlayRenderer': '.overlay_renderer', 'SnapshotWriter': '.snapshot_writer',
+    'setup_logging': '.logging_setup', 'setup_logging_from_settings': '.logging_setup',
+    'shutdown_logging': '.logging_setup',
+    'export_classes_to_csv': '.file_utils', 'import_classes_from_csv': '.file_utils',
+    'ensure_directory': '.file_utils', 'get_latest_file': '.file_utils'
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
-    'download_image', 'draw_bounding_boxes', 'resize_for_display', 'convert_cv_to_pil',
+    'download_image', 'download_image_scaled', 'decode_image_buffer', 'decode_image_scaled',
+    'jpeg_size', 'draw_bounding_boxes', 'draw_classifications',
+    'draw_segmentation', 'draw_keypoints', 'format_detection_labels', 'resize_for_display',
+    'convert_cv_to_pil', 'BufferPool', 'Base64Decoder', 'OverlayRenderer', 'SnapshotWriter',
+    'setup_logging', 'setup_logging_from_settings', 'shutdown_logging',
     'export_classes_to_csv', 'import_classes_from_csv', 'ensure_directory', 'get_latest_file'
-]
\ No newline at end of file
+]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+バッファプールユーティリティモジュール
+Base64データを再利用可能なバッファにデコードし、コピーせずに後段へ渡すための機能
+"""
+
+import binascii
+import threading
+import numpy as np
+
+# Base64文字 → 6ビット値の変換表（無効な文字は255、パディングの'='は64）
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_DECODE_TABLE = np.full(256, 255, dtype=np.uint8)
+_DECODE_TABLE[np.frombuffer(_BASE64_ALPHABET, dtype=np.uint8)] = np.arange(64, dtype=np.uint8)
+_DECODE_TABLE[ord("=")] = 64
+
+# プールで確保するバッファの最小サイズ
+MIN_BUFFER_SIZE = 4096
+
+
+class BufferPool:
+    """サイズごとにbytearrayを再利用するプール"""
+    
+    def __init__(self, max_buffers_per_size=4):
+        """
+        バッファプールの初期化
+        
+        Args:
+            max_buffers_per_size (int): サイズごとに保持するバッファの最大数
+        """
+        self.max_buffers_per_size = max_buffers_per_size
+        self._free = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _bucket_size(size):
+        """要求サイズを2のべき乗に切り上げる（サイズの近いフレームでバッファを共有するため）"""
+        return max(MIN_BUFFER_SIZE, 1 << (max(size, 1) - 1).bit_length())
+    
+    def acquire(self, size):
+        """
+        指定サイズ以上のバッファを取得
+        
+        Args:
+            size (int): 必要なバイト数
+        
+        Returns:
+            bytearray: 再利用または新規確保したバッファ
+        """
+        bucket = self._bucket_size(size)
+        with self._lock:
+            buffers = self._free.get(bucket)
+            if buffers:
+                return buffers.pop()
+        return bytearray(bucket)
+    
+    def release(self, buffer):
+        """
+        バッファをプールに返却
+        
+        Args:
+            buffer (bytearray): acquireで取得したバッファ
+        """
+        with self._lock:
+            buffers = self._free.setdefault(len(buffer), [])
+            if len(buffers) < self.max_buffers_per_size:
+                buffers.append(buffer)
+
+
+class PooledBuffer:
+    """プールから借りたバッファの有効範囲を表すクラス（withで使用して自動的に返却する）"""
+    
+    def __init__(self, pool, buffer, length):
+        """
+        Args:
+            pool (BufferPool): 返却先のプール（Noneの場合は返却しない）
+            buffer (bytearray): データを保持するバッファ
+            length (int): 有効なデータのバイト数
+        """
+        self._pool = pool
+        self._buffer = buffer
+        self.length = length
+        self.view = memoryview(buffer)[:length]
+    
+    def __enter__(self):
+        return self.view
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+    
+    def __len__(self):
+        return self.length
+    
+    def release(self):
+        """バッファをプールに返却する（以降viewの内容は上書きされる可能性がある）"""
+        if self._pool is not None and self._buffer is not None:
+            self._pool.release(self._buffer)
+        self._buffer = None
+
+
+class Base64Decoder:
+    """Base64データをプールのバッファに直接デコードするクラス"""
+    
+    def __init__(self, pool=None):
+        """
+        デコーダーの初期化
+        
+        Args:
+            pool (BufferPool, optional): 使用するバッファプール
+        """
+        self.pool = pool if pool is not None else BufferPool()
+    
+    def decode(self, encoded):
+        """
+        Base64データをデコード
+        
+        6ビット値への変換用の作業領域と出力先はプールから借りるため、
+        フレームごとのメモリ確保が発生しない。改行などを含む入力は標準のデコーダーで処理する
+        
+        Args:
+            encoded (str or bytes): Base64エンコードされたデータ
+        
+        Returns:
+            PooledBuffer: デコード結果（viewをFlatBuffersやcv2.imdecodeにそのまま渡せる）
+        """
+        if isinstance(encoded, str):
+            encoded = encoded.encode("ascii")
+        src = np.frombuffer(encoded, dtype=np.uint8)
+        length = len(src)
+        if length == 0:
+            return PooledBuffer(None, bytearray(), 0)
+        if length % 4 != 0:
+            return self._decode_fallback(encoded)
+        
+        # 作業領域に6ビット値を展開
+        scratch = self.pool.acquire(length)
+        sextets = np.frombuffer(scratch, dtype=np.uint8, count=length)
+        np.take(_DECODE_TABLE, src, out=sextets)
+        
+        padding = 2 if src[-2] == ord("=") else (1 if src[-1] == ord("=") else 0)
+        body = sextets[:length - padding]
+        if length - padding > 0 and body.max() > 63:
+            # 無効な文字（改行など）や途中のパディングを含む
+            self.pool.release(scratch)
+            return self._decode_fallback(encoded)
+        sextets[length - padding:] = 0
+        
+        # 4文字 → 3バイトに詰め直す
+        groups = length // 4
+        quads = sextets.reshape(groups, 4)
+        output = self.pool.acquire(groups * 3)
+        out = np.frombuffer(output, dtype=np.uint8, count=groups * 3).reshape(groups, 3)
+        a, b, c, d = quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3]
+        
+        # 一時配列を作らないよう、出力列を作業領域として演算する
+        np.left_shift(a, 2, out=out[:, 0])
+        np.right_shift(b, 4, out=a)
+        np.bitwise_or(out[:, 0], a, out=out[:, 0])
+        
+        np.left_shift(b, 4, out=out[:, 1])
+        np.right_shift(c, 2, out=a)
+        np.bitwise_or(out[:, 1], a, out=out[:, 1])
+        
+        np.left_shift(c, 6, out=out[:, 2])
+        np.bitwise_or(out[:, 2], d, out=out[:, 2])
+        
+        self.pool.release(scratch)
+        return PooledBuffer(self.pool, output, groups * 3 - padding)
+    
+    def _decode_fallback(self, encoded):
+        """
+        標準のデコーダーでデコード（プールは使用しない）
+        
+        Returns:
+            PooledBuffer: デコード結果
+        """
+        decoded = bytearray(binascii.a2b_base64(encoded))
+        return PooledBuffer(None, decoded, len(decoded))
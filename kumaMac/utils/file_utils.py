@@ -6,9 +6,12 @@
 CSVファイルなどのファイル操作を行うユーティリティ関数
 """
 
+import logging
 import csv
 import os
 
+logger = logging.getLogger(__name__)
+
 def export_classes_to_csv(class_list, filename):
     """
     クラスリストをCSVファイルに出力
@@ -30,7 +33,7 @@ def export_classes_to_csv(class_list, filename):
                 
         return True
     except Exception as e:
-        print(f"CSVエクスポートエラー: {str(e)}")
+        logger.error("CSVエクスポートエラー: %s", e)
         return False
 
 def import_classes_from_csv(filename):
@@ -55,7 +58,7 @@ def import_classes_from_csv(filename):
                     
         return classes
     except Exception as e:
-        print(f"CSVインポートエラー: {str(e)}")
+        logger.error("CSVインポートエラー: %s", e)
         return []
 
 def ensure_directory(directory_path):
@@ -73,7 +76,7 @@ def ensure_directory(directory_path):
             os.makedirs(directory_path)
         return True
     except Exception as e:
-        print(f"ディレクトリ作成エラー: {str(e)}")
+        logger.error("ディレクトリ作成エラー: %s", e)
         return False
 
 def get_latest_file(directory, extension=None):
@@ -98,5 +101,5 @@ def get_latest_file(directory, extension=None):
         paths = [os.path.join(directory, f) for f in files]
         return max(paths, key=os.path.getmtime)
     except Exception as e:
-        print(f"ファイル検索エラー: {str(e)}")
+        logger.error("ファイル検索エラー: %s", e)
         return None
\ No newline at end of file
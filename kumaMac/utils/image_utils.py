@@ -7,22 +7,156 @@
 """
 
 import base64
+import struct
 import cv2
 import numpy as np
 
-def download_image(image_data):
+# 縮小デコードの倍率と対応するOpenCVの読み込みフラグ（縮小率の大きい順）
+REDUCED_COLOR_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# 画像サイズを持つJPEGのSOFマーカー（DHT・JPG・DACを除くSOF0〜SOF15）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_U16_BE = struct.Struct(">H")
+
+def download_image(image_data, base64_decoder=None):
     """
     Base64エンコードされた画像データを画像に変換
     
     Args:
         image_data (str): Base64エンコードされた画像データ
+        base64_decoder (Base64Decoder, optional): バッファを再利用するデコーダー
     
     Returns:
         numpy.ndarray: OpenCV画像データ
     """
-    image_bytes = base64.b64decode(image_data)
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if base64_decoder is None:
+        return decode_image_buffer(base64.b64decode(image_data))
+    
+    # デコード結果はimdecodeが新しい画像を作るまでの間だけ使うのでプールに返却できる
+    with base64_decoder.decode(image_data) as view:
+        return decode_image_buffer(view)
+
+def download_image_scaled(image_data, target_size, base64_decoder=None):
+    """
+    Base64エンコードされた画像を表示サイズに合わせて縮小デコード
+    
+    Args:
+        image_data (str): Base64エンコードされた画像データ
+        target_size (tuple): 表示先の(幅, 高さ)（Noneの場合は原寸でデコード）
+        base64_decoder (Base64Decoder, optional): バッファを再利用するデコーダー
+    
+    Returns:
+        tuple: (OpenCV画像データ, X方向の縮小率, Y方向の縮小率)
+    """
+    if base64_decoder is None:
+        return decode_image_scaled(base64.b64decode(image_data), target_size)
+    
+    with base64_decoder.decode(image_data) as view:
+        return decode_image_scaled(view, target_size)
+
+def jpeg_size(buf):
+    """
+    JPEGのヘッダーから画像サイズを読み取る（画素データはデコードしない）
+    
+    Args:
+        buf (bytes, bytearray or memoryview): JPEGデータ
+    
+    Returns:
+        tuple: (幅, 高さ)、JPEGでない場合やサイズが見つからない場合はNone
+    """
+    length = len(buf)
+    if length < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+    
+    pos = 2
+    while pos + 4 <= length:
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            # 埋め草のバイト
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # 長さを持たないマーカー
+            pos += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > length:
+                return None
+            height = _U16_BE.unpack_from(buf, pos + 5)[0]
+            width = _U16_BE.unpack_from(buf, pos + 7)[0]
+            return (width, height)
+        pos += 2 + _U16_BE.unpack_from(buf, pos + 2)[0]
+    
+    return None
+
+def select_reduced_decode(image_size, target_size):
+    """
+    表示サイズを下回らない範囲で最も縮小率の大きいデコード方法を選ぶ
+    
+    Args:
+        image_size (tuple): 元画像の(幅, 高さ)
+        target_size (tuple): 表示先の(幅, 高さ)（アスペクト比を維持して収める）
+    
+    Returns:
+        tuple: (縮小率の分母, cv2.imdecodeの読み込みフラグ)
+    """
+    width, height = image_size
+    target_width, target_height = target_size
+    if width <= 0 or height <= 0 or target_width <= 0 or target_height <= 0:
+        return 1, cv2.IMREAD_COLOR
+    
+    # 表示時の倍率（拡大表示になる場合は縮小しない）
+    fit = min(target_width / width, target_height / height)
+    for factor, flag in REDUCED_COLOR_FLAGS:
+        if factor * fit <= 1.0:
+            return factor, flag
+    return 1, cv2.IMREAD_COLOR
+
+def decode_image_scaled(buf, target_size):
+    """
+    エンコードされた画像を表示サイズに合わせて縮小デコード
+    
+    JPEGのDCTスケーリングで1/2・1/4・1/8に縮小しながらデコードするため、
+    原寸でデコードしてから縮小するより処理する画素が少ない
+    
+    Args:
+        buf (bytes, bytearray or memoryview): エンコード済み画像データ
+        target_size (tuple): 表示先の(幅, 高さ)（Noneの場合は原寸でデコード）
+    
+    Returns:
+        tuple: (OpenCV画像データ, X方向の縮小率, Y方向の縮小率)（検出座標に縮小率を掛けて使う）
+    """
+    image_size = jpeg_size(buf) if target_size is not None else None
+    if image_size is None:
+        return decode_image_buffer(buf), 1.0, 1.0
+    
+    factor, flags = select_reduced_decode(image_size, target_size)
+    image = decode_image_buffer(buf, flags)
+    if image is None or factor == 1:
+        return image, 1.0, 1.0
+    
+    # 端数の切り上げがあるため実際のサイズから縮小率を求める
+    return image, image.shape[1] / image_size[0], image.shape[0] / image_size[1]
+
+def decode_image_buffer(buf, flags=cv2.IMREAD_COLOR):
+    """
+    エンコードされた画像のバイト列を画像に変換（バッファはコピーしない）
+    
+    Args:
+        buf (bytes, bytearray or memoryview): JPEGなどのエンコード済み画像データ
+        flags (int): cv2.imdecodeに渡す読み込みフラグ
+    
+    Returns:
+        numpy.ndarray: OpenCV画像データ
+    """
+    nparr = np.frombuffer(buf, np.uint8)
+    return cv2.imdecode(nparr, flags)
 
 def draw_bounding_boxes(image, detections, objclass, scale_x=1, scale_y=1):
     """
@@ -30,7 +164,7 @@ def draw_bounding_boxes(image, detections, objclass, scale_x=1, scale_y=1):
     
     Args:
         image (numpy.ndarray): 元画像
-        detections (list): 検出結果のリスト
+        detections (list or numpy.ndarray): 検出結果のリスト、または構造化配列（DETECTION_DTYPE）
         objclass (list): クラスのリスト
         scale_x (float): X方向のスケール係数
         scale_y (float): Y方向のスケール係数
@@ -43,7 +177,7 @@ def draw_bounding_boxes(image, detections, objclass, scale_x=1, scale_y=1):
     detection_labels = []
     
     # 検出結果がない場合は元の画像と空のラベルリストを返す
-    if not detections:
+    if detections is None or len(detections) == 0:
         return result_image, ["推論結果なし"]
     
     # OpenCVでの色定義 (BGR形式)
@@ -71,7 +205,160 @@ def draw_bounding_boxes(image, detections, objclass, scale_x=1, scale_y=1):
         cv2.putText(result_image, label_text, (left+2, top+20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, TEXT_COLOR, 1)
     
     return result_image, detection_labels
-        
+
+def format_detection_labels(detections, objclass):
+    """
+    検出結果の表示用ラベルを作成
+    
+    Args:
+        detections (numpy.ndarray): 検出結果の構造化配列（DETECTION_DTYPE）
+        objclass (list): クラスのリスト
+    
+    Returns:
+        list: 検出ラベルのリスト
+    """
+    if detections is None or len(detections) == 0:
+        return ["推論結果なし"]
+    return [f"Class: {_class_name(objclass, class_id)}, Score: {score:.2f}"
+            for class_id, score in zip(detections["class_id"].tolist(), detections["score"].tolist())]
+
+# COCO形式のキーポイントの接続（骨格）
+COCO_SKELETON = [
+    (15, 13), (13, 11), (16, 14), (14, 12), (11, 12), (5, 11), (6, 12), (5, 6),
+    (5, 7), (6, 8), (7, 9), (8, 10), (1, 2), (0, 1), (0, 2), (1, 3), (2, 4), (3, 5), (4, 6)
+]
+
+def class_palette(num_classes):
+    """
+    クラスごとの表示色を作成
+    
+    Args:
+        num_classes (int): クラス数
+    
+    Returns:
+        numpy.ndarray: (クラス数, 3)のBGR色配列（uint8）
+    """
+    hues = (np.arange(num_classes) * 37 % 180).astype(np.uint8)
+    hsv = np.stack([hues, np.full_like(hues, 200), np.full_like(hues, 255)], axis=-1)
+    return cv2.cvtColor(hsv[None, :, :], cv2.COLOR_HSV2BGR)[0]
+
+def _class_name(objclass, class_id):
+    """クラスIDに対応するクラス名を取得"""
+    if 0 <= class_id < len(objclass):
+        return objclass[class_id]
+    return f"Unknown-{class_id}"
+
+def draw_classifications(image, classifications, objclass, scale_x=1, scale_y=1):
+    """
+    画像にクラス分類結果を描画
+    
+    Args:
+        image (numpy.ndarray): 元画像
+        classifications (numpy.ndarray): クラス分類結果の構造化配列（スコアの高い順）
+        objclass (list): クラスのリスト
+        scale_x (float): 使用しない（描画関数の引数を揃えるため）
+        scale_y (float): 使用しない（描画関数の引数を揃えるため）
+    
+    Returns:
+        tuple: (描画された画像, ラベルのリスト)
+    """
+    result_image = image.copy()
+    if classifications is None or len(classifications) == 0:
+        return result_image, ["推論結果なし"]
+    
+    labels = []
+    for i, (class_id, score) in enumerate(classifications[["class_id", "score"]].tolist()):
+        label_text = f"Class: {_class_name(objclass, class_id)}, Score: {score:.2f}"
+        labels.append(label_text)
+        cv2.putText(result_image, label_text, (8, 22 + i * 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+    
+    return result_image, labels
+
+def draw_segmentation(image, segmentation, objclass, scale_x=1, scale_y=1, alpha=0.5, background_class=0):
+    """
+    画像にセグメンテーション結果を重ねて描画
+    
+    Args:
+        image (numpy.ndarray): 元画像
+        segmentation (SegmentationResult): セグメンテーション結果
+        objclass (list): クラスのリスト
+        scale_x (float): 使用しない（マスクは画像全体に合わせて拡大する）
+        scale_y (float): 使用しない（マスクは画像全体に合わせて拡大する）
+        alpha (float): マスクの不透明度
+        background_class (int): 色を付けない背景クラスのID（Noneの場合はすべて着色）
+    
+    Returns:
+        tuple: (描画された画像, 画素数の多い順のクラスラベルのリスト)
+    """
+    if segmentation is None or segmentation.class_map.size == 0:
+        return image.copy(), ["推論結果なし"]
+    
+    class_map = segmentation.class_map
+    num_classes = max(int(segmentation.num_classes), len(objclass), int(class_map.max()) + 1)
+    
+    # クラスIDマップを色に変換してから画像サイズに合わせる（最近傍補間でクラス境界を保つ）
+    palette = class_palette(num_classes)
+    if background_class is not None and background_class < num_classes:
+        palette[background_class] = 0
+    mask = palette[class_map]
+    height, width = image.shape[:2]
+    if mask.shape[:2] != (height, width):
+        mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+    
+    result_image = cv2.addWeighted(image, 1.0, mask, alpha, 0)
+    
+    counts = np.bincount(class_map.ravel(), minlength=num_classes)
+    if background_class is not None and background_class < num_classes:
+        counts[background_class] = 0
+    total = class_map.size
+    labels = [f"Class: {_class_name(objclass, class_id)}, Area: {counts[class_id] / total:.1%}"
+              for class_id in np.argsort(counts)[::-1] if counts[class_id] > 0]
+    
+    return result_image, labels or ["推論結果なし"]
+
+def draw_keypoints(image, keypoint_result, objclass=None, scale_x=1, scale_y=1, min_keypoint_score=0.3, input_size=None):
+    """
+    画像にキーポイントと骨格を描画
+    
+    Args:
+        image (numpy.ndarray): 元画像
+        keypoint_result (KeypointResult): キーポイント結果
+        objclass (list, optional): 使用しない（描画関数の引数を揃えるため）
+        scale_x (float): X方向のスケール係数（input_size指定時は使用しない）
+        scale_y (float): Y方向のスケール係数（input_size指定時は使用しない）
+        min_keypoint_score (float): 描画するキーポイントのスコアの下限
+        input_size (tuple, optional): キーポイント座標の基準となる(幅, 高さ)（省略時は画像サイズ）
+    
+    Returns:
+        tuple: (描画された画像, 人物ごとのラベルのリスト)
+    """
+    result_image = image.copy()
+    if keypoint_result is None or len(keypoint_result.keypoints) == 0:
+        return result_image, ["推論結果なし"]
+    
+    height, width = image.shape[:2]
+    if input_size is not None:
+        scale_x, scale_y = width / input_size[0], height / input_size[1]
+    
+    # 座標変換と可視判定をまとめて行う
+    keypoints = keypoint_result.keypoints
+    points = np.empty(keypoints.shape[:2] + (2,), dtype=np.int32)
+    points[..., 0] = keypoints[..., 0] * scale_x
+    points[..., 1] = keypoints[..., 1] * scale_y
+    visible = keypoints[..., 2] >= min_keypoint_score
+    skeleton = COCO_SKELETON if keypoints.shape[1] == 17 else []
+    
+    labels = []
+    for person, (person_points, person_visible) in enumerate(zip(points, visible)):
+        for a, b in skeleton:
+            if person_visible[a] and person_visible[b]:
+                cv2.line(result_image, tuple(person_points[a].tolist()), tuple(person_points[b].tolist()), (0, 255, 0), 2)
+        for x, y in person_points[person_visible].tolist():
+            cv2.circle(result_image, (x, y), 3, (0, 255, 255), -1)
+        labels.append(f"Person {person + 1}, Score: {keypoint_result.scores[person]:.2f}")
+    
+    return result_image, labels
+
 def resize_for_display(image, max_width=800, max_height=600):
     """
     表示用に画像をリサイズ
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+遅延インポートモジュール
+パッケージの公開名を最初に参照されたときに読み込む（PEP 562のモジュール__getattr__を使用）
+"""
+
+import importlib
+
+
+def lazy_exports(package_name, exports):
+    """
+    パッケージの__getattr__と__dir__を作成
+    
+    パッケージの__init__で次のように使用する:
+        __getattr__, __dir__ = lazy_exports(__name__, {'Pipeline': '.pipeline'})
+    
+    Args:
+        package_name (str): パッケージ名（__name__）
+        exports (dict): {公開名: 定義しているモジュール（相対名）}
+    
+    Returns:
+        tuple: (__getattr__, __dir__)
+    """
+    package = importlib.import_module(package_name)
+    
+    def __getattr__(name):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package_name), name)
+        # 2回目以降は通常の属性として参照される
+        setattr(package, name, value)
+        return value
+    
+    def __dir__():
+        return sorted(set(vars(package)) | set(exports))
+    
+    return __getattr__, __dir__
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ログ履歴モジュール
+画面に残さない古いログをファイルに追記し、末尾から少しずつ読み出す
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 履歴ファイルの上限（超えた場合は.1に退避して新しいファイルに書く）
+DEFAULT_HISTORY_MAX_BYTES = 10 * 1024 * 1024
+
+# 履歴を読み出す単位（バイト）
+HISTORY_CHUNK_BYTES = 256 * 1024
+
+
+class LogHistory:
+    """
+    ログの全履歴を保存するファイル
+    
+    appendで渡したログは書き込みスレッドがまとめてファイルに追記するため、
+    呼び出し元（UIスレッド）はファイルの入出力を待たない
+    """
+    
+    def __init__(self, path, max_bytes=DEFAULT_HISTORY_MAX_BYTES):
+        """
+        履歴ファイルの初期化
+        
+        Args:
+            path (str): 履歴ファイルのパス
+            max_bytes (int): ファイルの上限（バイト）
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        
+        # 書き込みスレッドへの受け渡し
+        self._pending = []
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+    
+    def append(self, lines):
+        """
+        ログを書き込み待ちに追加（すぐに戻る）
+        
+        Args:
+            lines (list): ログメッセージのリスト
+        """
+        if not lines:
+            return
+        with self._condition:
+            if self._closed:
+                return
+            self._pending.extend(lines)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-history", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+    
+    def flush(self, timeout=1.0):
+        """
+        書き込み待ちのログがファイルに追記されるまで待つ
+        
+        Args:
+            timeout (float): 待つ最大秒数
+        
+        Returns:
+            bool: すべて追記された場合True
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+    
+    def close(self, timeout=2.0):
+        """
+        書き込み待ちのログを追記してスレッドを終了
+        
+        Args:
+            timeout (float): 終了を待つ最大秒数
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+    
+    def _run(self):
+        """書き込みスレッドの処理（溜まったログを1回の追記で書き込む）"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                lines, self._pending = self._pending, []
+                self._writing = True
+            
+            try:
+                self.write_lines(lines)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+    
+    def write_lines(self, lines):
+        """
+        ログをまとめて追記
+        
+        Args:
+            lines (list): ログメッセージのリスト
+        """
+        if not lines:
+            return
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError as e:
+            logger.error("ログ履歴の保存エラー: %s", e)
+    
+    def size(self):
+        """
+        履歴ファイルのサイズを取得
+        
+        Returns:
+            int: サイズ（バイト、ファイルがない場合は0）
+        """
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def read_chunk(self, end=None, chunk_bytes=HISTORY_CHUNK_BYTES):
+        """
+        指定位置より前のログを行単位で読み出す
+        
+        Args:
+            end (int, optional): 読み出す範囲の終わり（バイト位置、省略時はファイルの末尾）
+            chunk_bytes (int): 読み出す大きさの目安（バイト）
+        
+        Returns:
+            tuple: (テキスト, 読み出した範囲の先頭位置)（先頭位置が0ならそれより前はない）
+        """
+        if end is None:
+            end = self.size()
+        if end <= 0:
+            return "", 0
+        
+        start = max(0, end - chunk_bytes)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        
+        # 途中から読んだ場合は最初の不完全な行を次回に回す
+        if start > 0:
+            newline = data.find(b"\n")
+            if newline < 0:
+                return "", start
+            start += newline + 1
+            data = data[newline + 1:]
+        return data.decode("utf-8", errors="replace"), start
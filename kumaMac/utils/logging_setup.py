@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ログ設定モジュール
+各コンポーネントのログをキュー経由で専用スレッドに渡し、ローテーションするファイルに書き出す
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+
+# パッケージ全体のロガー名（各モジュールは logging.getLogger(__name__) を使用する）
+ROOT_LOGGER_NAME = "kumaMac"
+
+# 既定のログ設定
+DEFAULT_LOG_FILE = "logs/kumakita.log"
+DEFAULT_LOG_LEVEL = "INFO"
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s"
+
+# 実行中のリスナー（setup_loggingで作成する）
+_listener = None
+_queue_handler = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    レコードを整形せずにキューへ渡すハンドラー
+    
+    標準のQueueHandlerは呼び出し元のスレッドでメッセージを整形するが、
+    整形はリスナーのスレッドに任せてポーリング中のスレッドの負担を減らす
+    （引数には後から書き換えられないオブジェクトを渡すこと）
+    """
+    
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """1レコードを1行のJSONに整形するフォーマッター"""
+    
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _parse_level(level):
+    """
+    ログレベルを数値に変換
+    
+    Args:
+        level (str or int): レベル名（"DEBUG"など）または数値
+    
+    Returns:
+        int: ログレベル
+    """
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise Exception(f"不明なログレベルです: {level}")
+    return value
+
+
+def set_component_levels(component_levels):
+    """
+    コンポーネントごとのログレベルを設定
+    
+    Args:
+        component_levels (dict): {ロガー名: レベル}（例: {"kumaMac.api": "DEBUG"}）
+    """
+    for name, level in (component_levels or {}).items():
+        logging.getLogger(name).setLevel(_parse_level(level))
+
+
+def setup_logging(log_file=DEFAULT_LOG_FILE, level=DEFAULT_LOG_LEVEL, component_levels=None,
+                  max_bytes=DEFAULT_LOG_MAX_BYTES, backup_count=DEFAULT_LOG_BACKUP_COUNT,
+                  log_format="text", console=True):
+    """
+    パッケージのログ出力を設定（2回目以降の呼び出しは設定をやり直す）
+    
+    Args:
+        log_file (str): ログファイルのパス（Noneの場合はファイルに書かない）
+        level (str): パッケージ全体のログレベル
+        component_levels (dict, optional): {ロガー名: レベル}
+        max_bytes (int): ログファイルの上限（バイト）
+        backup_count (int): 保持する古いログファイルの数
+        log_format (str): "text"または"json"
+        console (bool): 標準エラー出力にも書くかどうか
+    
+    Returns:
+        logging.Logger: パッケージのロガー
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+    
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    if log_file:
+        directory = os.path.dirname(os.path.abspath(log_file))
+        os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # 呼び出し元はキューに積むだけで、整形と書き込みはリスナーのスレッドで行う
+    log_queue = queue.SimpleQueue()
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(_parse_level(level))
+    logger.propagate = False
+    set_component_levels(component_levels)
+    return logger
+
+
+def setup_logging_from_settings(settings_module, console=True):
+    """
+    設定モジュールの値からログ出力を設定
+    
+    Args:
+        settings_module: 設定が定義されているモジュール（log_file, log_level, log_levelsなど）
+        console (bool): 標準エラー出力にも書くかどうか
+    
+    Returns:
+        logging.Logger: パッケージのロガー
+    """
+    log_file = getattr(settings_module, 'log_file', DEFAULT_LOG_FILE)
+    # 相対パスは設定ファイルからの位置とする
+    if log_file and not os.path.isabs(log_file) and hasattr(settings_module, '__file__'):
+        log_file = os.path.join(os.path.dirname(os.path.abspath(settings_module.__file__)), log_file)
+    return setup_logging(
+        log_file=log_file,
+        level=getattr(settings_module, 'log_level', DEFAULT_LOG_LEVEL),
+        component_levels=getattr(settings_module, 'log_levels', None),
+        max_bytes=getattr(settings_module, 'log_max_bytes', DEFAULT_LOG_MAX_BYTES),
+        backup_count=getattr(settings_module, 'log_backup_count', DEFAULT_LOG_BACKUP_COUNT),
+        log_format=getattr(settings_module, 'log_format', "text"),
+        console=console
+    )
+
+
+def shutdown_logging():
+    """キューに残ったログを書き出してリスナーを停止"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger(ROOT_LOGGER_NAME).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+オーバーレイ描画モジュール
+検出結果のバウンディングボックスとラベルを表示解像度の画像に直接描画する
+"""
+
+import cv2
+import numpy as np
+
+from kumaMac.utils.image_utils import class_palette
+
+# スコアを丸める刻み（ラベル画像はクラスとこの刻みごとに1回だけ作成する）
+SCORE_BUCKETS = 20
+
+# ラベルの文字設定
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.45
+LABEL_THICKNESS = 1
+LABEL_PADDING = 2
+
+# 対象外（'-'）のクラスに使用する色（BGR）
+DISABLED_CLASS_COLOR = (128, 128, 128)
+
+
+class OverlayRenderer:
+    """検出結果を画像に重ねて描画するクラス"""
+    
+    def __init__(self, objclass, box_thickness=1, max_glyphs=2048):
+        """
+        オーバーレイ描画の初期化
+        
+        Args:
+            objclass (list): クラスのリスト
+            box_thickness (int): バウンディングボックスの線の太さ
+            max_glyphs (int): 保持するラベル画像の上限
+        """
+        self.box_thickness = box_thickness
+        self.max_glyphs = max_glyphs
+        self.objclass = []
+        self.palette = None
+        self._colors = []
+        # (クラスID, スコアの刻み) → ラベル画像
+        self._glyphs = {}
+        self.set_objclass(objclass)
+    
+    def set_objclass(self, objclass):
+        """
+        クラスリストを更新（色とラベル画像を作り直す）
+        
+        Args:
+            objclass (list): クラスのリスト
+        """
+        self.objclass = list(objclass)
+        palette = class_palette(max(len(self.objclass), 1))
+        for class_id, name in enumerate(self.objclass):
+            if name == '-':
+                palette[class_id] = DISABLED_CLASS_COLOR
+        self.palette = palette
+        self._colors = [tuple(int(c) for c in color) for color in palette]
+        self._glyphs = {}
+    
+    def class_color(self, class_id):
+        """
+        クラスの表示色を取得
+        
+        Args:
+            class_id (int): クラスID
+        
+        Returns:
+            tuple: BGR色
+        """
+        return self._colors[class_id % len(self._colors)]
+    
+    def _get_glyph(self, class_id, bucket):
+        """
+        ラベル画像を取得（未作成なら作成して保持する）
+        
+        Args:
+            class_id (int): クラスID
+            bucket (int): スコアの刻み（0〜SCORE_BUCKETS）
+        
+        Returns:
+            numpy.ndarray: クラス色の背景に文字を描いたラベル画像
+        """
+        key = (class_id, bucket)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            return glyph
+        
+        if 0 <= class_id < len(self.objclass):
+            name = self.objclass[class_id]
+        else:
+            name = f"Unknown-{class_id}"
+        text = f"{name} {bucket / SCORE_BUCKETS:.2f}"
+        (text_width, text_height), baseline = cv2.getTextSize(text, LABEL_FONT, LABEL_FONT_SCALE, LABEL_THICKNESS)
+        
+        color = self.class_color(class_id)
+        glyph = np.empty((text_height + baseline + LABEL_PADDING * 2, text_width + LABEL_PADDING * 2, 3), dtype=np.uint8)
+        glyph[:] = color
+        # 背景色の明るさに応じて文字色を選ぶ
+        text_color = (0, 0, 0) if sum(color) > 384 else (255, 255, 255)
+        cv2.putText(glyph, text, (LABEL_PADDING, LABEL_PADDING + text_height), LABEL_FONT,
+                    LABEL_FONT_SCALE, text_color, LABEL_THICKNESS, cv2.LINE_AA)
+        
+        if len(self._glyphs) >= self.max_glyphs:
+            self._glyphs.clear()
+        self._glyphs[key] = glyph
+        return glyph
+    
+    def draw(self, image, detections, scale_x=1, scale_y=1):
+        """
+        画像に検出結果を描画（画像をその場で書き換える）
+        
+        座標変換はまとめて行い、ラベルは作成済みの画像をスライスで貼り付ける
+        
+        Args:
+            image (numpy.ndarray): 描画先の画像（表示解像度）
+            detections (numpy.ndarray): 検出結果の構造化配列（DETECTION_DTYPE）
+            scale_x (float): 検出座標に掛けるX方向の係数
+            scale_y (float): 検出座標に掛けるY方向の係数
+        
+        Returns:
+            numpy.ndarray: 描画先の画像
+        """
+        if detections is None or len(detections) == 0:
+            return image
+        
+        height, width = image.shape[:2]
+        lefts = np.clip(detections["left"] * scale_x, 0, width - 1).astype(np.int32)
+        rights = np.clip(detections["right"] * scale_x, 0, width - 1).astype(np.int32)
+        tops = np.clip(detections["top"] * scale_y, 0, height - 1).astype(np.int32)
+        bottoms = np.clip(detections["bottom"] * scale_y, 0, height - 1).astype(np.int32)
+        buckets = np.clip((detections["score"] * SCORE_BUCKETS).astype(np.int32), 0, SCORE_BUCKETS)
+        class_ids = detections["class_id"]
+        
+        thickness = self.box_thickness
+        colors = self._colors
+        num_colors = len(colors)
+        glyphs = self._glyphs
+        rectangle = cv2.rectangle
+        for class_id, bucket, left, top, right, bottom in zip(class_ids.tolist(), buckets.tolist(), lefts.tolist(),
+                                                              tops.tolist(), rights.tolist(), bottoms.tolist()):
+            rectangle(image, (left, top), (right, bottom), colors[class_id % num_colors], thickness)
+            
+            # ラベルはボックスの上（収まらない場合は内側）に貼り付ける
+            glyph = glyphs.get((class_id, bucket))
+            if glyph is None:
+                glyph = self._get_glyph(class_id, bucket)
+            glyph_height, glyph_width = glyph.shape[:2]
+            y = top - glyph_height if top >= glyph_height else top
+            if left + glyph_width <= width and y + glyph_height <= height:
+                image[y:y + glyph_height, left:left + glyph_width] = glyph
+            else:
+                w = min(glyph_width, width - left)
+                h = min(glyph_height, height - y)
+                image[y:y + h, left:left + w] = glyph[:h, :w]
+        
+        return image
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+スナップショット保存モジュール
+最新フレームのJPEG保存を専用スレッドで行い、処理スレッドを待たせない
+"""
+
+import logging
+import os
+import time
+import threading
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# 既定の保存設定
+DEFAULT_SNAPSHOT_QUALITY = 90
+DEFAULT_SNAPSHOT_INTERVAL = 1.0
+
+
+class SnapshotWriter:
+    """
+    最新フレームだけを保持してJPEGファイルに書き出すクラス
+    
+    書き出しが追いつかない間に届いたフレームは最新のもので上書きされ、
+    ファイルは一時ファイルに書いてからos.replaceで置き換えるため、
+    読み手が書きかけのファイルを見ることはない。
+    画像の代わりに画像を返す関数を渡すと、実際に書き出すフレームだけを
+    保存スレッドでデコードする（表示用に縮小デコードしたフレームでも原寸で保存できる）
+    """
+    
+    def __init__(self, path, quality=DEFAULT_SNAPSHOT_QUALITY, min_interval=DEFAULT_SNAPSHOT_INTERVAL, enabled=True):
+        """
+        スナップショット保存の初期化
+        
+        Args:
+            path (str): 保存先のファイルパス
+            quality (int): JPEGの品質（0〜100）
+            min_interval (float): 書き出しの最小間隔（秒）
+            enabled (bool): 保存を行うかどうか
+        """
+        self.path = path
+        self.quality = quality
+        self.min_interval = min_interval
+        self.enabled = enabled
+        
+        # 書き出し待ちのフレーム（画像, 描画関数）
+        self._pending = None
+        self._last_write = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+        
+        # 統計情報
+        self.written = 0
+        self.dropped = 0
+    
+    def configure(self, path=None, quality=None, min_interval=None, enabled=None):
+        """
+        保存設定を変更
+        
+        Args:
+            path (str, optional): 保存先のファイルパス
+            quality (int, optional): JPEGの品質
+            min_interval (float, optional): 書き出しの最小間隔（秒）
+            enabled (bool, optional): 保存を行うかどうか
+        """
+        with self._condition:
+            if path is not None:
+                self.path = path
+            if quality is not None:
+                self.quality = quality
+            if min_interval is not None:
+                self.min_interval = min_interval
+            if enabled is not None:
+                self.enabled = enabled
+                if not enabled:
+                    self._pending = None
+            self._condition.notify_all()
+    
+    def submit(self, image, render=None):
+        """
+        フレームを保存対象として登録（すぐに戻る）
+        
+        Args:
+            image (numpy.ndarray or function): 保存する画像（呼び出し後に書き換えないこと）、
+                または保存スレッドで呼び出して画像を返す関数
+            render (function, optional): render(画像のコピー)で保存前に重ねて描画する関数
+                （戻り値が画像の場合はその画像を保存する）
+        """
+        if not self.enabled or image is None:
+            return
+        with self._condition:
+            if self._closed:
+                return
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (image, render)
+            self._ensure_thread()
+            self._condition.notify_all()
+    
+    def _ensure_thread(self):
+        """書き出しスレッドを起動（ロックを保持した状態で呼び出す）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+            self._thread.start()
+    
+    def close(self, timeout=2.0):
+        """
+        書き出し待ちのフレームを保存してスレッドを終了
+        
+        Args:
+            timeout (float): 終了を待つ最大秒数
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+    
+    def _run(self):
+        """書き出しスレッドの処理"""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                
+                # 最小間隔に達するまで待つ（その間に届いたフレームで置き換わる）
+                wait = self._last_write + self.min_interval - time.monotonic()
+                if wait > 0 and not self._closed:
+                    self._condition.wait(wait)
+                    continue
+                
+                image, render = self._pending
+                self._pending = None
+                path, quality = self.path, self.quality
+            
+            try:
+                self._write(image, render, path, quality)
+                self.written += 1
+            except Exception as e:
+                logger.error("スナップショット保存エラー: %s", e)
+            self._last_write = time.monotonic()
+    
+    @staticmethod
+    def _write(image, render, path, quality):
+        """
+        画像をJPEGにエンコードしてファイルを置き換える
+        
+        Args:
+            image (numpy.ndarray or function): 保存する画像、または画像を返す関数
+            render (function): 保存前に重ねて描画する関数（Noneの場合は描画しない）
+            path (str): 保存先のファイルパス
+            quality (int): JPEGの品質
+        """
+        if callable(image):
+            image = image()
+            if image is None:
+                raise Exception("画像をデコードできません")
+        elif render is not None:
+            image = image.copy()
+        if render is not None:
+            rendered = render(image)
+            if rendered is not None:
+                image = rendered
+        
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise Exception("JPEGエンコードに失敗しました")
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(encoded.data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -8,17 +8,11 @@ Kumakita - AITRIOSによる物体検出と熊検出警告アプリケーショ
 作成者：AI Assistant
 """
 
-import sys
-import os
-
-# 現在のディレクトリをパスに追加
-current_dir = os.path.dirname(os.path.abspath(__file__))
-if current_dir not in sys.path:
-    sys.path.insert(0, current_dir)
-
-# デバッグ出力
-print(f"Python path: {sys.path}")
-print(f"Current directory: {current_dir}")
+# ログ出力の設定（書き込みは専用スレッドで行う）
+# スクリプトのディレクトリはPythonがsys.pathの先頭に追加するため、パスの操作は不要
+import settings
+from kumaMac.utils.logging_setup import setup_logging_from_settings
+logger = setup_logging_from_settings(settings)
 
 # kumaMacのUI部分をインポート
 from kumaMac.ui.main_window import KumakitaApp
@@ -7,3 +7,20 @@ CLIENT_SECRET = "64文字の文字列"
 numberofclass = 89
 numberofclass = 89
 objclass = ['person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat', 'traffic light', 'fire hydrant', '-', 'stop sign', 'parking meter', 'bench', 'bird', 'cat', 'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', '-', 'backpack', 'umbrella', '-', '-', 'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard', 'sports ball', 'kite', 'baseball bat', 'baseball glove', 'skateboard', 'surfboard', 'tennis racket', 'bottle', '-', 'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple', 'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch', 'potted plant', 'bed', '-', 'dining table', '-', '-', 'toilet', '-', 'tv', 'laptop', 'mouse', 'remote', 'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink', 'refrigerator', '-', 'book', 'clock', 'vase', 'scissors', 'teddy bear', 'hair drier']
+# モデルの出力形式（object_detection / classification / segmentation / keypoints）
+output_type = "object_detection"
+# スナップショット（最新フレームのJPEG）の保存設定（相対パスはこのファイルからの位置）
+snapshot_enabled = True
+snapshot_path = "jpeg.jpg"
+snapshot_quality = 90
+snapshot_interval = 1.0
+# 画像と推論結果の照合で許容するタイムスタンプの差（ミリ秒、0の場合は完全一致のみ）
+inference_match_tolerance_ms = 0
+# ログ画面に保持する行数と、全履歴を保存するファイル（相対パスはこのファイルからの位置）
+log_capacity = 1000
+log_history_path = "logs/status.log"
+# 動作ログの設定（相対パスはこのファイルからの位置、log_levelsでコンポーネントごとのレベルを指定）
+log_file = "logs/kumakita.log"
+log_level = "INFO"
+log_levels = {"kumaMac.core.detection_processor": "INFO", "kumaMac.api": "INFO"}
+log_format = "text"